@@ -0,0 +1,34 @@
+"""
+Spiral benchmarks.
+
+Run all benchmarks with ``python -m scripts.benchmarks`` or a selection
+of them by name, for example ``python -m scripts.benchmarks wide_frames``.
+
+"""
+
+import sys
+
+from spiral import App
+
+from .definitions import benchmarks
+
+
+class BenchmarkApp(App):
+    class Meta:
+        label = "benchmarks"
+        argv = []
+
+
+def main(names=None):
+    names = names or list(benchmarks)
+
+    with BenchmarkApp() as app:
+        for name in names:
+            print(f"\n=== {name} ===")
+
+            for row in benchmarks[name](app):
+                print("  ".join(f"{x:>14}" for x in row))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,224 @@
+"""
+Benchmark definitions.
+
+Each benchmark takes an application and yields rows of a results table,
+starting with a header row.
+
+"""
+
+import time
+
+from spiral.data import load_dataset
+
+import numpy as np
+import pandas as pd
+
+
+def best_of(func, repeat=3):
+    """
+    Get the best wall clock time of a function in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def wide_frame(ncols, nrows=10000, seed=0):
+    """
+    Make a frame with a few plotted columns and many unused feature columns.
+    """
+    rng = np.random.default_rng(seed)
+
+    data = {
+        "x": rng.normal(size=nrows),
+        "y": rng.normal(size=nrows),
+        "group": rng.choice(["a", "b", "c"], size=nrows),
+    }
+
+    for i in range(ncols):
+        if i % 2:
+            data[f"feature_{i}"] = rng.integers(0, 10, size=nrows)
+        else:
+            data[f"feature_{i}"] = rng.normal(size=nrows)
+
+    return pd.DataFrame(data)
+
+
+def wide_frames(app):
+    """
+    Time a scatter plot of frames with an increasing number of columns.
+    """
+    yield ("columns", "seconds")
+
+    for ncols in (10, 100, 1000, 3000):
+        data = wide_frame(ncols)
+
+        seconds = best_of(lambda: app.plot.scatter(data, x="x", y="y", color="group"))
+
+        yield (ncols, f"{seconds:.3f}")
+
+
+def express_time(app, method, *args, **kwargs):
+    """
+    Time a plot of the handler and the plotly express call within it.
+
+    Returns
+    -------
+    tuple of float
+        The seconds spent making the whole figure and those spent in
+        plotly express, so the remainder is the handler's own work.
+
+    """
+    handler = app.plot
+    make_figure = handler.make_figure
+    express = []
+
+    def _make_figure(args, constructor):
+        def _constructor(**kw):
+            start = time.perf_counter()
+            figure = constructor(**kw)
+            express.append(time.perf_counter() - start)
+            return figure
+
+        return make_figure(args, _constructor)
+
+    handler.make_figure = _make_figure
+    try:
+        start = time.perf_counter()
+        getattr(handler, method)(*args, **kwargs)
+        seconds = time.perf_counter() - start
+    finally:
+        del handler.make_figure
+
+    return seconds, sum(express)
+
+
+def high_trace_counts(app):
+    """
+    Time faceted scatter plots with an increasing number of traces, split
+    into the time spent in plotly express and in the handler.
+    """
+    yield ("traces", "figure seconds", "express seconds", "handler seconds")
+
+    rng = np.random.default_rng(0)
+
+    for ncolors, nfacets in ((5, 10), (20, 30), (40, 60)):
+        ntraces = ncolors * nfacets
+        data = pd.DataFrame(
+            {
+                "x": rng.normal(size=ntraces),
+                "y": rng.normal(size=ntraces),
+                "color": np.repeat(np.arange(ncolors), nfacets).astype(str),
+                "facet": np.tile(np.arange(nfacets), ncolors).astype(str),
+            }
+        )
+        kwargs = {
+            "x": "x",
+            "y": "y",
+            "color": "color",
+            "facet_col": "facet",
+            "facet_col_wrap": 10,
+            "render_mode": "svg",
+        }
+
+        seconds, express = express_time(app, "scatter", data, **kwargs)
+
+        yield (
+            ntraces,
+            f"{seconds:.3f}",
+            f"{express:.3f}",
+            f"{seconds - express:.3f}",
+        )
+
+
+def line_groups(app):
+    """
+    Time line plots of many line groups drawn separately and merged.
+    """
+    yield ("lines", "separate seconds", "merged seconds")
+
+    rng = np.random.default_rng(0)
+    npoints = 50
+
+    for nlines in (10, 100, 1000, 10000):
+        data = pd.DataFrame(
+            {
+                "x": np.tile(np.arange(npoints), nlines),
+                "y": rng.normal(size=nlines * npoints).cumsum(),
+                "line": np.repeat(np.arange(nlines), npoints),
+                "color": np.repeat(np.arange(nlines) % 5, npoints).astype(str),
+            }
+        )
+        kwargs = {
+            "x": "x",
+            "y": "y",
+            "line_group": "line",
+            "color": "color",
+            "render_mode": "svg",
+        }
+
+        # separate traces take minutes beyond a few hundred lines
+        if nlines <= 100:
+            separate = best_of(lambda: app.plot.line(data, **kwargs), repeat=1)
+            separate = f"{separate:.3f}"
+        else:
+            separate = "-"
+
+        merged = best_of(lambda: app.plot.line(data, merge_lines=True, **kwargs))
+
+        yield (nlines, separate, f"{merged:.3f}")
+
+
+def scaled_dataset(name, nrows, seed=0):
+    """
+    Repeat a bundled dataset to a number of rows with jittered numbers.
+    """
+    data = load_dataset(name)
+    data = data.iloc[np.arange(nrows) % len(data)].reset_index(drop=True)
+
+    rng = np.random.default_rng(seed)
+    for column in data.select_dtypes("float").columns:
+        data[column] *= rng.lognormal(0, 0.01, size=nrows)
+
+    return data
+
+
+def serialization(app):
+    """
+    Time and size figures written by plotly and by the Spiral serializer.
+    """
+    yield ("dataset", "rows", "writer", "seconds", "megabytes")
+
+    cases = (
+        ("gapminder", {"x": "gdpPercap", "y": "lifeExp", "color": "continent"}),
+        ("iris", {"x": "sepal_length", "y": "sepal_width", "color": "species"}),
+    )
+    writers = {
+        "plotly": lambda fig: fig.to_json(),
+        "text": lambda fig: app.plot.to_json(fig, binary=False),
+        "binary": lambda fig: app.plot.to_json(fig, binary=True),
+        "float32": lambda fig: app.plot.to_json(fig, binary=True, precision="float32"),
+    }
+
+    for name, kwargs in cases:
+        for nrows in (100000, 1000000, 3000000):
+            data = scaled_dataset(name, nrows)
+            fig = app.plot.scatter(data, render_mode="webgl", **kwargs)
+
+            for writer, func in writers.items():
+                seconds = best_of(lambda: func(fig), repeat=1)
+                megabytes = len(func(fig)) / 1e6
+
+                yield (name, nrows, writer, f"{seconds:.3f}", f"{megabytes:.1f}")
+
+
+benchmarks = {
+    "high_trace_counts": high_trace_counts,
+    "line_groups": line_groups,
+    "serialization": serialization,
+    "wide_frames": wide_frames,
+}
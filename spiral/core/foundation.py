@@ -5,6 +5,7 @@ Spiral core foundation module.
 import logging
 import os
 import sys
+import threading
 
 from importlib import reload as reload_module
 
@@ -66,7 +67,6 @@ class App(CementApp):
             "cement.ext.ext_configparser",
             "spiral.ext.ext_argparse",
             "spiral.ext.ext_logging",
-            "spiral.ext.ext_plotly",
         ]
         """
         List of Spiral core extensions. These are generally required by
@@ -79,6 +79,17 @@ class App(CementApp):
         registered).
         """
 
+        plot_extensions = {"plotly": "spiral.ext.ext_plotly"}
+        """
+        Dictionary of the extensions providing plot handlers, by handler
+        label. The extension of ``App.Meta.plot_handler`` is loaded and
+        the handler set up the first time ``app.plot`` is used rather
+        than during setup, so applications that never plot do not import
+        the plotting libraries. The handler configuration is therefore
+        also validated on first use, and an invalid value raises there
+        rather than in ``app.setup()``.
+        """
+
         core_meta_override = [
             "debug",
             "plugin_dir",
@@ -132,10 +143,37 @@ class App(CementApp):
         self.controller = None
         self.plot = None
 
+        self._plot_pending = False
+        self._plot_lock = threading.Lock()
+
         self._suppress_loggers()
 
         super().__init__(label, **kw)
 
+    @property
+    def plot(self):
+        """
+        Get the plot handler, which is set up the first time it is used.
+
+        Raises
+        ------
+        SpiralError
+            If the plot handler configuration is invalid.
+
+        """
+        if self._plot is None and self._plot_pending:
+            with self._plot_lock:
+                # another thread may have set it up while this one waited
+                if self._plot is None and self._plot_pending:
+                    self._plot = self._load_plot_handler()
+                    self._plot_pending = False
+
+        return self._plot
+
+    @plot.setter
+    def plot(self, handler):
+        self._plot = handler
+
     @staticmethod
     def _suppress_loggers():
         """
@@ -280,7 +318,17 @@ class App(CementApp):
             self.controller = self._resolve_handler("controller", "base")
 
     def _setup_plot_handler(self):
-        self.plot = self._resolve_handler("plot", self._meta.plot_handler)
+        self.plot = None
+        self._plot_pending = True
+
+    def _load_plot_handler(self):
+        label = self._meta.plot_handler
+        extension = self._meta.plot_extensions.get(label)
+
+        if extension is not None and not self.handler.registered("plot", label):
+            self.ext.load_extension(extension)
+
+        return self._resolve_handler("plot", label)
 
 
 class TestApp(App):
@@ -2,14 +2,17 @@
 Built-in datasets for demonstration, educational and test purposes.
 """
 
+from __future__ import annotations
+
 import os
 
+from typing import TYPE_CHECKING
+
 from spiral.core.exc import SpiralError
 from spiral.utils.io import read_data, resource_exists, resource_filename
 
-import pandas as pd
-
-from pandas.api.types import CategoricalDtype as CatType
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def load_carshare() -> pd.DataFrame:
@@ -76,6 +79,8 @@ def load_flights() -> pd.DataFrame:
     """
     from calendar import month_name
 
+    from pandas.api.types import CategoricalDtype as CatType
+
     category_types = {"month": CatType(categories=month_name[1:], ordered=True)}
 
     return _load_dataset("flights.csv.gz").astype(category_types)
@@ -133,6 +138,8 @@ def load_tips() -> pd.DataFrame:
         `['total_bill', 'tip', 'sex', 'smoker', 'day', 'time', 'size']`.
 
     """
+    from pandas.api.types import CategoricalDtype as CatType
+
     category_types = {
         "day": CatType(categories=["Thur", "Fri", "Sat", "Sun"], ordered=True),
         "sex": CatType(categories=["Male", "Female"], ordered=True),
@@ -152,6 +159,8 @@ def load_titanic() -> pd.DataFrame:
     pandas.DataFrame
 
     """
+    from pandas.api.types import CategoricalDtype as CatType
+
     category_types = {
         "class": CatType(categories=["First", "Second", "Third"], ordered=True),
         "deck": CatType(categories=list("ABCDEFG"), ordered=True),
@@ -2,12 +2,39 @@
 Spiral plotly extension module.
 """
 
+import copy
+import multiprocessing
 import os
+import threading
+import traceback
+
+from collections import namedtuple
+from collections.abc import Iterator
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
 
 from spiral.core.exc import SpiralError
 from spiral.core.plot import PlotHandler
-from spiral.plotly import PlotlyExpress
-from spiral.utils.io import read_json, resource_exists, resource_filename
+from spiral.plotly import FigureCache, PlotlyExpress
+from spiral.plotly._aggregate import _from_numeric, _to_numeric, bin2d, bin_map
+from spiral.plotly._cache import hash_figure_args
+from spiral.plotly._downsample import (
+    downsample,
+    rank_columns,
+    sample_indices,
+    thin_points,
+)
+from spiral.plotly._export import ExportPool, _export_figure, export_jobs
+from spiral.plotly._geometry import GeometryCache, filter_features, geojson_bounds
+from spiral.plotly._histogram import ChunkedHistogram
+from spiral.plotly._image import pool_coordinates, pool_factors, pool_image
+from spiral.plotly._report import Report
+from spiral.plotly._serialize import to_html, to_json
+from spiral.plotly._stats import ColumnStatsCache, min_max
+from spiral.plotly._summary import summarize
+from spiral.plotly._trendline import trendlines
+from spiral.utils.io import read_csv, read_json, resource_exists, resource_filename
 
 import numpy as np
 import pandas as pd
@@ -110,6 +137,175 @@ def color_to_rgb(color):
     return color
 
 
+def _merge_options(target, options):
+    """
+    Recursively merge nested property options into a target dictionary.
+    """
+    for key, value in options.items():
+        if isinstance(value, dict):
+            current = target.get(key)
+            if not isinstance(current, dict):
+                current = {}
+            target[key] = _merge_options(current, value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+    return target
+
+
+def _validate_trace_options(trace, options):
+    """
+    Validate trace options once and expand them to nested properties.
+    """
+    validated = type(trace)(options).to_plotly_json()
+    validated.pop("type", None)
+
+    return validated
+
+
+def _figure_from_dict(figure, figure_dict):
+    """
+    Rebuild a figure from its dictionary without validation.
+    """
+    # keep the subplot grid so traces and axes can still be selected by
+    # row and column
+    figure_dict["_grid_str"] = figure._grid_str
+    figure_dict["_grid_ref"] = figure._grid_ref
+
+    return go.Figure(figure_dict, _validate=False)
+
+
+@lru_cache(maxsize=None)
+def _marker_colors(color, alpha):
+    r, g, b = color_to_rgb(color)
+
+    return {"color": f"rgba({r}, {g}, {b}, {alpha})", "line": {"color": color}}
+
+
+class RenderContext(
+    namedtuple(
+        "RenderContext",
+        [
+            "args",
+            "patches",
+            "figure",
+            "facet_ncols",
+            "figure_ncols",
+            "figure_nrows",
+            "legend_or_colorbar",
+            "figure_width",
+            "figure_height",
+            "plot_width",
+            "plot_height",
+            "left_margin",
+            "right_margin",
+            "top_margin",
+            "bottom_margin",
+        ],
+    )
+):
+
+    """
+    Plotly render context class.
+
+    An immutable record of the state belonging to a single call to
+    :meth:`PlotlyPlotHandler.make_figure`. Keeping this state out of
+    the handler allows one handler to build many figures at once.
+
+    """
+
+    __slots__ = ()
+
+    def figure_x(self, start, distance):
+        """
+        Get an x coordinate in the figure system for a distance in pixels.
+        """
+        return start + distance / self.figure_width
+
+    def figure_y(self, start, distance):
+        """
+        Get a y coordinate in the figure system for a distance in pixels.
+        """
+        return start + distance / self.figure_height
+
+    def plot_x(self, start, distance):
+        """
+        Get an x coordinate in the plot system for a distance in pixels.
+        """
+        return start + distance / self.plot_width
+
+    def plot_y(self, start, distance):
+        """
+        Get an y coordinate in the plot system for a distance in pixels.
+        """
+        return start + distance / self.plot_height
+
+
+RenderResult = namedtuple("RenderResult", ["value", "error"])
+RenderResult.__doc__ = """
+Result of a single figure specification rendered by
+:meth:`PlotlyPlotHandler.render_many`. ``value`` holds the rendered
+output, or ``None`` if rendering failed, in which case ``error`` holds
+the formatted traceback.
+"""
+
+_worker_app = None
+
+
+def _init_worker(handler_class, section, config, theme):
+    global _worker_app
+
+    from spiral.core.foundation import App
+
+    label = handler_class.Meta.label
+
+    _worker_app = App(
+        f"{label}_worker",
+        argv=[],
+        core_system_config_files=[],
+        core_user_config_files=[],
+        config_files=[],
+        core_system_config_dirs=[],
+        core_user_config_dirs=[],
+        config_dirs=[],
+        core_system_plugin_dirs=[],
+        core_user_plugin_dirs=[],
+        plugin_dirs=[],
+        exit_on_close=False,
+        handlers=[handler_class],
+        plot_handler=label,
+        config_defaults={section: config},
+    )
+    _worker_app.setup()
+    _worker_app.plot.set_theme(theme)
+
+
+def _render_spec(spec, handler=None):
+    if handler is None:
+        handler = _worker_app.plot
+
+    method, kwargs, output = spec
+
+    try:
+        if method.startswith("_") or not callable(getattr(PlotlyExpress, method, None)):
+            raise SpiralError(f"Unknown plot method '{method}'")
+
+        figure = getattr(handler, method)(**kwargs)
+
+        if output == "figure":
+            value = figure
+        elif output == "dict":
+            value = figure.to_dict()
+        elif output == "json":
+            value = figure.to_json()
+        else:
+            value = figure.to_image(format=output)
+
+        return RenderResult(value, None)
+    except Exception:
+        return RenderResult(None, traceback.format_exc())
+
+
 class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
 
     """
@@ -183,29 +379,62 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
             "marker_color_alpha": 0.5,
             "show_logo": False,
             "show_watermark": False,
+            "cache": False,
+            "cache_size": 128,
+            "cache_dir": None,
+            "cache_disk_size": None,
+            "aggregate_threshold": 100000,
+            "aggregate_bins": 100,
+            "aggregate_cell_pixels": 8,
+            "aggregate_max_cells": 10000,
+            "summary_outliers": 100,
+            "chunk_size": 100000,
+            "kde_points": 100,
+            "downsample": "lttb",
+            "point_budget": None,
+            "point_sampling": "voxel",
+            "max_rows": None,
+            "max_dimensions": None,
+            "dimension_rank": "variance",
+            "max_categories": None,
+            "other_category": "Other",
+            "stats_cache_size": None,
+            "geometry_cache_size": 16,
+            "image_pooling": None,
+            "image_pixel_ratio": 1,
+            "serialize_binary": False,
+            "serialize_precision": None,
+            "json_engine": "auto",
         }
         """Configuration default values."""
 
     def __init__(self, **kw):
         super().__init__(**kw)
 
-        self.args = None
-        self.patches = None
-        self.figure = None
-        self.left_margin = None
-        self.right_margin = None
-        self.top_margin = None
-        self.bottom_margin = None
         self.logo_source = None
-        self.facet_ncols = None
-        self.figure_ncols = None
-        self.figure_nrows = None
-        self.legend_or_colorbar = False
+        self.cache = None
+        self.stats = None
+        self.geometry = None
+        self.reports = []
+        self._reports_lock = threading.Lock()
+        self.exporter = None
 
     def _setup(self, app):
         super()._setup(app)
 
-        self.figure = go.Figure()
+        app.hook.register("pre_close", lambda app: self.close_exporter())
+
+        if self._get_config("stats_cache_size") is not None:
+            self.stats = ColumnStatsCache(maxsize=self._get_config("stats_cache_size"))
+
+        self.geometry = GeometryCache(maxsize=self._get_config("geometry_cache_size"))
+
+        if self._get_config("cache") is True:
+            self.cache = FigureCache(
+                maxsize=self._get_config("cache_size"),
+                directory=self._get_config("cache_dir"),
+                max_disk_bytes=self._get_config("cache_disk_size"),
+            )
 
         self.set_theme()
 
@@ -340,119 +569,569 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
 
         return titlecase(text, callback=skip_words)
 
-    @staticmethod
-    def _is_series_cat(series):
+    def _nunique(self, series):
+        if self.stats is None:
+            return series.nunique()
+
+        return self.stats.nunique(series)
+
+    def _min_max(self, series):
+        if self.stats is None:
+            return min_max(series)
+
+        return self.stats.min_max(series)
+
+    def _is_series_cat(self, series):
         if str(series.dtype) in ("category"):
             return True
 
         if str(series.dtype) in ("object", "int", "bool"):
-            if series.nunique() / len(series) < 0.5:
+            if self._nunique(series) / len(series) < 0.5:
                 return True
 
         return False
 
-    @staticmethod
-    def _rangemode(series):
+    def _rangemode(self, series):
+        minimum, maximum = self._min_max(series)
+
         try:
-            if series.array.min() / series.array.max() < 1 / 3:
+            if minimum / maximum < 1 / 3:
                 return "tozero"
         except TypeError:
             pass
 
         return "normal"
 
-    def _has_legend(self, trace):
-        if "showlegend" in trace and trace.showlegend is True:
-            self.legend_or_colorbar = True
+    @staticmethod
+    def _has_legend(trace):
+        return "showlegend" in trace and trace.showlegend is True
 
-    def _update_title_text(self, obj):
-        text = obj["title_text"]
+    def _format_title(self, context, text):
+        if text is None:
+            return None
 
-        if text is not None:
-            if text in self.args["labels"]:
-                text = self.args["labels"][text]
-            else:
-                text = self._title_case(self._clean_text(text))
+        if text in context.args["labels"]:
+            return context.args["labels"][text]
 
-            obj.update(title_text=text)
+        return self._title_case(self._clean_text(text))
 
-    def _update_markers(self, trace):
-        if trace.type not in ("scatter", "box", "violin"):
-            return
+    def set_theme(self, name="spiral"):
+        """
+        Set the theme used for creating figures.
+        """
+        theme_names = name.split("+")
 
-        options = {}
-        if "markers" in self.patches:
-            options.update(self.patches["markers"])
+        for theme_name in theme_names:
+            if theme_name not in self._meta.custom_themes:
+                continue
 
-        if isinstance(trace.marker.color, str):
-            r, g, b = color_to_rgb(trace.marker.color)
-            a = self._get_config("marker_color_alpha")
+            if theme_name not in pio.templates:
+                pio.templates[theme_name] = load_theme(theme_name)
 
-            options["marker_color"] = f"rgba({r}, {g}, {b}, {a})"
-            options["marker_line_color"] = trace.marker.color
-        else:
-            # what to do for color tuple?
-            pass
+            self.logo_source = load_logo(theme_name)
 
-        trace.update(**options)
+        pio.templates.default = name
 
-    def _update_annotation(self, annotation):
-        options = {}
-        if "annotations" in self.patches:
-            options.update(self.patches["annotation"])
+    def render_many(self, specs, workers=None, output="figure", chunksize=None):
+        """
+        Render a batch of figures across a pool of worker processes.
+
+        Each worker process sets up its own application with this
+        handler's configuration and theme once, and then renders the
+        specifications it is given.
+
+        Parameters
+        ----------
+        specs : list of tuple
+            A list of ``(method, kwargs)`` tuples, where ``method`` is the
+            name of a plot method (e.g. ``"scatter"``) and ``kwargs`` is a
+            dict of keyword arguments for that method.
+        workers : int, optional
+            The number of worker processes. Defaults to the number of CPUs.
+            If ``1`` the figures are rendered in the current process.
+        output : str, optional
+            The form of each rendered figure: ``"figure"`` (the default),
+            ``"dict"``, ``"json"`` or a static image format supported by
+            ``plotly.io.to_image`` such as ``"png"`` or ``"svg"``.
+        chunksize : int, optional
+            The number of specifications sent to a worker at a time.
+
+        Returns
+        -------
+        list of RenderResult
+            The results in the same order as ``specs``. Failed
+            specifications have a ``None`` value and a formatted
+            traceback as their error.
 
-        options["text"] = self._title_case(
-            self._clean_text(annotation.text.split("=")[-1])
-        )
+        """
+        specs = [(method, kwargs, output) for method, kwargs in specs]
 
-        annotation.update(**options)
+        if workers is None:
+            workers = os.cpu_count() or 1
 
-    def set_theme(self, name="spiral"):
+        workers = max(1, min(workers, len(specs)))
+
+        if workers == 1:
+            return [_render_spec(spec, handler=self) for spec in specs]
+
+        if chunksize is None:
+            chunksize = max(1, len(specs) // (workers * 4))
+
+        section = self._meta.config_section
+        config = self.app.config.get_section_dict(section)
+        initargs = (type(self), section, config, pio.templates.default)
+
+        with multiprocessing.Pool(workers, _init_worker, initargs) as pool:
+            return pool.map(_render_spec, specs, chunksize=chunksize)
+
+    def _get_exporter(self, workers, options):
+        default = pio.templates.default
+        exporter = self.exporter
+
+        if exporter is not None and not exporter.closed:
+            if (exporter.workers, exporter.default, exporter.options) == (
+                workers,
+                default,
+                options,
+            ):
+                return exporter
+
+            exporter.close()
+
+        templates = {
+            x: pio.templates[x].to_plotly_json()
+            for x in default.split("+")
+            if x in self._meta.custom_themes
+        }
+
+        self.exporter = ExportPool(workers, templates, default, **options)
+
+        return self.exporter
+
+    def export_many(
+        self,
+        figures,
+        fmt="png",
+        workers=None,
+        directory=None,
+        width=None,
+        height=None,
+        scale=None,
+        chunksize=1,
+    ):
         """
-        Set the theme used for creating figures.
+        Export a batch of figures to static image files.
+
+        The worker processes are kept between calls, so their image
+        renderers are started once, and are stopped when the application
+        is closed or by :meth:`close_exporter`. Each worker uses this
+        handler's theme and writes the files it renders.
+
+        Parameters
+        ----------
+        figures : list or dict
+            A list of figures, written to ``figure-<position>.<fmt>``, or
+            a dict of figures by file path.
+        fmt : str
+            The image format: ``"png"`` (the default), ``"jpg"``,
+            ``"jpeg"``, ``"webp"``, ``"svg"``, ``"pdf"`` or ``"eps"``.
+        workers : int, optional
+            The number of worker processes. Defaults to the number of CPUs.
+            If ``1`` the figures are exported in the current process.
+        directory : str or pathlib.Path, optional
+            The directory relative file paths are written to. Defaults to
+            the current directory.
+        width, height, scale : optional
+            The image size options passed to ``plotly.io.to_image``.
+        chunksize : int
+            The number of figures sent to a worker at a time.
+
+        Raises
+        ------
+        SpiralError
+            If the image format is not recognised.
+
+        Returns
+        -------
+        list of ExportResult
+            The path, render and write times in seconds, worker process
+            and error of each figure, in the same order as ``figures``.
+
         """
-        if name == pio.templates.default:
-            return
+        jobs = export_jobs(figures, fmt, directory)
+        options = {"width": width, "height": height, "scale": scale}
 
-        theme_names = name.split("+")
+        if workers is None:
+            workers = os.cpu_count() or 1
 
-        for theme_name in theme_names:
-            if theme_name not in self._meta.custom_themes:
-                continue
+        if workers == 1:
+            return [_export_figure(job, options) for job in jobs]
 
-            pio.templates[theme_name] = load_theme(theme_name)
-            self.logo_source = load_logo(theme_name)
+        return self._get_exporter(workers, options).export(jobs, chunksize=chunksize)
 
-        pio.templates.default = name
+    def close_exporter(self):
+        """
+        Stop the worker processes of :meth:`export_many`.
+        """
+        if self.exporter is not None:
+            self.exporter.close()
+            self.exporter = None
+
+    def _serialize_options(self, binary, precision):
+        if binary is None:
+            binary = self._get_config("serialize_binary")
+
+        if precision is None:
+            precision = self._get_config("serialize_precision")
+
+        return {
+            "binary": binary,
+            "precision": precision,
+            "engine": self._get_config("json_engine"),
+        }
+
+    def to_json(self, figure, binary=None, precision=None):
+        """
+        Serialize a figure to compact JSON.
+
+        Parameters
+        ----------
+        figure : plotly.graph_objects.Figure
+            The figure.
+        binary : bool, optional
+            If ``True`` numeric trace arrays are written as base64 typed
+            arrays, which plotly.js reads from version 2.28 but older
+            versions and ``plotly.io.from_json`` may not. Defaults to the
+            ``serialize_binary`` configuration option, which is ``False``.
+        precision : str or int or dict, optional
+            Either ``'float32'`` or a number of decimals, or a dict of
+            either by trace name or position. Defaults to the
+            ``serialize_precision`` configuration option.
+
+        Returns
+        -------
+        str
+            The JSON text.
+
+        """
+        return to_json(figure, **self._serialize_options(binary, precision))
+
+    def write_html(
+        self,
+        figure,
+        file,
+        binary=None,
+        precision=None,
+        include_plotlyjs=True,
+        full_html=True,
+        config=None,
+    ):
+        """
+        Write a figure to an HTML file with compact figure data.
+
+        Parameters
+        ----------
+        figure : plotly.graph_objects.Figure
+            The figure.
+        file : str or pathlib.Path or file-like
+            The file path or a writable text file object.
+        binary, precision
+            See :meth:`to_json`.
+        include_plotlyjs : bool or str
+            ``True`` to inline plotly.js, ``'cdn'`` to load it from the
+            plotly CDN or ``False`` to leave it out.
+        full_html : bool
+            If ``True`` a complete document is written, otherwise a
+            ``div`` element.
+        config : dict, optional
+            The plotly.js configuration options.
+
+        """
+        html = to_html(
+            figure,
+            include_plotlyjs=include_plotlyjs,
+            full_html=full_html,
+            config=config,
+            **self._serialize_options(binary, precision),
+        )
+
+        if hasattr(file, "write"):
+            file.write(html)
+        else:
+            Path(file).write_text(html, encoding="utf-8")
+
+    def report(
+        self,
+        file=None,
+        title=None,
+        collect=False,
+        binary=None,
+        precision=None,
+        include_plotlyjs=True,
+        config=None,
+    ):
+        """
+        Start an HTML report of many figures.
+
+        The report is a single self-contained document with one copy of
+        plotly.js, which draws each figure as it scrolls into view and
+        writes arrays shared by several figures once.
+
+        Parameters
+        ----------
+        file : str or pathlib.Path or file-like, optional
+            If set, the report is streamed to this file as figures are
+            added. Otherwise it is kept in memory.
+        title : str, optional
+            The report title.
+        collect : bool
+            If ``True`` every figure made by this handler, in any thread,
+            is added to the report until it is closed. A collecting report
+            held in memory grows with every figure, so it should be used
+            as a context manager or closed when done.
+        binary, precision
+            See :meth:`to_json`.
+        include_plotlyjs : bool or str
+            ``True`` to inline plotly.js, ``'cdn'`` to load it from the
+            plotly CDN or ``False`` to leave it out.
+        config : dict, optional
+            The plotly.js configuration options of every figure.
+
+        Returns
+        -------
+        spiral.plotly._report.Report
+            The report, which is also a context manager that closes it.
+
+        """
+        report = Report(
+            file=file,
+            title=title,
+            include_plotlyjs=include_plotlyjs,
+            config=config,
+            **self._serialize_options(binary, precision),
+        )
+
+        if collect:
+            with self._reports_lock:
+                self.reports.append(report)
+
+        return report
+
+    def _collect(self, figure):
+        with self._reports_lock:
+            self.reports = [x for x in self.reports if not x.closed]
+            reports = list(self.reports)
+
+        for report in reports:
+            try:
+                report.add(figure)
+            except SpiralError:
+                # closed by another thread since
+                if not report.closed:
+                    raise
 
     def make_figure(self, args, constructor):
         """
         Make a figure object.
         """
-        args.pop("self")
+        args = dict(args)
+        args.pop("self", None)
+
+        key = None
+        if self.cache is not None and not self._is_chunked(args.get("data_frame")):
+            key = self._cache_key(args, constructor)
+            figure = None if key is None else self.cache.get(key)
+
+            if figure is not None:
+                self._collect(figure)
+                return figure
+
+        args = self._prepare_chunks(args)
         args = self._prepare_data(args)
+        args = self._prepare_dimensions(args)
+        args = self._prepare_image(args)
+        args = self._prepare_geometry(args)
+        args = self._prepare_trendline(args)
+        args = self._prepare_aggregate(args)
         args = self._prepare_title(args)
-        args = self._prepare_grid(args)
+        args, grid = self._prepare_grid(args)
         args = self._prepare_labels(args)
         args = self._prepare_category_orders(args)
         args = self._prepare_patches(args)
 
-        self.patches = args.pop("patches")
-        self.args = args
+        patches = args.pop("patches")
+        figure = constructor(**args)
+
+        context = self._make_context(args, patches, figure, grid)
+        context = self._update_summary(context)
+        context = self._update_trendlines(context)
+
+        self._update_layout(context)
+        self._update_axes(context)
+        context = self._update_traces(context)
+        self._add_logo(context)
+        self._add_watermark(context)
+        self._add_note(context)
+
+        if key is not None:
+            self.cache.set(key, context.figure)
+
+        self._collect(context.figure)
+
+        return context.figure
+
+    @staticmethod
+    def _is_column(arg, data):
+        return pd.api.types.is_hashable(arg) and arg in data.columns
+
+    def _referenced_columns(self, kwargs, data):
+        # plotly express uses every column when dimensions are not given
+        # and for wide-form data where neither x nor y is given
+        if "dimensions" in kwargs and kwargs["dimensions"] is None:
+            return data.columns.tolist()
+
+        if "x" in kwargs and "y" in kwargs and kwargs["x"] is kwargs["y"] is None:
+            return data.columns.tolist()
 
-        self.figure = constructor(**args)
+        columns = []
+        for key in self._meta.data_attributes:
+            arg = kwargs.get(key)
+
+            if key in self._meta.array_attributes and isinstance(arg, (list, tuple)):
+                names = arg
+            else:
+                names = [arg]
+
+            for name in names:
+                if self._is_column(name, data) and name not in columns:
+                    columns.append(name)
+
+        return columns
+
+    def _cache_key(self, args, constructor):
+        data = args.get("data_frame")
+        args = {k: v for k, v in args.items() if k != "data_frame"}
+
+        if isinstance(data, pd.DataFrame):
+            columns = self._referenced_columns(args, data)
+            data = [(x, data[x]) for x in columns]
+
+        return hash_figure_args(
+            constructor,
+            pio.templates.default,
+            self.app.config.get_section_dict(self._meta.config_section),
+            args,
+            data,
+        )
+
+    @staticmethod
+    def _is_chunked(data):
+        return isinstance(data, (str, os.PathLike, Iterator))
+
+    def _prepare_chunks(self, kwargs):
+        data = kwargs.get("data_frame")
+
+        if not self._is_chunked(data):
+            return kwargs
+
+        if "cumulative" not in kwargs:
+            raise SpiralError("Data frame chunks are only supported by histograms")
+
+        keys = ("x", "y", "color", "facet_row", "facet_col")
+
+        if isinstance(data, (str, os.PathLike)):
+            if ".csv" not in Path(data).suffixes:
+                raise SpiralError(f"Unrecognised extension(s): {Path(data).suffixes}")
+
+            columns = {kwargs[x] for x in keys if isinstance(kwargs.get(x), str)}
+            data = read_csv(
+                data, chunksize=self._get_config("chunk_size"), usecols=list(columns)
+            )
+
+        kwargs.pop("aggregate", None)
+
+        return self._prepare_histogram(kwargs, data)
+
+    def _prepare_histogram(self, kwargs, chunks):
+        if kwargs.get("orientation") == "h":
+            value, other = "y", "x"
+        else:
+            value, other = "x", "y"
+
+        column = kwargs.get(value)
+
+        if column is None:
+            raise SpiralError(f"Binning requires '{value}'")
+
+        by = []
+        for key in ("color", "facet_row", "facet_col"):
+            if kwargs.get(key) not in (None, column) and kwargs[key] not in by:
+                by.append(kwargs[key])
+
+        # drop arguments that have no meaning for binned rows
+        keep = ["x", "y", "color", "facet_row", "facet_col"]
+        drop = [x for x in self._meta.data_attributes if x not in keep]
+        drop += ["marginal"]
+
+        for key in drop:
+            if kwargs.get(key) is not None:
+                LOG.debug(f"Ignoring argument '{key}' for binned figure")
+                kwargs[key] = None
+
+        weights = kwargs.get(other)
+        histfunc = kwargs.get("histfunc") or ("count" if weights is None else "sum")
+
+        histogram = ChunkedHistogram(
+            column,
+            by=by,
+            values=None if histfunc == "count" else weights,
+            nbins=kwargs.get("nbins") or self._get_config("aggregate_bins"),
+        )
 
-        self._update_sizes()
-        self._update_layout()
-        self._update_axes()
-        self._update_traces()
-        self._add_logo()
-        self._add_watermark()
-        self._add_note()
+        for chunk in chunks:
+            histogram.add(chunk)
 
-        return self.figure
+        name = "count" if histfunc == "count" else weights
+        data, bins = histogram.result(histfunc, name)
+
+        LOG.info(f"Binned {histogram.rows} rows into {len(data)} bins")
+
+        # bins hold a single value so sums stay sums and averages return
+        # the binned average
+        kwargs["data_frame"] = data
+        kwargs[other] = name
+        kwargs["histfunc"] = "avg" if histfunc == "avg" else "sum"
+
+        patches = dict(kwargs.get("patches") or {})
+
+        if bins is not None:
+            traces = {f"{value}bins": bins}
+            traces.update(patches.get("traces", {}))
+            patches["traces"] = traces
+
+        if histfunc == "count":
+            title_text = self._clean_text(kwargs.get("histnorm") or "count")
+            axis = {"title_text": self._title_case(title_text)}
+            axis.update(patches.get(f"{other}axis", {}))
+            patches[f"{other}axis"] = axis
+
+        kwargs["patches"] = patches
+
+        return kwargs
 
     def _prepare_data(self, kwargs):
+        max_points = kwargs.pop("max_points", None)
+        merge_lines = kwargs.pop("merge_lines", False)
+        point_budget = kwargs.pop("point_budget", None)
+        point_sampling = kwargs.pop("point_sampling", None)
+        max_categories = kwargs.pop("max_categories", None)
+
+        # False turns grouping off whatever the configuration
+        if max_categories is None:
+            max_categories = self._get_config("max_categories")
+        elif max_categories is False:
+            max_categories = None
+
         if "data_frame" in kwargs:
             data = kwargs["data_frame"]
 
@@ -462,49 +1141,866 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
             if not isinstance(data, pd.DataFrame):
                 data = pd.DataFrame(data)
 
-            # flatten variables
-            data_attributes = {}
-            for key, arg in kwargs.items():
-                # consider only data attributes
-                if key not in self._meta.data_attributes or arg is None:
-                    continue
+            # resolve data attributes to column names, collecting the
+            # values of any that are not columns of the data frame
+            columns = {}
 
-                if key in self._meta.array_attributes:
-                    for i in range(len(arg)):
-                        data_attributes[f"{key}_{str(i)}"] = arg[i]
-                else:
-                    data_attributes[key] = arg
-
-            for key, arg in data_attributes.items():
+            def _resolve(key, arg):
                 # get column name
-                if isinstance(arg, pd.Series):
+                if isinstance(arg, pd.Series) and arg.name is not None:
                     column = arg.name
-                elif isinstance(arg, str):
+                elif isinstance(arg, str) or self._is_column(arg, data):
                     column = arg
                 else:
                     column = key
 
-                # column already exists
-                if column not in data.columns:
-                    # add column data
+                # add column data
+                if column not in data.columns and not isinstance(arg, str):
                     if hasattr(arg, "values"):
-                        data[column] = arg.array
+                        columns[column] = arg.array
                     else:
-                        data[column] = np.array(arg)
+                        columns[column] = np.asarray(arg)
+
+                return column
 
-                # update argument with column name
-                base_key = key[: key.rfind("_")]
-                if base_key in kwargs:
-                    index = int(key[key.rfind("_") + 1 :])  # noqa: E203
-                    kwargs[base_key][index] = column
+            for key in self._meta.data_attributes:
+                arg = kwargs.get(key)
+
+                if arg is None:
+                    continue
+
+                if key in self._meta.array_attributes:
+                    kwargs[key] = [_resolve(f"{key}_{i}", x) for i, x in enumerate(arg)]
                 else:
-                    kwargs[key] = column
+                    kwargs[key] = _resolve(key, arg)
+
+            # build a narrow frame of the referenced columns without
+            # copying or modifying the data frame
+            referenced = {
+                x: data[x]
+                for x in self._referenced_columns(kwargs, data)
+                if x not in columns
+            }
+            referenced.update(columns)
+
+            index = data.index if len(data.columns) > 0 else None
+            data = pd.DataFrame(referenced, index=index, copy=False)
+
+            # limit the number of traces of discrete columns
+            if max_categories is not None:
+                data = self._limit_categories(kwargs, data, max_categories)
+
+            # thin point clouds
+            if "z" in kwargs and "log_z" in kwargs:
+                data = self._thin_points(kwargs, data, point_budget, point_sampling)
+
+            # downsample lines
+            if max_points is not None:
+                data = self._downsample(kwargs, data, max_points)
+
+            # draw each line style as a single trace
+            if merge_lines:
+                data = self._merge_lines(kwargs, data)
 
             # update data frame
             kwargs["data_frame"] = data
 
         return kwargs
 
+    def _limit_categories(self, kwargs, data, max_categories):
+        other = self._get_config("other_category")
+
+        keys = {}
+        for key in ("color", "symbol", "line_dash"):
+            column = kwargs.get(key)
+            if column is not None and column in data.columns:
+                keys.setdefault(column, []).append(key)
+
+        for column, column_keys in keys.items():
+            series = data[column]
+            is_cat = hasattr(series, "cat")
+
+            # numeric colors already have a continuous color scale
+            if column_keys == ["color"] and not is_cat:
+                if pd.api.types.is_numeric_dtype(series):
+                    continue
+
+            nunique = self._nunique(series)
+            if nunique <= max_categories:
+                continue
+
+            # show numbers stored as text or categories on a continuous
+            # color scale rather than as one trace per value
+            if column_keys == ["color"]:
+                values = pd.to_numeric(series.astype(object), errors="coerce")
+
+                if values.count() == series.count():
+                    data[column] = values
+                    LOG.info(
+                        f"Using a continuous color scale for column '{column}'"
+                        f" with {nunique} values"
+                    )
+                    continue
+
+            # keep the most frequent values and group the rest together
+            keep = series.value_counts().index[: max(max_categories - 1, 0)]
+
+            if is_cat:
+                categories = [x for x in series.cat.categories if x in keep]
+            else:
+                try:
+                    categories = sorted(keep)
+                except TypeError:
+                    categories = list(keep)
+
+            if other not in categories:
+                categories.append(other)
+
+            values = series.astype(object).where(
+                series.isin(keep) | series.isna(), other
+            )
+            data[column] = pd.Categorical(values, categories=categories)
+
+            LOG.info(
+                f"Grouped {nunique - len(keep)} of {nunique} values of column"
+                f" '{column}' into '{other}'"
+            )
+
+        return data
+
+    def _downsample(self, kwargs, data, max_points):
+        x, y = kwargs.get("x"), kwargs.get("y")
+
+        if x is None or y is None:
+            LOG.debug("Downsampling requires both 'x' and 'y'")
+            return data
+
+        by = []
+        for key in ("line_group", "color", "line_dash", "facet_row", "facet_col"):
+            column = kwargs.get(key)
+            if column is not None and column not in by:
+                by.append(column)
+
+        if kwargs.get("animation_frame") is not None:
+            by.append(kwargs["animation_frame"])
+
+        method = self._get_config("downsample")
+        positions = downsample(data, x, y, max_points, by=by, method=method)
+
+        if len(positions) < len(data):
+            LOG.info(f"Downsampled {len(data)} rows to {len(positions)} rows")
+            data = data.take(positions)
+
+        return data
+
+    def _thin_points(self, kwargs, data, point_budget, method):
+        if point_budget is None:
+            point_budget = self._get_config("point_budget")
+
+        if point_budget is None:
+            return data
+
+        keys = ("x", "y", "z")
+        columns = [kwargs.get(x) for x in keys]
+
+        if any(x is None for x in columns):
+            LOG.debug("Point sampling requires 'x', 'y' and 'z'")
+            return data
+
+        by = []
+        for key in ("color", "symbol", "line_dash", "line_group", "animation_frame"):
+            column = kwargs.get(key)
+            if column is None or column in by:
+                continue
+
+            # numeric colors are drawn on a continuous scale in one trace
+            series = data[column]
+            if key == "color" and pd.api.types.is_numeric_dtype(series):
+                if not hasattr(series, "cat"):
+                    continue
+
+            by.append(column)
+
+        method = method or self._get_config("point_sampling")
+        log = [kwargs.get(f"log_{x}", False) for x in keys]
+        positions = thin_points(
+            data, columns, point_budget, by=by, method=method, log=log
+        )
+
+        if len(positions) == len(data):
+            return data
+
+        message = (
+            f"Showing {len(positions):,} of {len(data):,} points"
+            f" ({method} sampling)"
+        )
+        LOG.info(message)
+        self._append_note(kwargs, message)
+
+        return data.take(positions)
+
+    @staticmethod
+    def _append_note(kwargs, message):
+        note = kwargs.get("note")
+
+        if isinstance(note, dict):
+            text = note.get("text")
+            kwargs["note"] = {**note, "text": f"{text}. {message}" if text else message}
+        else:
+            kwargs["note"] = f"{note}. {message}" if note else message
+
+    def _prepare_dimensions(self, kwargs):
+        if "dimensions" not in kwargs:
+            return kwargs
+
+        max_rows = kwargs.pop("max_rows", None) or self._get_config("max_rows")
+        max_dimensions = kwargs.pop("max_dimensions", None) or self._get_config(
+            "max_dimensions"
+        )
+        rank = kwargs.pop("dimension_rank", None) or self._get_config("dimension_rank")
+        data = kwargs["data_frame"]
+        messages = []
+
+        # sample rows in proportion to the color groups
+        positions = None
+        if max_rows is not None and len(data) > max_rows:
+            color = kwargs.get("color")
+
+            if color is not None:
+                codes = data.groupby(color, sort=False, observed=True, dropna=False)
+                codes = codes.ngroup().values.astype(np.int64)
+            else:
+                codes = np.zeros(len(data), dtype=np.int64)
+
+            positions = sample_indices(
+                codes, max_rows, stratified=True, proportional=True
+            )
+            messages.append(f"Showing {len(positions):,} of {len(data):,} rows")
+
+        if max_dimensions is not None:
+            messages += self._limit_dimensions(
+                kwargs, data, positions, max_dimensions, rank
+            )
+
+        if positions is not None or max_dimensions is not None:
+            # copy only the referenced columns of the sampled rows
+            data = data[self._referenced_columns(kwargs, data)]
+            if positions is not None:
+                data = data.take(positions)
+            kwargs["data_frame"] = data
+
+        if messages:
+            message = ", ".join(messages)
+            LOG.info(message)
+            self._append_note(kwargs, message)
+
+        return kwargs
+
+    def _limit_dimensions(self, kwargs, data, positions, max_dimensions, rank):
+        dimensions = kwargs.get("dimensions")
+
+        # the dimensions plotly express would draw
+        if dimensions is None:
+            dimensions = data.columns.tolist()
+
+            if "dimensions_max_cardinality" in kwargs:
+                limit = kwargs["dimensions_max_cardinality"]
+                dimensions = [x for x in dimensions if self._nunique(data[x]) <= limit]
+            elif "symbol" not in kwargs:
+                # parallel coordinates only draw numeric columns
+                dimensions = [
+                    x
+                    for x in dimensions
+                    if pd.api.types.is_numeric_dtype(data[x])
+                    and not hasattr(data[x], "cat")
+                ]
+
+        if len(dimensions) <= max_dimensions:
+            kwargs["dimensions"] = dimensions
+            return []
+
+        sample = data[dimensions]
+        if positions is not None:
+            sample = sample.take(positions)
+
+        scores = rank_columns(sample, dimensions, metric=rank)
+        keep = set(
+            scores.sort_values(ascending=False, kind="stable").index[:max_dimensions]
+        )
+        kwargs["dimensions"] = [x for x in dimensions if x in keep]
+
+        return [f"{max_dimensions} of {len(dimensions)} dimensions"]
+
+    def _merge_lines(self, kwargs, data):
+        line_group = kwargs.get("line_group")
+
+        if line_group is None:
+            LOG.debug("Merging lines requires 'line_group'")
+            return data
+
+        by = [line_group]
+        for key in ("color", "symbol", "line_dash", "facet_row", "facet_col"):
+            column = kwargs.get(key)
+            if column is not None and column not in by:
+                by.append(column)
+
+        if kwargs.get("animation_frame") is not None:
+            by.append(kwargs["animation_frame"])
+
+        codes = data.groupby(by, sort=False, observed=True).ngroup()
+        codes = codes.fillna(-1).values.astype(np.int64)
+
+        # order the rows by line, keeping the order within each line
+        order = np.argsort(codes, kind="stable")
+        data = data.take(order)
+        codes = codes[order]
+
+        # a gap row after each line shares its style with no coordinates
+        ends = np.flatnonzero(np.append(np.diff(codes) != 0, True))
+        ends = ends[codes[ends] >= 0]
+
+        gaps = data.iloc[ends].copy()
+        for key in ("x", "y", "z"):
+            column = kwargs.get(key)
+            if column is not None and column in gaps.columns:
+                gaps[column] = gaps[column].where(np.zeros(len(gaps), dtype=bool))
+
+        positions = np.insert(
+            np.arange(len(data)), ends + 1, len(data) + np.arange(len(ends))
+        )
+        data = pd.concat([data, gaps], ignore_index=True).take(positions)
+
+        kwargs["line_group"] = None
+
+        LOG.info(f"Merged {len(ends)} lines")
+
+        return data
+
+    def _prepare_image(self, kwargs):
+        if "img" not in kwargs:
+            return kwargs
+
+        pooling = kwargs.pop("pooling", None) or self._get_config("image_pooling")
+        img = kwargs["img"]
+
+        if pooling is None:
+            return kwargs
+
+        if hasattr(img, "dims"):
+            LOG.debug("Pooling is not supported for xarray images")
+            return kwargs
+
+        # data frames label the axes with their columns and index
+        if isinstance(img, pd.DataFrame):
+            labels = dict(kwargs.get("labels") or {})
+            if kwargs.get("x") is None:
+                kwargs["x"] = img.columns
+                labels.setdefault("x", img.columns.name or "")
+            if kwargs.get("y") is None:
+                kwargs["y"] = img.index
+                labels.setdefault("y", img.index.name or "")
+            kwargs["labels"] = labels
+
+        img = np.asarray(img)
+
+        if img.ndim not in (2, 3):
+            raise SpiralError(f"Unsupported image shape {img.shape}")
+
+        ratio = self._get_config("image_pixel_ratio")
+        factor_y, factor_x = pool_factors(
+            img.shape, self.plot_width * ratio, self.plot_height * ratio
+        )
+
+        if factor_y == factor_x == 1:
+            return kwargs
+
+        # keep the color scale of the full resolution image
+        color_keys = ("zmin", "zmax", "range_color", "color_continuous_midpoint")
+        if img.ndim == 2 and all(kwargs.get(x) is None for x in color_keys):
+            if img.dtype != bool:
+                kwargs["range_color"] = [np.nanmin(img), np.nanmax(img)]
+
+        pooled = pool_image(img, factor_y, factor_x, method=pooling)
+
+        # pixels are placed at the centre of their block
+        for key, axis, factor in (("x", 1, factor_x), ("y", 0, factor_y)):
+            values = kwargs.get(key)
+            if values is None:
+                values = np.arange(img.shape[axis])
+            kwargs[key] = pool_coordinates(values, factor)
+
+        LOG.info(
+            f"Pooled image of {img.shape[0]} x {img.shape[1]} pixels to"
+            f" {pooled.shape[0]} x {pooled.shape[1]} pixels"
+        )
+
+        kwargs["img"] = pooled
+
+        return kwargs
+
+    def _prepare_geometry(self, kwargs):
+        simplify = kwargs.pop("simplify", None)
+        geojson = kwargs.get("geojson")
+
+        if not isinstance(geojson, dict):
+            return kwargs
+
+        locations = kwargs.get("locations")
+        featureidkey = kwargs.get("featureidkey")
+
+        # only the referenced features are drawn
+        if locations is not None and "data_frame" in kwargs:
+            locations = kwargs["data_frame"][locations].dropna().unique()
+            kwargs["geojson"] = filter_features(geojson, locations, featureidkey)
+
+            LOG.info(
+                f"Kept {len(kwargs['geojson'].get('features', []))} of"
+                f" {len(geojson.get('features', []))} GeoJSON features"
+            )
+
+        if simplify is None:
+            return kwargs
+
+        if simplify == "auto":
+            tolerance = self._geometry_tolerance(kwargs)
+        elif isinstance(simplify, (int, float)) and not isinstance(simplify, bool):
+            tolerance = float(simplify)
+        else:
+            raise SpiralError(f"Unrecognised simplify tolerance '{simplify}'")
+
+        if tolerance is None:
+            return kwargs
+
+        # the whole feature collection is simplified so the result is
+        # cached for any locations
+        simplified = self.geometry.simplify(geojson, tolerance)
+
+        if locations is not None:
+            simplified = filter_features(simplified, locations, featureidkey)
+
+        kwargs["geojson"] = simplified
+
+        return kwargs
+
+    def _geometry_tolerance(self, kwargs):
+        # half a pixel of a Mapbox map at its zoom level, where the world
+        # is 512 pixels wide at zoom zero
+        if kwargs.get("zoom") is not None:
+            return 360 / (512 * 2 ** kwargs["zoom"]) / 2
+
+        # otherwise half a pixel of the referenced features drawn across
+        # the plot
+        bounds = geojson_bounds(kwargs["geojson"])
+
+        if bounds is None:
+            return None
+
+        extent = max(bounds[2] - bounds[0], bounds[3] - bounds[1])
+
+        return extent / self.plot_width / 2
+
+    def _prepare_trendline(self, kwargs):
+        trendline = kwargs.get("trendline")
+        options = kwargs.pop("trendline_options", None) or {}
+
+        if trendline is None:
+            return kwargs
+
+        if trendline not in ("ols", "rolling", "lowess"):
+            raise SpiralError(f"Unrecognised trendline '{trendline}'")
+
+        allowed = ("sample", "window", "frac", "nbins", "npoints")
+        for key in options:
+            if key not in allowed:
+                raise SpiralError(f"Unrecognised trendline option '{key}'")
+
+        # trendlines are fitted to the traces once the figure is built
+        # rather than by plotly express for each group
+        kwargs["trendline"] = None
+
+        patches = dict(kwargs.get("patches") or {})
+        patches["trendline"] = {"method": trendline, "options": options}
+        kwargs["patches"] = patches
+
+        return kwargs
+
+    @staticmethod
+    def _is_hierarchy(kwargs):
+        if "path" in kwargs:
+            return True
+
+        # funnels take the arguments of bars except the bar mode
+        keys = ("orientation", "text", "opacity")
+        return all(x in kwargs for x in keys) and "barmode" not in kwargs
+
+    def _prepare_aggregate(self, kwargs):
+        aggregate = kwargs.pop("aggregate", None)
+        min_share = kwargs.pop("min_share", None)
+
+        if aggregate is None or "data_frame" not in kwargs:
+            return kwargs
+
+        if "cumulative" in kwargs:
+            modes = ["bin1d"]
+        elif "boxmode" in kwargs or "violinmode" in kwargs:
+            modes = ["summary"]
+        elif self._is_hierarchy(kwargs):
+            modes = ["sum", "mean", "count"]
+        elif "lat" in kwargs and "mapbox_style" in kwargs:
+            modes = ["hexbin", "square"]
+        else:
+            modes = ["bin2d"]
+
+        if aggregate != "auto" and aggregate not in modes:
+            raise SpiralError(f"Unrecognised aggregate mode '{aggregate}'")
+
+        data = kwargs["data_frame"]
+
+        # small sectors can only be pruned from aggregated rows
+        small = len(data) <= self._get_config("aggregate_threshold")
+        if aggregate == "auto" and small and min_share is None:
+            return kwargs
+
+        mode = modes[0] if aggregate == "auto" else aggregate
+
+        if mode == "bin1d":
+            return self._prepare_histogram(kwargs, [data])
+
+        if mode == "summary":
+            return self._prepare_summary(kwargs)
+
+        if mode in ("sum", "mean", "count"):
+            return self._prepare_hierarchy(kwargs, mode, min_share)
+
+        if mode in ("hexbin", "square"):
+            return self._prepare_cells(kwargs, mode)
+
+        return self._prepare_bin2d(kwargs)
+
+    def _prepare_bin2d(self, kwargs):
+        data = kwargs["data_frame"]
+
+        x, y, z = kwargs.get("x"), kwargs.get("y"), kwargs.get("z")
+
+        if x is None or y is None:
+            raise SpiralError("Aggregation requires both 'x' and 'y'")
+
+        # split grouping columns from those aggregated within a bin
+        by = []
+        values = {}
+        for key in ("facet_row", "facet_col", "animation_frame", "color", "symbol"):
+            column = kwargs.get(key)
+
+            if column is None or column in by or column in values:
+                continue
+
+            series = data[column]
+            if pd.api.types.is_numeric_dtype(series) and not self._is_series_cat(
+                series
+            ):
+                values[column] = "mean"
+            else:
+                by.append(column)
+
+        # drop arguments that have no meaning for aggregated rows
+        keep = ["x", "y", "z", "facet_row", "facet_col", "animation_frame"]
+        keep += ["color", "symbol"]
+        drop = [x for x in self._meta.data_attributes if x not in keep]
+        drop += ["marginal_x", "marginal_y", "trendline"]
+
+        for key in drop:
+            if kwargs.get(key) is not None:
+                LOG.debug(f"Ignoring argument '{key}' for aggregated figure")
+                kwargs[key] = None
+
+        if "histfunc" in kwargs:
+            histfunc = "count" if z is None else kwargs["histfunc"] or "sum"
+        else:
+            histfunc = "count"
+
+        name = "count" if histfunc == "count" else z
+        if name in by or name in values:
+            name = f"{name}_"
+
+        nbins = self._get_config("aggregate_bins")
+
+        data, (xbins, ybins) = bin2d(
+            data,
+            x,
+            y,
+            nbinsx=kwargs.get("nbinsx") or nbins,
+            nbinsy=kwargs.get("nbinsy") or nbins,
+            by=by,
+            values=values,
+            histfunc=histfunc,
+            log_x=kwargs.get("log_x") is True,
+            log_y=kwargs.get("log_y") is True,
+            name=name,
+            column=z,
+        )
+
+        LOG.info(f"Aggregated {len(kwargs['data_frame'])} rows into {len(data)} bins")
+
+        kwargs["data_frame"] = data
+
+        # trendlines are fitted to the bins weighted by their counts
+        if "trendline" in (kwargs.get("patches") or {}) and histfunc == "count":
+            kwargs["patches"]["trendline"]["weights"] = (
+                "z" if "histfunc" in kwargs else "size"
+            )
+
+        if "histfunc" in kwargs:
+            # bins hold a single value so sums stay sums and the other
+            # functions return the aggregated value
+            kwargs["z"] = name
+            kwargs["histfunc"] = "sum" if histfunc in ("count", "sum") else histfunc
+
+            traces = {}
+            if xbins is not None:
+                traces["xbins"] = xbins
+            if ybins is not None:
+                traces["ybins"] = ybins
+
+            patches = dict(kwargs.get("patches") or {})
+            traces.update(patches.get("traces", {}))
+            patches["traces"] = traces
+            kwargs["patches"] = patches
+        else:
+            kwargs["size"] = name
+
+        return kwargs
+
+    def _prepare_cells(self, kwargs, shape):
+        data = kwargs["data_frame"]
+
+        lat, lon, z = kwargs.get("lat"), kwargs.get("lon"), kwargs.get("z")
+
+        if lat is None or lon is None:
+            raise SpiralError("Aggregation requires both 'lat' and 'lon'")
+
+        # split grouping columns from those aggregated within a cell
+        by = []
+        values = {}
+        for key in ("animation_frame", "color"):
+            column = kwargs.get(key)
+
+            if column is None or column in by or column in values:
+                continue
+
+            series = data[column]
+            if pd.api.types.is_numeric_dtype(series) and not self._is_series_cat(
+                series
+            ):
+                values[column] = "mean"
+            else:
+                by.append(column)
+
+        # drop arguments that have no meaning for aggregated rows
+        keep = ["lat", "lon", "z", "color", "animation_frame"]
+        drop = [x for x in self._meta.data_attributes if x not in keep]
+
+        for key in drop:
+            if kwargs.get(key) is not None:
+                LOG.debug(f"Ignoring argument '{key}' for aggregated figure")
+                kwargs[key] = None
+
+        histfunc = "count" if z is None else "sum"
+        name = "count" if z is None else z
+        if name in by or name in values:
+            name = f"{name}_"
+
+        # cells are a few pixels wide at the map zoom, where the world is
+        # 512 pixels wide at zoom zero
+        pixel = 360 / (512 * 2 ** (kwargs.get("zoom") or 0))
+        size = pixel * self._get_config("aggregate_cell_pixels")
+
+        data, size = bin_map(
+            data,
+            lat,
+            lon,
+            size,
+            shape=shape,
+            by=by,
+            values=values,
+            histfunc=histfunc,
+            name=name,
+            column=z,
+            max_cells=self._get_config("aggregate_max_cells"),
+        )
+
+        LOG.info(f"Aggregated {len(kwargs['data_frame'])} rows into {len(data)} cells")
+
+        kwargs["data_frame"] = data
+
+        if "radius" in kwargs:
+            # the density of each cell spreads over its neighbours
+            kwargs["z"] = name
+            if kwargs.get("radius") is None:
+                kwargs["radius"] = max(round(size / pixel), 1)
+        else:
+            kwargs["size"] = name
+
+        return kwargs
+
+    def _prepare_summary(self, kwargs):
+        data = kwargs["data_frame"]
+
+        if kwargs.get("orientation") == "h":
+            value, position = "x", "y"
+        else:
+            value, position = "y", "x"
+
+        column = kwargs.get(value)
+
+        if column is None:
+            raise SpiralError(f"Summary statistics require '{value}'")
+
+        by = []
+        for key in (position, "color", "facet_row", "facet_col"):
+            if kwargs.get(key) is not None and kwargs[key] not in by:
+                by.append(kwargs[key])
+
+        # drop arguments that have no meaning for summarized rows
+        keep = ["x", "y", "color", "facet_row", "facet_col"]
+        drop = [x for x in self._meta.data_attributes if x not in keep]
+
+        for key in drop:
+            if kwargs.get(key) is not None:
+                LOG.debug(f"Ignoring argument '{key}' for summarized figure")
+                kwargs[key] = None
+
+        stats = summarize(
+            data,
+            column,
+            by=by,
+            max_outliers=self._get_config("summary_outliers"),
+            kde_points=(
+                self._get_config("kde_points") if "violinmode" in kwargs else None
+            ),
+        )
+
+        LOG.info(f"Summarized {len(data)} rows into {len(stats)} groups")
+
+        # the figure is built from one row per group, which refers to its
+        # statistics through the custom data
+        rows = stats[by].copy()
+        rows[column] = stats["median"]
+        rows["summary_row"] = np.arange(len(stats))
+
+        kwargs["data_frame"] = rows
+        kwargs["custom_data"] = ["summary_row"]
+
+        patches = dict(kwargs.get("patches") or {})
+        patches["summary"] = stats
+        kwargs["patches"] = patches
+
+        return kwargs
+
+    def _prepare_hierarchy(self, kwargs, aggfunc, min_share=None):
+        data = kwargs["data_frame"]
+
+        if "path" in kwargs:
+            if not kwargs.get("path"):
+                LOG.debug("Aggregation requires 'path'")
+                return kwargs
+
+            value_key = "values"
+        elif kwargs.get("orientation") == "h":
+            value_key = "x"
+        else:
+            value_key = "y"
+
+        value = kwargs.get(value_key)
+
+        if value is None and aggfunc != "count":
+            raise SpiralError(f"Aggregation requires '{value_key}'")
+
+        # numeric colors of sectors are averaged weighted by their values
+        color = kwargs.get("color")
+        weighted = (
+            "path" in kwargs
+            and color is not None
+            and color not in kwargs["path"]
+            and pd.api.types.is_numeric_dtype(data[color])
+            and not self._is_series_cat(data[color])
+        )
+
+        # every other column splits the rows, which leaves plotly express
+        # to aggregate them as it would the raw rows
+        by = [
+            x
+            for x in self._referenced_columns(kwargs, data)
+            if x != value and not (weighted and x == color)
+        ]
+
+        if aggfunc == "count" or value is None:
+            weights = pd.Series(1.0, index=data.index)
+        else:
+            weights = data[value].astype(float)
+
+        totals = pd.DataFrame(
+            {"count": 1, "sum": weights, "weight": weights.where(weights.notna(), 0)},
+            index=data.index,
+        )
+        if weighted:
+            totals["color"] = data[color] * totals["weight"]
+
+        grouped = totals.groupby(
+            [data[x] for x in by], sort=False, dropna=False, observed=True
+        ).sum()
+
+        if min_share is not None and "path" in kwargs:
+            grouped = self._prune_sectors(grouped, kwargs["path"], min_share)
+
+        rows = grouped.index.to_frame(index=False)
+
+        name = "count" if aggfunc == "count" else value
+        if name in by:
+            name = f"{name}_"
+
+        if aggfunc == "mean":
+            rows[name] = (grouped["sum"] / grouped["count"]).values
+        else:
+            rows[name] = grouped[aggfunc].values
+
+        if weighted:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rows[color] = (grouped["color"] / grouped["weight"]).values
+
+        LOG.info(f"Aggregated {len(data)} rows into {len(rows)} rows")
+
+        kwargs["data_frame"] = rows
+        kwargs[value_key] = name
+
+        return kwargs
+
+    def _prune_sectors(self, grouped, path, min_share):
+        leaf = path[-1]
+        share = grouped["sum"] / grouped["sum"].sum()
+        small = (share < min_share).values
+
+        keys = grouped.index.to_frame(index=False)
+        small &= keys[leaf].notna().values
+
+        if small.sum() < 2:
+            return grouped
+
+        # group the small leaves of each parent into a single leaf
+        other = self._get_config("other_category")
+        for column in keys.columns:
+            if column == leaf:
+                keys[column] = keys[column].astype(object).where(~small, other)
+            elif column not in path:
+                keys[column] = keys[column].astype(object).where(~small, "(?)")
+
+        LOG.info(f"Grouped {small.sum()} small sectors into '{other}'")
+
+        grouped = grouped.reset_index(drop=True)
+
+        return grouped.groupby(
+            [keys[x] for x in keys.columns], sort=False, dropna=False, observed=True
+        ).sum()
+
     def _prepare_title(self, kwargs):
         title = kwargs["title"] or None
         subtitle = kwargs.pop("subtitle") or None
@@ -532,18 +2028,17 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
             facet_row = kwargs.get("facet_row")
 
             if facet_col is not None:
-                facet_ncols = data[facet_col].nunique()
+                facet_ncols = self._nunique(data[facet_col])
                 figure_ncols = facet_ncols
 
             if facet_row is not None:
-                facet_nrows = data[facet_row].nunique()
+                facet_nrows = self._nunique(data[facet_row])
                 figure_nrows = facet_nrows
 
             # determine facet column wrapping
             facet_col_wrap = None
 
             if facet_ncols > 1 and facet_nrows == 1:
-                self.facet_ncols = facet_ncols
                 facet_col_wrap = kwargs.get("facet_col_wrap") or None
 
                 # column wrapping defined by user
@@ -564,14 +2059,16 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
                                 figure_ncols = ncols
                                 figure_nrows = nrows
 
-        self.figure_ncols = figure_ncols
-        self.figure_nrows = figure_nrows
-        self.facet_ncols = facet_ncols
+        grid = {
+            "facet_ncols": facet_ncols,
+            "figure_ncols": figure_ncols,
+            "figure_nrows": figure_nrows,
+        }
 
         if "facet_col_wrap" in kwargs:
             kwargs["facet_col_wrap"] = facet_col_wrap
 
-        return kwargs
+        return kwargs, grid
 
     def _prepare_labels(self, kwargs):
         if not isinstance(kwargs["labels"], dict):
@@ -579,11 +2076,11 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
 
         labels = {}
         if "data_frame" in kwargs:
-            columns = kwargs["data_frame"].columns.tolist()
+            columns = self._referenced_columns(kwargs, kwargs["data_frame"])
             labels = {
                 x: self._title_case(self._clean_text(x))
                 for x in columns
-                if x not in kwargs["labels"]
+                if isinstance(x, str) and x not in kwargs["labels"]
             }
 
         labels.update(kwargs["labels"])
@@ -599,7 +2096,7 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
                 kwargs["category_orders"] = {}
 
             category_orders = {}
-            for column in data:
+            for column in self._referenced_columns(kwargs, data):
                 if column in kwargs["category_orders"]:
                     continue
 
@@ -611,6 +2108,7 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
                     categories.sort()
                     category_orders[column] = categories.tolist()
 
+            category_orders.update(kwargs["category_orders"])
             kwargs["category_orders"] = category_orders
 
         return kwargs
@@ -652,12 +2150,18 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
         if "note" in kwargs:
             patches["note"] = kwargs.pop("note")
 
-        patches.update(kwargs["patches"])
+        # merge option patches so given options override computed ones
+        for key, value in kwargs["patches"].items():
+            if isinstance(value, dict) and isinstance(patches.get(key), dict):
+                patches[key] = {**patches[key], **value}
+            else:
+                patches[key] = value
+
         kwargs["patches"] = patches
 
         return kwargs
 
-    def _update_sizes(self):
+    def _make_context(self, args, patches, figure, grid):
         # calculate figure width, height and margins
         default_margin = self._get_config("border_margin")
         left_margin = default_margin
@@ -665,49 +2169,51 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
         top_margin = default_margin
         bottom_margin = default_margin
 
-        if "x" in self.args:
+        if "x" in args:
             bottom_margin += self._get_config("axis_margin")
 
-        if "y" in self.args:
+        if "y" in args:
             left_margin += self._get_config("axis_margin")
 
         title_margin = top_margin + self.font_size_px
-        if self.args["title"] is not None and "<br><sup>" in self.args["title"]:
+        if args["title"] is not None and "<br><sup>" in args["title"]:
             spacing = 0.236 * self.font_size
             title_margin += self.subfont_size_px + spacing
         title_margin = round(title_margin)
 
         note_margin = round(self.font_size_px * 2 / 3 + 10)
 
-        self.figure.for_each_trace(self._has_legend)
+        legend_or_colorbar = any(self._has_legend(trace) for trace in figure.data)
+
+        if "coloraxis" in figure.layout:
+            legend_or_colorbar = True
 
-        if "coloraxis" in self.figure.layout:
-            self.legend_or_colorbar = True
+        figure_ncols = grid["figure_ncols"]
+        figure_nrows = grid["figure_nrows"]
 
         if self._get_config("sizing") == "plot":
+            panel_width = self.plot_width
+            panel_height = self.plot_height
+
             # apply facet plot scaling
-            if self.figure_ncols > 1 or self.figure_nrows > 1:
-                self.plot_width *= self._get_config("facet_scale")
-                self.plot_height *= self._get_config("facet_scale")
+            if figure_ncols > 1 or figure_nrows > 1:
+                panel_width *= self._get_config("facet_scale")
+                panel_height *= self._get_config("facet_scale")
 
-            figure_width = (
-                left_margin + self.plot_width * self.figure_ncols + right_margin
-            )
-            figure_height = (
-                top_margin + self.plot_height * self.figure_nrows + bottom_margin
-            )
-            plot_width = self.plot_width * self.figure_ncols
-            plot_height = self.plot_height * self.figure_nrows
+            figure_width = left_margin + panel_width * figure_ncols + right_margin
+            figure_height = top_margin + panel_height * figure_nrows + bottom_margin
+            plot_width = panel_width * figure_ncols
+            plot_height = panel_height * figure_nrows
 
-            if self.args["title"] is not None:
+            if args["title"] is not None:
                 figure_height += title_margin
                 top_margin += title_margin
 
-            if self.patches["note"] is not None:
+            if patches.get("note") is not None:
                 figure_height += note_margin
                 bottom_margin += note_margin
 
-            if self.legend_or_colorbar is True:
+            if legend_or_colorbar is True:
                 figure_width += self._get_config("legend_margin")
                 right_margin += self._get_config("legend_margin")
         else:
@@ -716,102 +2222,471 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
             plot_width = self.figure_width - (left_margin + right_margin)
             plot_height = self.figure_height - (top_margin + bottom_margin)
 
-            if self.args["title"] is not None:
+            if args["title"] is not None:
                 plot_height -= title_margin
                 top_margin += title_margin
 
-            if self.patches["note"] is not None:
+            if patches.get("note") is not None:
                 plot_height -= note_margin
                 bottom_margin += note_margin
 
-            if self.legend_or_colorbar is True:
+            if legend_or_colorbar is True:
                 plot_width -= self._get_config("legend_margin")
                 right_margin += self._get_config("legend_margin")
 
-        self.figure_width = figure_width
-        self.figure_height = figure_height
-        self.plot_width = plot_width
-        self.plot_height = plot_height
+        return RenderContext(
+            args=args,
+            patches=patches,
+            figure=figure,
+            facet_ncols=grid["facet_ncols"],
+            figure_ncols=figure_ncols,
+            figure_nrows=figure_nrows,
+            legend_or_colorbar=legend_or_colorbar,
+            figure_width=figure_width,
+            figure_height=figure_height,
+            plot_width=plot_width,
+            plot_height=plot_height,
+            left_margin=left_margin,
+            right_margin=right_margin,
+            top_margin=top_margin,
+            bottom_margin=bottom_margin,
+        )
+
+    def _update_summary(self, context):
+        if "summary" not in context.patches:
+            return context
+
+        figure_dict = context.figure.to_dict()
+
+        if "violinmode" in context.args:
+            self._summary_violins(context, figure_dict)
+        else:
+            self._summary_boxes(context, figure_dict)
+
+        return context._replace(figure=_figure_from_dict(context.figure, figure_dict))
+
+    def _update_trendlines(self, context):
+        if "trendline" not in context.patches:
+            return context
+
+        figure_dict = context.figure.to_dict()
+        figure_dict["data"] = self._trendline_traces(context, figure_dict["data"])
+
+        for frame in figure_dict.get("frames", []):
+            frame["data"] = self._trendline_traces(context, frame["data"])
+
+        return context._replace(figure=_figure_from_dict(context.figure, figure_dict))
+
+    def _trendline_traces(self, context, traces):
+        args = context.args
+        trendline = context.patches["trendline"]
+        method = trendline["method"]
+
+        # marginal traces are not fitted
+        fitted = [
+            trace
+            for trace in traces
+            if trace.get("type") in ("scatter", "scattergl", "histogram2dcontour")
+            and trace.get("x") is not None
+            and trace.get("y") is not None
+        ]
+
+        if not fitted:
+            return traces
+
+        # fit the points of every trace at once
+        lengths = [len(trace["x"]) for trace in fitted]
+        codes = np.repeat(np.arange(len(fitted)), lengths)
+        x = pd.Series(np.concatenate([np.asarray(t["x"]) for t in fitted]))
+        y = pd.Series(np.concatenate([np.asarray(t["y"]) for t in fitted]))
+
+        x, y = x.infer_objects(), y.infer_objects()
+        for series in (x, y):
+            numeric = pd.api.types.is_numeric_dtype(series)
+            if not numeric and not pd.api.types.is_datetime64_any_dtype(series):
+                raise SpiralError("Trendlines require numeric or date values")
+
+        missing = x.isna().values
+        x, dtype = _to_numeric(x)
+        x[missing] = np.nan
+
+        weights = None
+        if trendline.get("weights") == "size":
+            weights = np.concatenate([t["marker"]["size"] for t in fitted])
+        elif trendline.get("weights") == "z":
+            weights = np.concatenate([t["z"] for t in fitted])
+
+        lines = trendlines(
+            x,
+            y.to_numpy(dtype=float, na_value=np.nan),
+            codes,
+            method=method,
+            weights=weights,
+            log_x=args.get("log_x") is True,
+            **trendline["options"],
+        )
+
+        labels = args.get("labels") or {}
+        x_label = labels.get(args.get("x"), args.get("x") or "x")
+        y_label = labels.get(args.get("y"), args.get("y") or "y")
+
+        data = []
+        lines = iter(lines.itertuples())
+        fitted = {id(trace) for trace in fitted}
+        for trace in traces:
+            data.append(trace)
+
+            if id(trace) not in fitted:
+                continue
+
+            line = next(lines)
+            if len(line.x) == 0:
+                continue
+
+            if method == "ols":
+                header = (
+                    f"<b>OLS trendline</b><br>{y_label} = {line.slope:g} *"
+                    f" {x_label} + {line.intercept:g}<br>"
+                    f"R<sup>2</sup>={line.rsquared:f}<br><br>"
+                )
+            elif method == "rolling":
+                header = "<b>Rolling mean trendline</b><br><br>"
+            else:
+                header = "<b>LOWESS trendline</b><br><br>"
+
+            # keep the group names at the start of the trace hover text
+            groups = ""
+            for part in (trace.get("hovertemplate") or "").split("<br>"):
+                if "%{" in part:
+                    break
+                groups += f"{part}<br>"
+
+            color = args.get("trendline_color_override")
+            if color is None:
+                color = trace.get("marker", {}).get("color")
+            if not isinstance(color, str):
+                color = trace.get("line", {}).get("color")
+
+            data.append(
+                {
+                    "type": "scattergl" if trace["type"] == "scattergl" else "scatter",
+                    "mode": "lines",
+                    "x": _from_numeric(line.x, dtype),
+                    "y": line.y,
+                    "name": trace.get("name"),
+                    "legendgroup": trace.get("legendgroup"),
+                    "showlegend": False,
+                    "xaxis": trace.get("xaxis"),
+                    "yaxis": trace.get("yaxis"),
+                    "line": {"color": color} if isinstance(color, str) else {},
+                    "hovertemplate": (
+                        f"{header}{groups}{x_label}=%{{x}}<br>{y_label}=%{{y}}"
+                        " <b>(trend)</b><extra></extra>"
+                    ),
+                }
+            )
+
+        return data
+
+    @staticmethod
+    def _summary_axes(context):
+        if context.args.get("orientation") == "h":
+            return "x", "y"
+
+        return "y", "x"
+
+    def _summary_boxes(self, context, figure_dict):
+        stats = context.patches["summary"]
+        value, _ = self._summary_axes(context)
+
+        for trace in figure_dict["data"]:
+            rows = stats.iloc[np.asarray(trace.pop("customdata"))[:, -1]]
+
+            for name in ("q1", "median", "q3", "lowerfence", "upperfence"):
+                trace[name] = rows[name].values
+
+            if context.args.get("notched"):
+                trace["notchspan"] = rows["notchspan"].values
+
+            # the selected outliers are the only sample points
+            trace[value] = [x.tolist() for x in rows["outliers"]]
+            trace.pop("hovertemplate", None)
+
+        # nested sample arrays would otherwise be taken as categories
+        for name, axis in figure_dict["layout"].items():
+            if name.startswith(f"{value}axis"):
+                axis.setdefault("type", "linear")
+
+    def _summary_violins(self, context, figure_dict):
+        # violins are drawn as filled outlines on a numeric position axis
+        # as plotly.js can not draw violins from precomputed densities
+        args = context.args
+        value, position = self._summary_axes(context)
+        column = args.get(position)
+
+        categories = []
+        if column is not None:
+            categories = list(args["category_orders"].get(column, []))
+            for trace in figure_dict["data"]:
+                for category in trace.get(position, []):
+                    if category not in categories:
+                        categories.append(category)
+
+        names = []
+        for trace in figure_dict["data"]:
+            if trace.get("name") not in names:
+                names.append(trace.get("name"))
+
+        # violins of each color are placed side by side in group mode
+        grouped = args.get("violinmode") == "group"
+        grouped = grouped and args.get("color") not in (None, column)
+        slot = 0.7 / len(names) if grouped else 0.7
+
+        data = []
+        for trace in figure_dict["data"]:
+            offset = -0.35 + slot / 2
+            if grouped:
+                offset += slot * names.index(trace.get("name"))
+
+            if column is None:
+                centers = np.full(len(trace["customdata"]), offset)
+            else:
+                centers = np.array(
+                    [categories.index(x) + offset for x in trace[position]]
+                )
+
+            half_width = slot / 2 * (0.7 if grouped else 1)
+            data += self._violin_traces(context, trace, centers, half_width)
+
+        figure_dict["data"] = data
+
+        axis_options = {
+            "type": "linear",
+            "tickmode": "array",
+            "tickvals": list(range(len(categories))),
+            "ticktext": [str(x) for x in categories],
+            "range": [-0.5, max(len(categories), 1) - 0.5],
+            "zeroline": False,
+        }
+
+        for name, axis in figure_dict["layout"].items():
+            if name.startswith(f"{position}axis"):
+                axis.update(axis_options)
+
+    def _violin_traces(self, context, trace, centers, half_width):
+        args = context.args
+        rows = context.patches["summary"].iloc[np.asarray(trace["customdata"])[:, -1]]
+        value, position = self._summary_axes(context)
+        color = trace.get("marker", {}).get("color")
+
+        common = {
+            "name": trace.get("name"),
+            "legendgroup": trace.get("legendgroup"),
+            "xaxis": trace.get("xaxis"),
+            "yaxis": trace.get("yaxis"),
+            "marker": {"color": color},
+        }
+
+        outline = {position: [], value: []}
+        for center, grid, density in zip(centers, rows["grid"], rows["density"]):
+            width = density / density.max() * half_width
+            outline[position] += [*(center - width), *(center + width)[::-1], None]
+            outline[value] += [*grid, *grid[::-1], None]
+
+        fillcolor = None
+        if isinstance(color, str):
+            alpha = self._get_config("marker_color_alpha")
+            fillcolor = _marker_colors(color, alpha)["color"]
+
+        traces = [
+            {
+                "type": "scatter",
+                "mode": "lines",
+                "fill": "toself",
+                "fillcolor": fillcolor,
+                "line": {"color": color},
+                "hoveron": "fills",
+                "hoverinfo": "name",
+                "showlegend": trace.get("showlegend"),
+                **outline,
+                **common,
+            }
+        ]
+
+        if args.get("box"):
+            traces.append(
+                {
+                    "type": "box",
+                    position: centers,
+                    "q1": rows["q1"].values,
+                    "median": rows["median"].values,
+                    "q3": rows["q3"].values,
+                    "lowerfence": rows["lowerfence"].values,
+                    "upperfence": rows["upperfence"].values,
+                    "width": half_width / 2,
+                    "boxpoints": False,
+                    "orientation": args.get("orientation"),
+                    "showlegend": False,
+                    **common,
+                }
+            )
 
-        self.left_margin = left_margin
-        self.right_margin = right_margin
-        self.top_margin = top_margin
-        self.bottom_margin = bottom_margin
+        if args.get("points") is not False:
+            traces.append(
+                {
+                    "type": "scatter",
+                    "mode": "markers",
+                    position: np.repeat(centers, [len(x) for x in rows["outliers"]]),
+                    value: np.concatenate(list(rows["outliers"])),
+                    "showlegend": False,
+                    **common,
+                }
+            )
 
-    def _update_layout(self):
+        return traces
+
+    def _update_layout(self, context):
         border_margin = self._get_config("border_margin")
 
         layout_options = {
-            "width": self.figure_width,
-            "height": self.figure_height,
-            "margin_l": self.left_margin,
-            "margin_r": self.right_margin,
-            "margin_t": self.top_margin,
-            "margin_b": self.bottom_margin,
-            "title_x": self.figure_x(0, border_margin),
-            "title_y": self.figure_y(1, -(border_margin + self.font_size)),
+            "width": context.figure_width,
+            "height": context.figure_height,
+            "margin_l": context.left_margin,
+            "margin_r": context.right_margin,
+            "margin_t": context.top_margin,
+            "margin_b": context.bottom_margin,
+            "title_x": context.figure_x(0, border_margin),
+            "title_y": context.figure_y(1, -(border_margin + self.font_size)),
             "title_xref": "container",
             "title_yref": "container",
             "title_xanchor": "left",
             "title_yanchor": "bottom",
-            "legend_x": self.plot_x(1, border_margin),
-            "legend_y": self.plot_y(1, 0),
+            "legend_x": context.plot_x(1, border_margin),
+            "legend_y": context.plot_y(1, 0),
             "legend_xanchor": "left",
             "legend_yanchor": "top",
-            "coloraxis_colorbar_x": self.plot_x(1, border_margin),
-            "coloraxis_colorbar_y": self.plot_y(1, 0),
+            "coloraxis_colorbar_x": context.plot_x(1, border_margin),
+            "coloraxis_colorbar_y": context.plot_y(1, 0),
             "coloraxis_colorbar_xanchor": "left",
             "coloraxis_colorbar_yanchor": "top",
         }
 
-        if "layout" in self.patches:
-            layout_options.update(self.patches["layout"])
+        if "layout" in context.patches:
+            layout_options.update(context.patches["layout"])
+
+        context.figure.update_layout(**layout_options)
 
-        self.figure.update_layout(**layout_options)
+        # compute the annotation and colorbar patches first and apply them
+        # in a single update rather than validating each annotation
+        annotation_options = {}
+        if "annotations" in context.patches:
+            annotation_options = go.layout.Annotation(
+                context.patches["annotations"]
+            ).to_plotly_json()
 
-        self.figure.for_each_annotation(self._update_annotation)
+        annotations = []
+        for annotation in context.figure.layout.annotations:
+            options = _merge_options(annotation.to_plotly_json(), annotation_options)
+            options["text"] = self._title_case(
+                self._clean_text(annotation.text.split("=")[-1])
+            )
+            annotations.append(options)
 
-        self._update_title_text(self.figure.layout.coloraxis.colorbar)
+        colorbar_title_text = self._format_title(
+            context, context.figure.layout.coloraxis.colorbar.title.text
+        )
+
+        context.figure.layout.annotations = annotations
+
+        if colorbar_title_text is not None:
+            context.figure.update_layout(
+                coloraxis_colorbar_title_text=colorbar_title_text
+            )
+
+    def _update_axes(self, context):
+        args = context.args
+        figure = context.figure
 
-    def _update_axes(self):
         # add xaxis tick labels and titles back to overhanging plots
         # in facet column figures
-        if self.args.get("x") is not None and self.args["facet_col_wrap"] is not None:
-            xaxis_title_text = self.args["labels"][self.args["x"]]
+        overhanging = set()
+        if args.get("x") is not None and args.get("facet_col_wrap") is not None:
+            first_col = context.facet_ncols % context.figure_ncols
+            for col in range(first_col, context.figure_ncols):
+                for axis in figure.select_xaxes(col=col + 1, row=2):
+                    overhanging.add(axis.plotly_name)
+
+        # compute the options of every axis and apply them in one update
+        layout_options = {}
+        for axis in chain(figure.select_xaxes(), figure.select_yaxes()):
+            options = {}
+            title_text = axis.title.text
+
+            if axis.plotly_name in overhanging:
+                options["showticklabels"] = True
+                title_text = args["labels"][args["x"]]
+
+            title_text = self._format_title(context, title_text)
+            if title_text is not None:
+                options["title_text"] = title_text
+
+            # apply patches to all axes
+            options.update(context.patches.get(axis.plotly_name[:5], {}))
+
+            layout_options[axis.plotly_name] = options
+
+        figure.update_layout(layout_options)
 
-            def _show_axis(axis):
-                axis.update(showticklabels=True, title_text=xaxis_title_text)
+    def _update_traces(self, context):
+        figure = context.figure
+        patches = context.patches
 
-            for col in range(self.facet_ncols % self.figure_ncols, self.figure_ncols):
-                self.figure.for_each_xaxis(_show_axis, col=col + 1, row=2)
+        # validate each patch once per trace type rather than once per trace
+        validated = {}
 
-        self.figure.for_each_xaxis(self._update_title_text)
-        self.figure.for_each_yaxis(self._update_title_text)
+        def _validate(trace, name):
+            key = (type(trace), name)
+            if key not in validated:
+                validated[key] = _validate_trace_options(trace, patches[name])
 
-        # apply patches all axes
-        axis_options = {}
-        if "xaxis" in self.patches:
-            axis_options.update(self.patches["xaxis"])
+            return validated[key]
 
-        self.figure.update_xaxes(**axis_options)
+        options = [{} for _ in figure.data]
 
-        axis_options = {}
-        if "yaxis" in self.patches:
-            axis_options.update(self.patches["yaxis"])
+        if "data" in patches:
+            for i, patch in enumerate(patches["data"]):
+                patch = _validate_trace_options(figure.data[i], patch)
+                _merge_options(options[i], patch)
 
-        self.figure.update_yaxes(**axis_options)
+        alpha = self._get_config("marker_color_alpha")
 
-    def _update_traces(self):
-        if "data" in self.patches:
-            for i, options in enumerate(self.patches["data"]):
-                self.figure.data[i].update(options)
+        for trace, trace_options in zip(figure.data, options):
+            if "traces" in patches:
+                _merge_options(trace_options, _validate(trace, "traces"))
 
-        if "traces" in self.patches:
-            self.figure.update_traces(self.patches["traces"])
+            if trace.type not in ("scatter", "box", "violin"):
+                continue
+
+            color = trace_options.get("marker", {}).get("color", trace.marker.color)
 
-        self.figure.for_each_trace(self._update_markers)
+            if "markers" in patches:
+                _merge_options(trace_options, _validate(trace, "markers"))
+
+            if isinstance(color, str):
+                _merge_options(trace_options, {"marker": _marker_colors(color, alpha)})
+            else:
+                # what to do for color tuple?
+                pass
 
-    def _add_logo(self):
+        # build the figure from its dictionary so the options, which are
+        # already valid, are not validated again for every trace
+        figure_dict = figure.to_dict()
+        for trace, trace_options in zip(figure_dict["data"], options):
+            _merge_options(trace, trace_options)
+
+        return context._replace(figure=_figure_from_dict(context.figure, figure_dict))
+
+    def _add_logo(self, context):
         if self._get_config("show_logo") is False:
             return
 
@@ -828,7 +2703,7 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
             "yref": "paper",
             "sizing": "contain",
             "x": 1,
-            "y": self.plot_y(1, self._get_config("border_margin")),
+            "y": context.plot_y(1, self._get_config("border_margin")),
             "sizex": sizex,  # * self.figure_xscale,
             "sizey": sizey,  # * self.figure_yscale,
             "xanchor": "right",
@@ -836,17 +2711,17 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
         }
 
         kwargs = defaults.copy()
-        if "logo" in self.patches:
-            kwargs.update(self.patches["logo"])
+        if "logo" in context.patches:
+            kwargs.update(context.patches["logo"])
 
         if kwargs["source"] is not None:
-            self.figure.add_layout_image(**kwargs)
+            context.figure.add_layout_image(**kwargs)
 
-    def _add_watermark(self):
+    def _add_watermark(self, context):
         if self._get_config("show_watermark") is False:
             return
 
-        textangle = (self.figure_height - 600 * 0.5) * -9 / 70
+        textangle = (context.figure_height - 600 * 0.5) * -9 / 70
 
         if abs(textangle) > 45:
             font_size = int(75)  # / self.figure_yscale)
@@ -868,25 +2743,28 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
         }
 
         kwargs = defaults.copy()
-        if "watermark" in self.patches:
-            kwargs.update(self.patches["watermark"])
+        if "watermark" in context.patches:
+            kwargs.update(context.patches["watermark"])
 
-        self.figure.add_annotation(**kwargs)
+        context.figure.add_annotation(**kwargs)
 
-    def _add_note(self):
-        if self.patches.get("note") is None:
+    def _add_note(self, context):
+        if context.patches.get("note") is None:
             return
 
+        note = context.patches["note"]
+        if not isinstance(note, dict):
+            note = {"text": note}
+
         axis_margin = self._get_config("axis_margin")
         border_margin = 10
 
         defaults = {
             "name": "note",
-            "text": self.patches["note"],
             "opacity": 0.85,
             "font_size": self.font_size * 2 / 3,
-            "x": self.plot_x(0, border_margin - axis_margin),
-            "y": self.plot_y(0, -axis_margin),
+            "x": context.plot_x(0, border_margin - axis_margin),
+            "y": context.plot_y(0, -axis_margin),
             "xref": "paper",
             "yref": "paper",
             "xanchor": "left",
@@ -895,10 +2773,9 @@ class PlotlyPlotHandler(PlotlyExpress, PlotHandler):
         }
 
         kwargs = defaults.copy()
-        if "note" in self.patches:
-            kwargs.update(self.patches["note"])
+        kwargs.update(note)
 
-        self.figure.add_annotation(**kwargs)
+        context.figure.add_annotation(**kwargs)
 
 
 def load(app):
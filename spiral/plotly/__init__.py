@@ -2,6 +2,8 @@
 Spiral Plotly subpackage.
 """
 
+from ._cache import FigureCache
 from ._express import PlotlyExpress
+from ._stats import ColumnStatsCache
 
-__all__ = ["PlotlyExpress"]
+__all__ = ["ColumnStatsCache", "FigureCache", "PlotlyExpress"]
@@ -0,0 +1,387 @@
+"""
+Spiral plotly aggregation module.
+"""
+
+import numpy as np
+import pandas as pd
+
+HISTFUNCS = {"sum": "sum", "avg": "mean", "min": "min", "max": "max"}
+
+
+def _to_numeric(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.values.view("i8").astype(float), series.dtype
+
+    return series.to_numpy(dtype=float, na_value=np.nan), None
+
+
+def _from_numeric(values, dtype):
+    if dtype is None:
+        return values
+
+    return pd.Series(np.round(values).astype("i8")).astype(dtype).values
+
+
+def bin_edges(values, nbins, log=False):
+    """
+    Get equal width bin edges covering an array.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        The finite values to cover.
+    nbins : int
+        The number of bins.
+    log : bool
+        If ``True`` the bins have equal width in log10 space.
+
+    Returns
+    -------
+    numpy.ndarray
+        The ``nbins + 1`` bin edges, which span zero to one (one to ten
+        if ``log``) if there are no values.
+
+    """
+    if len(values) == 0:
+        start, end = 0.0, 1.0
+    else:
+        if log:
+            values = np.log10(values)
+
+        start, end = values.min(), values.max()
+
+    if start == end:
+        start, end = start - 0.5, end + 0.5
+
+    edges = np.linspace(start, end, nbins + 1)
+
+    return 10**edges if log else edges
+
+
+def bin_codes(values, edges, log=False):
+    """
+    Get the bin index of each value.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        The values to bin.
+    edges : numpy.ndarray
+        The bin edges from :func:`bin_edges`.
+    log : bool
+        If ``True`` the bins have equal width in log10 space.
+
+    Returns
+    -------
+    numpy.ndarray
+        An integer array of bin indices in ``[0, len(edges) - 2]``.
+
+    """
+    if log:
+        values, edges = np.log10(values), np.log10(edges)
+
+    nbins = len(edges) - 1
+    width = (edges[-1] - edges[0]) / nbins
+    codes = np.floor((values - edges[0]) / width).astype(np.int64)
+
+    return np.clip(codes, 0, nbins - 1)
+
+
+def bin_centers(edges, log=False):
+    """
+    Get the centre of each bin.
+    """
+    if log:
+        return 10 ** ((np.log10(edges[:-1]) + np.log10(edges[1:])) / 2)
+
+    return (edges[:-1] + edges[1:]) / 2
+
+
+def _aggregate(data, keys, by, values, histfunc, name, column=None):
+    """
+    Reduce the rows of a data frame grouped by columns and two bin codes.
+
+    Returns the grouped rows with the ``by`` columns, the bin codes as
+    ``_x`` and ``_y`` and the aggregated columns.
+    """
+    values = dict(values)
+    columns = {x: data[x].values for x in values}
+
+    if histfunc == "count":
+        columns[name] = np.ones(len(data), dtype=np.int64)
+        values[name] = "sum"
+    else:
+        columns[name] = data[name if column is None else column].values
+        values[name] = HISTFUNCS[histfunc]
+
+    keys = [data[column].values for column in by] + list(keys)
+
+    grouped = pd.DataFrame(columns).groupby(keys, sort=False, observed=True)
+    result = grouped.agg(values).reset_index()
+    result.columns = by + ["_x", "_y"] + list(values)
+
+    for column in by:
+        if hasattr(data[column], "cat"):
+            result[column] = result[column].astype(data[column].dtype)
+
+    return result
+
+
+def bin2d(
+    data,
+    x,
+    y,
+    nbinsx,
+    nbinsy,
+    by=None,
+    values=None,
+    histfunc="count",
+    log_x=False,
+    log_y=False,
+    name="count",
+    column=None,
+):
+    """
+    Aggregate the rows of a data frame onto a regular two dimensional grid.
+
+    The bin indices are computed with vectorized NumPy operations and the
+    rows are then reduced with a single grouped aggregation.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The data frame.
+    x, y : str
+        The names of the columns to bin.
+    nbinsx, nbinsy : int
+        The number of bins along each axis.
+    by : list of str, optional
+        Columns whose distinct values are aggregated separately.
+    values : dict, optional
+        A mapping of column names to aggregation functions (such as
+        ``"mean"``) for further columns to include in the result.
+    histfunc : str
+        One of ``'count'``, ``'sum'``, ``'avg'``, ``'min'`` or ``'max'``.
+        Aggregation function of the ``name`` column. All functions apart
+        from ``'count'`` are applied to the column ``column`` of ``data``.
+    log_x, log_y : bool
+        If ``True`` the bins have equal width in log10 space.
+    name : str
+        The name of the aggregated column.
+    column : str, optional
+        The column of ``data`` that ``histfunc`` is applied to. Defaults
+        to ``name``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per non-empty bin and group, with ``x`` and ``y`` holding
+        the bin centres.
+    tuple of dict
+        The x and y bins in the form of plotly ``xbins``/``ybins``, or
+        ``None`` for date and log axes where plotly bins by itself.
+
+    """
+    by = list(by or [])
+    values = dict(values or {})
+
+    x_values, x_dtype = _to_numeric(data[x])
+    y_values, y_dtype = _to_numeric(data[y])
+
+    mask = np.isfinite(x_values) & np.isfinite(y_values)
+    if log_x:
+        mask &= x_values > 0
+    if log_y:
+        mask &= y_values > 0
+
+    if not mask.all():
+        x_values, y_values = x_values[mask], y_values[mask]
+        data = data[mask]
+
+    x_edges = bin_edges(x_values, nbinsx, log_x)
+    y_edges = bin_edges(y_values, nbinsy, log_y)
+
+    keys = [bin_codes(x_values, x_edges, log_x), bin_codes(y_values, y_edges, log_y)]
+    result = _aggregate(data, keys, by, values, histfunc, name, column)
+
+    x_centers = _from_numeric(bin_centers(x_edges, log_x), x_dtype)
+    y_centers = _from_numeric(bin_centers(y_edges, log_y), y_dtype)
+
+    result[x] = x_centers[result.pop("_x").values]
+    result[y] = y_centers[result.pop("_y").values]
+
+    bins = tuple(
+        {"start": edges[0], "end": edges[-1], "size": (edges[-1] - edges[0]) / n}
+        if dtype is None and not log
+        else None
+        for edges, n, dtype, log in (
+            (x_edges, nbinsx, x_dtype, log_x),
+            (y_edges, nbinsy, y_dtype, log_y),
+        )
+    )
+
+    return result[by + [x, y] + list(values) + [name]], bins
+
+
+def _mercator(lat):
+    """
+    Project latitudes to Web Mercator y in degrees.
+    """
+    return np.degrees(np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)))
+
+
+def _inverse_mercator(y):
+    """
+    Get the latitudes of Web Mercator y in degrees.
+    """
+    return np.degrees(2 * np.arctan(np.exp(np.radians(y))) - np.pi / 2)
+
+
+def cell_codes(x, y, size, shape="hexbin"):
+    """
+    Get the cell of each point on a square or hexagonal grid.
+
+    Hexagonal cells are found as the nearest centre of two offset
+    rectangular lattices, as for :func:`matplotlib.pyplot.hexbin`.
+
+    Parameters
+    ----------
+    x, y : numpy.ndarray
+        The point coordinates.
+    size : float
+        The width of the cells. Hexagons are this wide between their flat
+        sides, so the centres of neighbouring cells are ``size`` apart.
+    shape : str
+        Either ``'hexbin'`` or ``'square'``.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        The integer column and row codes of each cell, which are twice
+        the cell centres in units of the lattice spacing.
+
+    """
+    if shape == "square":
+        return (
+            2 * np.floor(x / size).astype(np.int64) + 1,
+            2 * np.floor(y / size).astype(np.int64) + 1,
+        )
+
+    u, v = x / size, y / (size * np.sqrt(3))
+
+    # the nearest centres of each lattice
+    u1, v1 = np.round(u), np.round(v)
+    u2, v2 = np.floor(u) + 0.5, np.floor(v) + 0.5
+
+    first = (u - u1) ** 2 + 3 * (v - v1) ** 2 <= (u - u2) ** 2 + 3 * (v - v2) ** 2
+
+    return (
+        np.where(first, 2 * u1, 2 * u2).astype(np.int64),
+        np.where(first, 2 * v1, 2 * v2).astype(np.int64),
+    )
+
+
+def cell_centers(codes_x, codes_y, size, shape="hexbin"):
+    """
+    Get the centre of the cells from :func:`cell_codes`.
+    """
+    if shape == "square":
+        return codes_x * size / 2, codes_y * size / 2
+
+    return codes_x * size / 2, codes_y * size * np.sqrt(3) / 2
+
+
+def bin_map(
+    data,
+    lat,
+    lon,
+    size,
+    shape="hexbin",
+    by=None,
+    values=None,
+    histfunc="count",
+    name="count",
+    column=None,
+    max_cells=None,
+):
+    """
+    Aggregate the rows of a data frame onto map cells.
+
+    The points are projected to Web Mercator, so cells are regular on a
+    Mapbox map, and their cells are found with vectorized NumPy
+    operations before the rows are reduced with a single grouped
+    aggregation.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The data frame.
+    lat, lon : str
+        The names of the latitude and longitude columns.
+    size : float
+        The width of the cells in degrees of longitude.
+    shape : str
+        Either ``'hexbin'`` or ``'square'``.
+    by : list of str, optional
+        Columns whose distinct values are aggregated separately.
+    values : dict, optional
+        A mapping of column names to aggregation functions (such as
+        ``"mean"``) for further columns to include in the result.
+    histfunc : str
+        One of ``'count'``, ``'sum'``, ``'avg'``, ``'min'`` or ``'max'``.
+        Aggregation function of the ``name`` column. All functions apart
+        from ``'count'`` are applied to the column ``column`` of ``data``.
+    name : str
+        The name of the aggregated column.
+    column : str, optional
+        The column of ``data`` that ``histfunc`` is applied to. Defaults
+        to ``name``.
+    max_cells : int, optional
+        If set, the cell size is doubled until there are at most this
+        many non-empty cells.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per non-empty cell and group, with ``lat`` and ``lon``
+        holding the cell centres.
+    float
+        The cell size.
+
+    """
+    by = list(by or [])
+    values = dict(values or {})
+
+    x = data[lon].to_numpy(dtype=float, na_value=np.nan)
+    y = _mercator(np.clip(data[lat].to_numpy(dtype=float, na_value=np.nan), -85, 85))
+
+    mask = np.isfinite(x) & np.isfinite(y)
+
+    if not mask.all():
+        x, y = x[mask], y[mask]
+        data = data[mask]
+
+    while True:
+        codes_x, codes_y = cell_codes(x, y, size, shape)
+
+        if max_cells is None or len(x) <= max_cells:
+            break
+
+        # the codes of a cell fit in one integer for counting
+        offset = codes_y - codes_y.min() if len(x) > 0 else codes_y
+        ncells = len(pd.unique(codes_x * (offset.max() + 1) + offset))
+
+        if ncells <= max_cells:
+            break
+
+        size *= 2
+
+    result = _aggregate(data, [codes_x, codes_y], by, values, histfunc, name, column)
+
+    centers_x, centers_y = cell_centers(
+        result.pop("_x").values, result.pop("_y").values, size, shape
+    )
+    result[lat] = _inverse_mercator(centers_y)
+    result[lon] = centers_x
+
+    return result[by + [lat, lon] + list(values) + [name]], size
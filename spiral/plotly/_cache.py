@@ -0,0 +1,355 @@
+"""
+Spiral plotly figure cache module.
+"""
+
+import datetime
+import hashlib
+import os
+import sys
+import threading
+
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+import plotly.io as pio
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+# types whose representation holds their whole value
+_SCALARS = (
+    str,
+    bytes,
+    int,
+    float,
+    complex,
+    type(None),
+    range,
+    np.generic,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    type(pd.NaT),
+)
+
+
+class _Unhashable(Exception):
+    pass
+
+
+def _importable(obj):
+    """
+    Check whether a callable can be imported by its module and name.
+    """
+    target = sys.modules.get(getattr(obj, "__module__", None))
+
+    for name in obj.__qualname__.split("."):
+        target = getattr(target, name, None)
+
+    return target is obj
+
+
+_DATA = (
+    pd.DataFrame,
+    pd.Series,
+    pd.Index,
+    pd.api.extensions.ExtensionArray,
+    np.ndarray,
+)
+
+
+def _update_data_hash(digest, obj):
+    """
+    Update a digest with the values of a data frame, series, index or array.
+    """
+    if isinstance(obj, pd.DataFrame):
+        digest.update(b"frame")
+        for column in obj:
+            _update_hash(digest, column)
+            _update_hash(digest, obj[column])
+    elif isinstance(obj, pd.Series):
+        digest.update(f"series:{obj.name}:{obj.dtype}".encode())
+        if hasattr(obj, "cat"):
+            _update_hash(digest, obj.cat.categories.tolist())
+        values = pd.util.hash_pandas_object(obj, index=True).values
+        digest.update(values.tobytes())
+    elif isinstance(obj, pd.MultiIndex):
+        digest.update(f"multiindex:{list(obj.names)}".encode())
+        for level in range(obj.nlevels):
+            _update_hash(digest, obj.get_level_values(level))
+    elif isinstance(obj, pd.Index):
+        digest.update(b"index")
+        _update_hash(digest, pd.Series(obj, name=obj.name))
+    elif isinstance(obj, pd.api.extensions.ExtensionArray):
+        digest.update(b"extension")
+        _update_hash(digest, pd.Series(obj))
+    else:
+        digest.update(f"array:{obj.dtype}:{obj.shape}".encode())
+        if obj.dtype.hasobject:
+            _update_hash(digest, pd.Series(obj.ravel()))
+        else:
+            digest.update(np.ascontiguousarray(obj).tobytes())
+
+
+def _update_hash(digest, obj):
+    """
+    Update a digest with a stable representation of an object.
+    """
+    if isinstance(obj, _DATA):
+        _update_data_hash(digest, obj)
+    elif isinstance(obj, dict):
+        digest.update(b"dict")
+        for key in sorted(obj, key=repr):
+            _update_hash(digest, key)
+            _update_hash(digest, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        digest.update(f"list:{len(obj)}".encode())
+        for value in obj:
+            _update_hash(digest, value)
+    elif isinstance(obj, (set, frozenset)):
+        _update_hash(digest, sorted(obj, key=repr))
+    elif callable(obj) and hasattr(obj, "__qualname__"):
+        # lambdas and closures can not be told apart by name
+        if not _importable(obj):
+            raise _Unhashable(obj)
+        digest.update(f"callable:{obj.__module__}.{obj.__qualname__}".encode())
+    elif hasattr(obj, "to_plotly_json"):
+        _update_hash(digest, obj.to_plotly_json())
+    elif isinstance(obj, _SCALARS):
+        digest.update(f"{type(obj).__name__}:{obj!r}".encode())
+    else:
+        raise _Unhashable(obj)
+
+
+def hash_figure_args(*objs):
+    """
+    Hash the arguments of a figure.
+
+    Parameters
+    ----------
+    *objs
+        The objects to hash. Data frames, series, indexes and arrays are
+        hashed by value, containers are hashed recursively, functions
+        are hashed by their importable name and scalars are hashed by
+        their representation.
+
+    Returns
+    -------
+    str or None
+        A hexadecimal digest, or ``None`` if an object can not be hashed
+        by value, such as a lambda, a closure or an unknown type.
+
+    """
+    digest = hashlib.blake2b(digest_size=20)
+
+    try:
+        for obj in objs:
+            _update_hash(digest, obj)
+    except _Unhashable:
+        return None
+
+    return digest.hexdigest()
+
+
+class FigureCache:
+
+    """
+    Figure cache class.
+
+    A content-addressed store of figures with an in-memory LRU and an
+    optional on-disk store of JSON serialized figures. Figures are
+    copied on the way in and out so cached entries can not be changed
+    by the caller.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of figures held in memory.
+    directory : str, optional
+        A directory for the on-disk store. If ``None`` only the memory
+        store is used.
+    max_disk_bytes : int, optional
+        The maximum total size of the on-disk store in bytes. The least
+        recently used files are removed when the limit is exceeded.
+
+    """
+
+    def __init__(self, maxsize=128, directory=None, max_disk_bytes=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        """
+        Get the number of figures held in memory.
+        """
+        return len(self._entries)
+
+    def __contains__(self, key):
+        """
+        Check whether a key is in the memory or disk store.
+        """
+        with self._lock:
+            if key in self._entries:
+                return True
+
+        return self._path(key) is not None and os.path.exists(self._path(key))
+
+    def _path(self, key):
+        if self.directory is None:
+            return None
+
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _remember(self, key, figure_dict):
+        self._entries[key] = figure_dict
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        """
+        Get a figure from the cache.
+
+        Parameters
+        ----------
+        key : str
+            The cache key.
+
+        Returns
+        -------
+        plotly.graph_objects.Figure or None
+            A copy of the cached figure or ``None`` if the key is not in
+            the cache.
+
+        """
+        with self._lock:
+            figure_dict = self._entries.get(key)
+
+            if figure_dict is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return go.Figure(figure_dict)
+
+        path = self._path(key)
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as fp:
+                    figure = pio.from_json(fp.read())
+                os.utime(path)
+            except (OSError, ValueError):
+                pass
+            else:
+                with self._lock:
+                    self._remember(key, figure.to_dict())
+                    self.hits += 1
+                return figure
+
+        with self._lock:
+            self.misses += 1
+
+        return None
+
+    def set(self, key, figure):
+        """
+        Add a figure to the cache.
+
+        Parameters
+        ----------
+        key : str
+            The cache key.
+        figure : plotly.graph_objects.Figure
+            The figure.
+
+        """
+        with self._lock:
+            self._remember(key, figure.to_dict())
+
+        path = self._path(key)
+        if path is not None:
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fp:
+                fp.write(pio.to_json(figure))
+            os.replace(tmp_path, path)
+
+            self._prune_disk()
+
+    def _prune_disk(self):
+        if self.max_disk_bytes is None:
+            return
+
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(x[1] for x in files)
+
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+            total -= size
+
+    def invalidate(self, key=None):
+        """
+        Remove figures from the cache.
+
+        Parameters
+        ----------
+        key : str, optional
+            The cache key to remove. If ``None`` all figures are removed
+            from the memory and disk stores.
+
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+        if self.directory is None:
+            return
+
+        if key is None:
+            paths = [
+                x.path for x in os.scandir(self.directory) if x.name.endswith(".json")
+            ]
+        else:
+            paths = [self._path(key)]
+
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def cache_info(self):
+        """
+        Get the cache statistics.
+
+        Returns
+        -------
+        CacheInfo
+            A named tuple of hits, misses, maximum size and the current
+            number of figures held in memory.
+
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
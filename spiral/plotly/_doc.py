@@ -3,6 +3,7 @@ Spiral plotly express documentation module.
 """
 
 import inspect
+import types
 
 from textwrap import TextWrapper
 
@@ -369,6 +370,96 @@ docs = {
         "list of two numbers",
         "If provided, overrides auto-scaling on the angular axis in polar coordinates.",
     ],
+    "aggregate": [
+        "str (default `None`)",
+        "For scatter and density plots, one of `'bin2d'` or `'auto'`. If"
+        " `'bin2d'`, the rows are aggregated onto a regular grid of `x` and `y`"
+        " bins before the figure is built. For histograms, one of `'bin1d'` or"
+        " `'auto'`. If `'bin1d'`, the rows are counted into `nbins` bins with"
+        " NumPy and plotly only draws the counts. For box and violin plots, one of"
+        " `'summary'` or `'auto'`. If `'summary'`, the quartiles, whiskers, a"
+        " selection of outliers and, for violins, a kernel density estimate"
+        " are computed for each box or violin and the figure is built from"
+        " these statistics rather than every row. For sunburst, treemap and"
+        " funnel plots, one of `'sum'`, `'mean'`, `'count'` or `'auto'`. If set,"
+        " the rows are grouped by every referenced column other than the values"
+        " in a single pass and each group is reduced to the sum, mean or count"
+        " of its values, with numeric colors averaged weighted by the values."
+        " `'auto'` sums the values. For Mapbox scatter and density maps, one of"
+        " `'hexbin'`, `'square'` or `'auto'`. If set, the `lat` and `lon` of the"
+        " rows are binned into hexagonal or square cells of the configured"
+        " `aggregate_cell_pixels` width at the map `zoom`, doubled until there"
+        " are at most `aggregate_max_cells` cells, and each cell is drawn as a"
+        " single point sized or weighted by its count or sum of `z`. `'auto'`"
+        " uses hexagons. If `'auto'`, rows are only aggregated when"
+        " there are more than the configured `aggregate_threshold`.",
+    ],
+    "min_share": [
+        "float (default `None`)",
+        "If set and `aggregate` is set, the leaves with less than this share of"
+        " the total value are grouped into a single leaf of their parent named"
+        " by the `other_category` configuration option.",
+    ],
+    "max_points": [
+        "int (default `None`)",
+        "If set, each line is downsampled to at most this many points before"
+        " the figure is built. Lines are split by `line_group`, `color`,"
+        " `line_dash`, facets and `animation_frame`, and the method is set by"
+        " the `downsample` configuration option (`'lttb'` or `'minmax'`).",
+    ],
+    "point_budget": [
+        "int (default `None`)",
+        "If set, the points are thinned to at most this many in total before"
+        " the figure is built, and a note gives the number of points dropped."
+        " Defaults to the `point_budget` configuration option.",
+    ],
+    "point_sampling": [
+        "str (default `None`)",
+        "One of `'voxel'`, `'random'` or `'stratified'`. `'voxel'` keeps one"
+        " point from each occupied cell of the finest grid within the budget,"
+        " `'random'` keeps a uniform random sample and `'stratified'` shares"
+        " the budget equally between the `color`, `symbol`, `line_dash`,"
+        " `line_group` and `animation_frame` groups. Defaults to the"
+        " `point_sampling` configuration option.",
+    ],
+    "max_rows": [
+        "int (default `None`)",
+        "If set, a random sample of at most this many rows is drawn, keeping"
+        " the share of each `color` group, and a note gives the sample size."
+        " Defaults to the `max_rows` configuration option.",
+    ],
+    "max_dimensions": [
+        "int (default `None`)",
+        "If set, only this many of the `dimensions`, or of the columns drawn"
+        " when `dimensions` is not given, are drawn. They are chosen by"
+        " `dimension_rank` and keep their order. Defaults to the"
+        " `max_dimensions` configuration option.",
+    ],
+    "dimension_rank": [
+        "str or callable (default `None`)",
+        "Either `'variance'` or a function of a column returning its score."
+        " The dimensions with the highest scores are kept. The variance of a"
+        " non-numeric column is that of its one-hot encoding. Defaults to"
+        " the `dimension_rank` configuration option.",
+    ],
+    "merge_lines": [
+        "bool (default `False`)",
+        "If `True`, the lines of every `line_group` that share a color, dash,"
+        " facet and animation frame are drawn as a single trace with gaps"
+        " between them rather than as one trace per line. The legend and hover"
+        " labels are unchanged.",
+    ],
+    "max_categories": [
+        "int or bool (default `None`)",
+        "If set, the maximum number of distinct values of the discrete"
+        " `color`, `symbol` and `line_dash` columns, each of which adds a"
+        " trace. The most frequent values are kept and the rest are grouped"
+        " into a single category named by the `other_category` configuration"
+        " option. A `color` column of numbers stored as text or categories is"
+        " shown with a continuous color scale instead. `False` turns grouping"
+        " off. Defaults to the `max_categories` configuration option, which"
+        " is unset.",
+    ],
     "title": ["str", "The figure title."],
     "subtitle": ["str", "The figure subtitle."],
     "note": ["str", "Figure note text."],
@@ -422,16 +513,28 @@ docs = {
     ],
     "trendline": [
         "str",
-        "One of `'ols'` or `'lowess'`. If `'ols'`, an Ordinary Least Squares"
-        " regression line will be drawn for each discrete-color/symbol group."
-        " If `'lowess`', a Locally Weighted Scatterplot Smoothing line will be"
-        " drawn for each discrete-color/symbol group.",
+        "One of `'ols'`, `'rolling'` or `'lowess'`. If `'ols'`, an Ordinary"
+        " Least Squares regression line will be drawn for each trace. If"
+        " `'rolling'`, the rolling mean of the points in order of `x` will be"
+        " drawn for each trace. If `'lowess`', a Locally Weighted Scatterplot"
+        " Smoothing line fitted to binned points will be drawn for each trace."
+        " The lines of all traces are fitted at once with NumPy, and aggregated"
+        " points are weighted by their counts.",
     ],
     "trendline_color_override": [
         "str",
         "Valid CSS color. If provided, and if `trendline` is set, all"
         " trendlines will be drawn in this color.",
     ],
+    "trendline_options": [
+        "dict with str keys (default `None`)",
+        "Trendline options. `'sample'` fits each trendline to a random sample"
+        " of about this many points, `'window'` is the number of points in each"
+        " rolling mean (default 20), `'frac'` is the fraction of the points used"
+        " in each LOWESS fit (default 2/3), `'nbins'` is the number of LOWESS"
+        " bins (default 100) and `'npoints'` is the maximum number of points of"
+        " each rolling mean (default 100).",
+    ],
     "render_mode": [
         "str",
         "One of `'auto'`, `'svg'` or `'webgl'`, default `'auto'`. Controls the"
@@ -580,6 +683,15 @@ docs = {
         "Must contain a Polygon feature collection, with IDs, which are"
         " references from `locations`.",
     ],
+    "simplify": [
+        "float or str (default `None`)",
+        "If set, the polygons of `geojson` are simplified with the"
+        " Douglas-Peucker algorithm to this tolerance in degrees before the"
+        " figure is built, and the simplified GeoJSON is cached. If `'auto'`,"
+        " the tolerance is half a pixel at the `zoom` level of Mapbox maps, or"
+        " half a pixel of the referenced features drawn across the plot. The"
+        " features not referenced by `locations` are dropped in any case.",
+    ],
     "featureidkey": [
         "str (default: `'id'`)",
         "Path to field in GeoJSON feature object with which to match the values"
@@ -646,3 +758,79 @@ def make_docstring(method, override_dict=None):
     result += "        Plotly figure object."
 
     return result
+
+
+class _MethodDocstring:
+
+    """
+    Docstring descriptor class.
+
+    Gets the docstring of the class it is assigned to from the class and
+    the docstring of the wrapped method from an instance.
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+
+    def __get__(self, instance, owner=None):
+        """
+        Get the class or method docstring.
+        """
+        if instance is None:
+            return self.doc
+
+        return instance._make_doc()
+
+
+class LazyDocstring:
+
+    """
+    Lazily documented method class.
+
+    Wraps a method whose docstring is made with :func:`make_docstring`
+    the first time it is read, for example by :func:`help`, so calling
+    the method never makes it.
+
+    Parameters
+    ----------
+    method : function
+        The method, whose own docstring is the summary of the result.
+    override_dict : dict, optional
+        Parameter documentation overriding the defaults.
+
+    """
+
+    __doc__ = _MethodDocstring(__doc__)
+
+    def __init__(self, method, override_dict=None):
+        self.__wrapped__ = method
+        self.__name__ = method.__name__
+        self.__qualname__ = method.__qualname__
+        self.__module__ = method.__module__
+        self.override_dict = override_dict
+
+        self._doc = None
+
+    def _make_doc(self):
+        """
+        Get the docstring of the method, making it the first time.
+        """
+        if self._doc is None:
+            self._doc = make_docstring(self.__wrapped__, self.override_dict)
+
+        return self._doc
+
+    def __call__(self, *args, **kwargs):
+        """
+        Call the method.
+        """
+        return self.__wrapped__(*args, **kwargs)
+
+    def __get__(self, instance, owner=None):
+        """
+        Bind the method to an instance.
+        """
+        if instance is None:
+            return self
+
+        return types.MethodType(self, instance)
@@ -0,0 +1,444 @@
+"""
+Spiral plotly downsampling module.
+"""
+
+from spiral.core.exc import SpiralError
+
+import numpy as np
+import pandas as pd
+
+
+def _as_float(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.values.view("i8").astype(float)
+
+    if pd.api.types.is_numeric_dtype(series) and not hasattr(series, "cat"):
+        return series.to_numpy(dtype=float, na_value=np.nan)
+
+    # non-numeric values are spaced evenly in the order they appear
+    return np.arange(len(series), dtype=float)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Select points with the Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are always kept. The points in between are
+    split into ``n_out - 2`` buckets and from each bucket the point that
+    forms the largest triangle with the previously selected point and
+    the mean of the next bucket is kept.
+
+    Parameters
+    ----------
+    x, y : numpy.ndarray
+        The point coordinates in drawing order.
+    n_out : int
+        The number of points to keep.
+
+    Returns
+    -------
+    numpy.ndarray
+        The sorted positions of the selected points.
+
+    """
+    n = len(x)
+
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    # the mean of each bucket, with the last point as a final bucket
+    x_means = np.append(np.add.reduceat(x[1:-1], edges[:-1] - 1), x[-1])
+    y_means = np.append(np.add.reduceat(y[1:-1], edges[:-1] - 1), y[-1])
+    counts = np.append(np.diff(edges), 1)
+    x_means, y_means = x_means / counts, y_means / counts
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        bx, by = x[start:end], y[start:end]
+        cx, cy = x_means[i + 1], y_means[i + 1]
+
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax_indices(codes, y, n_out):
+    """
+    Select the minimum and maximum point of each bucket.
+
+    Every group is split into ``(n_out - 2) // 2`` equal buckets in
+    drawing order and the first and last points of each group are also
+    kept. The selection is done for all groups at once.
+
+    Parameters
+    ----------
+    codes : numpy.ndarray
+        The integer group code of each point.
+    y : numpy.ndarray
+        The point values.
+    n_out : int
+        The number of points to keep per group.
+
+    Returns
+    -------
+    numpy.ndarray
+        The sorted positions of the selected points.
+
+    """
+    codes = pd.Series(codes)
+    position = codes.groupby(codes).cumcount().values
+    size = codes.map(codes.value_counts()).values
+
+    nbuckets = max((n_out - 2) // 2, 1)
+    buckets = position * nbuckets // size
+
+    frame = pd.DataFrame({"y": y, "code": codes.values, "bucket": buckets})
+    grouped = frame.groupby(["code", "bucket"], sort=False)["y"]
+
+    # the ends are kept so lines span the same range
+    ends = (position == 0) | (position == size - 1)
+
+    selected = np.concatenate(
+        [
+            grouped.idxmin().dropna().values,
+            grouped.idxmax().dropna().values,
+            np.flatnonzero(ends),
+        ]
+    )
+
+    return np.unique(selected.astype(np.int64))
+
+
+def downsample(data, x, y, max_points, by=None, method="lttb"):
+    """
+    Downsample the lines of a data frame.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The data frame.
+    x, y : str
+        The names of the x and y columns.
+    max_points : int
+        The maximum number of points kept for each group.
+    by : list of str, optional
+        The columns that split the rows into separate lines.
+    method : str
+        Either ``'lttb'`` or ``'minmax'``.
+
+    Raises
+    ------
+    SpiralError
+        If the method is not recognised.
+
+    Returns
+    -------
+    numpy.ndarray
+        The sorted positions of the rows to keep.
+
+    """
+    if method not in ("lttb", "minmax"):
+        raise SpiralError(f"Unrecognised downsample method '{method}'")
+
+    by = list(by or [])
+
+    if by:
+        codes = data.groupby(by, sort=False, observed=True).ngroup().values
+    else:
+        codes = np.zeros(len(data), dtype=np.int64)
+
+    y_values = _as_float(data[y])
+
+    if method == "minmax":
+        return minmax_indices(codes, y_values, max_points)
+
+    x_values = _as_float(data[x])
+
+    order = np.argsort(codes, kind="stable")
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+
+    selected = [
+        group[lttb_indices(x_values[group], y_values[group], max_points)]
+        for group in np.split(order, bounds)
+    ]
+
+    return np.sort(np.concatenate(selected))
+
+
+def _coordinates(series, log=False):
+    """
+    Get coordinates of a column for spatial binning.
+
+    Dates are binned as numbers and other non-numeric values by their
+    position in order of appearance.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.values.view("i8").astype(float)
+    elif pd.api.types.is_numeric_dtype(series) and not hasattr(series, "cat"):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+    else:
+        values = pd.factorize(series)[0].astype(float)
+        values[values < 0] = np.nan
+
+    if log:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values = np.where(values > 0, np.log10(values), np.nan)
+
+    return values
+
+
+def voxel_indices(coords, codes, max_points, max_cells=1024):
+    """
+    Select one point from each occupied cell of a voxel grid.
+
+    The grid spans the bounding box of every point and has the largest
+    number of cells along each axis, up to ``max_cells``, for which at
+    most ``max_points`` cells are occupied. Cells are occupied separately
+    by each group, and the first point in each cell is kept.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        The point coordinates, with shape (n, d).
+    codes : numpy.ndarray
+        The integer group code of each point.
+    max_points : int
+        The maximum number of points to keep.
+    max_cells : int
+        The maximum number of cells along each axis.
+
+    Returns
+    -------
+    numpy.ndarray
+        The sorted positions of the selected points. Points with missing
+        coordinates are never selected.
+
+    """
+    finite = np.isfinite(coords).all(axis=1)
+    positions = np.flatnonzero(finite)
+    coords, codes = coords[finite], codes[finite].astype(np.int64)
+
+    if len(positions) <= max_points:
+        return positions
+
+    lower = coords.min(axis=0)
+    extent = coords.max(axis=0) - lower
+    scaled = (coords - lower) / np.where(extent > 0, extent, 1)
+
+    def _keys(ncells):
+        keys = codes
+        for i in range(scaled.shape[1]):
+            cells = np.minimum((scaled[:, i] * ncells).astype(np.int64), ncells - 1)
+            keys = keys * ncells + cells
+        return keys
+
+    # find the finest grid within the budget, or the coarsest grid of one
+    # cell per group if there are more groups than the budget, starting
+    # from a grid whose every cell could be occupied
+    ngroups = len(pd.unique(codes))
+    low = int(np.clip((max_points / ngroups) ** (1 / scaled.shape[1]), 1, max_cells))
+    high = max_cells
+    while low < high:
+        ncells = (low + high + 1) // 2
+        if len(pd.unique(_keys(ncells))) <= max_points:
+            low = ncells
+        else:
+            high = ncells - 1
+
+    first = ~pd.Series(_keys(low)).duplicated().values
+
+    return positions[first]
+
+
+def _equal_quota(counts, max_points):
+    """
+    Share a budget equally between groups.
+
+    The share of groups smaller than it is given to the others.
+    """
+    sizes = np.sort(counts)
+    totals = np.cumsum(sizes) + sizes * np.arange(len(sizes) - 1, -1, -1)
+    within = np.searchsorted(totals, max_points, side="right")
+
+    if within == 0:
+        limit = max_points // len(sizes)
+    else:
+        spare = max_points - np.cumsum(sizes)[within - 1]
+        limit = max(sizes[within - 1], spare // max(len(sizes) - within, 1))
+
+    return np.minimum(counts, limit)
+
+
+def _proportional_quota(counts, max_points):
+    """
+    Share a budget between groups in proportion to their size.
+
+    The points left by rounding down are given to the largest remainders.
+    """
+    shares = counts * max_points / counts.sum()
+    quota = np.floor(shares).astype(np.int64)
+
+    remainders = np.argsort(quota - shares, kind="stable")
+    quota[remainders[: max_points - quota.sum()]] += 1
+
+    return quota
+
+
+def sample_indices(codes, max_points, stratified=False, proportional=False, seed=0):
+    """
+    Select a random sample of points.
+
+    Parameters
+    ----------
+    codes : numpy.ndarray
+        The integer group code of each point.
+    max_points : int
+        The maximum number of points to keep.
+    stratified : bool
+        If ``True`` each group keeps a set number of points. Otherwise
+        every point is equally likely to be kept.
+    proportional : bool
+        If ``True`` stratified groups keep their share of the points.
+        Otherwise the budget is shared equally between the groups, with
+        the share of groups smaller than it given to the others, so small
+        groups are kept whole.
+    seed : int
+        The seed of the random sample.
+
+    Returns
+    -------
+    numpy.ndarray
+        The sorted positions of the selected points.
+
+    """
+    n = len(codes)
+
+    if n <= max_points:
+        return np.arange(n)
+
+    rng = np.random.default_rng(seed)
+
+    if not stratified:
+        return np.sort(rng.choice(n, max_points, replace=False))
+
+    counts = np.bincount(codes)
+
+    if proportional:
+        quota = _proportional_quota(counts, max_points)
+    else:
+        quota = _equal_quota(counts, max_points)
+
+    # rank the points of each group in a random order, with a stable sort
+    # of the codes of a random permutation
+    permutation = rng.permutation(n)
+    order = permutation[np.argsort(codes[permutation], kind="stable")]
+    starts = np.cumsum(counts) - counts
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n) - starts[codes[order]]
+
+    return np.flatnonzero(rank < quota[codes])
+
+
+def rank_columns(data, columns, metric="variance"):
+    """
+    Score columns for selecting the most informative dimensions.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The data frame.
+    columns : list of str
+        The names of the columns to score.
+    metric : str or callable
+        Either ``'variance'`` or a function of a series returning its
+        score. The variance of a non-numeric column is that of its
+        one-hot encoding, which is its Gini impurity.
+
+    Raises
+    ------
+    SpiralError
+        If the metric is not recognised.
+
+    Returns
+    -------
+    pandas.Series
+        The score of each column, with higher scores ranked first.
+
+    """
+    if callable(metric):
+        return pd.Series({x: float(metric(data[x])) for x in columns}, dtype=float)
+
+    if metric != "variance":
+        raise SpiralError(f"Unrecognised dimension rank '{metric}'")
+
+    scores = {}
+    for column in columns:
+        series = data[column]
+
+        if pd.api.types.is_numeric_dtype(series) and not hasattr(series, "cat"):
+            scores[column] = series.var(ddof=0)
+        else:
+            shares = series.value_counts(normalize=True).values
+            scores[column] = 1 - (shares**2).sum()
+
+    return pd.Series(scores, dtype=float).fillna(-np.inf)
+
+
+def thin_points(data, columns, max_points, by=None, method="voxel", log=None):
+    """
+    Thin a point cloud to a budget of points.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The data frame.
+    columns : list of str
+        The names of the coordinate columns.
+    max_points : int
+        The maximum number of points to keep in total.
+    by : list of str, optional
+        The columns that split the points into groups, such as colors.
+    method : str
+        One of ``'voxel'``, ``'random'`` or ``'stratified'``.
+    log : list of bool, optional
+        Whether each coordinate is drawn on a log axis.
+
+    Raises
+    ------
+    SpiralError
+        If the method is not recognised.
+
+    Returns
+    -------
+    numpy.ndarray
+        The sorted positions of the rows to keep.
+
+    """
+    if method not in ("voxel", "random", "stratified"):
+        raise SpiralError(f"Unrecognised point sampling method '{method}'")
+
+    by = list(by or [])
+    log = list(log or [False] * len(columns))
+
+    if by:
+        codes = data.groupby(by, sort=False, observed=True, dropna=False).ngroup()
+        codes = codes.values.astype(np.int64)
+    else:
+        codes = np.zeros(len(data), dtype=np.int64)
+
+    if method == "voxel":
+        coords = np.column_stack(
+            [_coordinates(data[x], log=y) for x, y in zip(columns, log)]
+        )
+        return voxel_indices(coords, codes, max_points)
+
+    return sample_indices(codes, max_points, stratified=method == "stratified")
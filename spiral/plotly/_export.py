@@ -0,0 +1,211 @@
+"""
+Spiral plotly static image export module.
+"""
+
+import multiprocessing
+import os
+import time
+import traceback
+
+from collections import namedtuple
+from pathlib import Path
+
+from spiral.core.exc import SpiralError
+
+IMAGE_FORMATS = ["png", "jpg", "jpeg", "webp", "svg", "pdf", "eps"]
+
+ExportResult = namedtuple(
+    "ExportResult", ["path", "render_time", "write_time", "worker", "error"]
+)
+ExportResult.__doc__ = """
+Result of a single figure exported by :class:`ExportPool`. ``path`` is
+the written file, ``render_time`` and ``write_time`` the seconds spent
+rendering and writing it and ``worker`` the identifier of the process
+that exported it. If exporting failed the times are ``None`` and
+``error`` holds the formatted traceback.
+"""
+
+_worker_options = {}
+
+
+def _init_exporter(templates, default, options):
+    """
+    Set up an export worker process with the theme and warm its renderer.
+    """
+    import plotly.io as pio
+
+    for name, template in templates.items():
+        pio.templates[name] = template
+
+    pio.templates.default = default
+    _worker_options.update(options)
+
+    # the renderer starts with the first image, so a blank figure is
+    # rendered before any real one is sent
+    try:
+        pio.to_image({"data": [], "layout": {}}, format="png", validate=False)
+    except Exception:
+        pass
+
+
+def _export_figure(job, options=None):
+    """
+    Render a figure to a static image and write it to a file.
+    """
+    import plotly.io as pio
+
+    figure, path, fmt = job
+    options = _worker_options if options is None else options
+
+    try:
+        start = time.perf_counter()
+        image = pio.to_image(figure, format=fmt, validate=False, **options)
+        rendered = time.perf_counter()
+
+        Path(path).write_bytes(image)
+        written = time.perf_counter()
+
+        return ExportResult(
+            str(path), rendered - start, written - rendered, os.getpid(), None
+        )
+    except Exception:
+        return ExportResult(str(path), None, None, os.getpid(), traceback.format_exc())
+
+
+def export_jobs(figures, fmt, directory=None):
+    """
+    Get the export jobs of figures.
+
+    Parameters
+    ----------
+    figures : list or dict
+        A list of figures, written to ``figure-<position>.<fmt>``, or a
+        dict of figures by file path. Relative paths are relative to
+        ``directory``.
+    fmt : str
+        The image format.
+    directory : str or pathlib.Path, optional
+        The output directory. Defaults to the current directory.
+
+    Raises
+    ------
+    SpiralError
+        If the image format is not recognised.
+
+    Returns
+    -------
+    iterator of tuple
+        The figure as a dict, the file path and the image format of each
+        job. Figures are converted as they are consumed, so a pool can
+        render the first figures while later ones are converted.
+
+    """
+    if fmt not in IMAGE_FORMATS:
+        raise SpiralError(f"Unrecognised image format '{fmt}'")
+
+    return _jobs(figures, fmt, Path(directory or "."))
+
+
+def _jobs(figures, fmt, directory):
+    if isinstance(figures, dict):
+        items = figures.items()
+    else:
+        figures = list(figures)
+        width = len(str(max(len(figures) - 1, 0)))
+        items = ((f"figure-{i:0{width}d}.{fmt}", x) for i, x in enumerate(figures))
+
+    for path, figure in items:
+        path = directory / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if not isinstance(figure, dict):
+            figure = figure.to_plotly_json()
+
+        yield figure, path, fmt
+
+
+class ExportPool:
+
+    """
+    Static image export pool class.
+
+    Keeps worker processes whose image renderer is started once, so the
+    cost of starting a renderer is paid by each worker rather than by
+    each figure. Figures are sent to the workers as they are converted
+    and each worker writes the files it renders.
+
+    Parameters
+    ----------
+    workers : int
+        The number of worker processes.
+    templates : dict, optional
+        Templates registered in each worker by name, such as the Spiral
+        theme.
+    default : str, optional
+        The name of the default template in each worker.
+    width, height, scale : optional
+        The image size options passed to ``plotly.io.to_image``.
+
+    """
+
+    def __init__(
+        self, workers, templates=None, default=None, width=None, height=None, scale=None
+    ):
+        self.workers = workers
+        self.default = default
+        self.options = {"width": width, "height": height, "scale": scale}
+        self.closed = False
+
+        self._pool = multiprocessing.Pool(
+            workers, _init_exporter, (templates or {}, default, self.options)
+        )
+
+    def __enter__(self):
+        """
+        Enter a context.
+        """
+        return self
+
+    def __exit__(self, *args):
+        """
+        Stop the worker processes on leaving a context.
+        """
+        self.close()
+
+    def export(self, jobs, chunksize=1):
+        """
+        Export figures.
+
+        Parameters
+        ----------
+        jobs : iterable
+            The jobs of :func:`export_jobs`.
+        chunksize : int
+            The number of figures sent to a worker at a time.
+
+        Raises
+        ------
+        SpiralError
+            If the pool is closed.
+
+        Returns
+        -------
+        list of ExportResult
+            The results in the same order as the jobs.
+
+        """
+        if self.closed:
+            raise SpiralError("Cannot export with a closed export pool")
+
+        return list(self._pool.imap(_export_figure, jobs, chunksize=chunksize))
+
+    def close(self):
+        """
+        Stop the worker processes.
+        """
+        if self.closed:
+            return
+
+        self._pool.close()
+        self._pool.join()
+        self.closed = True
@@ -2,7 +2,7 @@
 Spiral plotly express module.
 """
 
-from spiral.plotly._doc import make_docstring
+from spiral.plotly._doc import LazyDocstring
 
 import plotly.express as px  # noqa: F401
 
@@ -52,11 +52,14 @@ class PlotlyExpress:
         marginal_y=None,
         trendline=None,
         trendline_color_override=None,
+        trendline_options=None,
         log_x=False,
         log_y=False,
         range_x=None,
         range_y=None,
         render_mode="auto",
+        aggregate=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -97,6 +100,7 @@ class PlotlyExpress:
         marginal_y=None,
         trendline=None,
         trendline_color_override=None,
+        trendline_options=None,
         log_x=False,
         log_y=False,
         range_x=None,
@@ -105,6 +109,8 @@ class PlotlyExpress:
         histnorm=None,
         nbinsx=None,
         nbinsy=None,
+        aggregate=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -153,6 +159,7 @@ class PlotlyExpress:
         histnorm=None,
         nbinsx=None,
         nbinsy=None,
+        aggregate=None,
         title=None,
         subtitle=None,
         template=None,
@@ -206,6 +213,9 @@ class PlotlyExpress:
         range_y=None,
         line_shape=None,
         render_mode="auto",
+        max_points=None,
+        merge_lines=False,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -251,6 +261,8 @@ class PlotlyExpress:
         range_x=None,
         range_y=None,
         line_shape=None,
+        max_points=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -303,6 +315,7 @@ class PlotlyExpress:
         log_y=False,
         range_x=None,
         range_y=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -350,6 +363,8 @@ class PlotlyExpress:
         histfunc=None,
         cumulative=None,
         nbins=None,
+        aggregate=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -367,6 +382,10 @@ class PlotlyExpress:
         `histfunc` (e.g. the count or sum) of the value `y` (or `x` if
         `orientation` is `'h'`).
 
+        The `data_frame` can also be an iterator of data frame chunks or
+        the path of a CSV file, which is read in chunks. The rows are
+        then binned in constant memory before the figure is built.
+
         """
         return self.make_figure(args=locals(), constructor=px.histogram)
 
@@ -396,6 +415,8 @@ class PlotlyExpress:
         range_y=None,
         points=None,
         box=False,
+        aggregate=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -440,6 +461,8 @@ class PlotlyExpress:
         range_y=None,
         points=None,
         notched=False,
+        aggregate=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -486,6 +509,7 @@ class PlotlyExpress:
         log_y=False,
         range_x=None,
         range_y=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -542,6 +566,9 @@ class PlotlyExpress:
         range_x=None,
         range_y=None,
         range_z=None,
+        point_budget=None,
+        point_sampling=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -593,6 +620,10 @@ class PlotlyExpress:
         range_x=None,
         range_y=None,
         range_z=None,
+        point_budget=None,
+        point_sampling=None,
+        merge_lines=False,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -637,6 +668,7 @@ class PlotlyExpress:
         symbol_map={},
         opacity=None,
         size_max=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -677,6 +709,7 @@ class PlotlyExpress:
         line_dash_sequence=None,
         line_dash_map={},
         line_shape=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -726,6 +759,7 @@ class PlotlyExpress:
         range_theta=None,
         log_r=False,
         render_mode="auto",
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -771,6 +805,7 @@ class PlotlyExpress:
         range_r=None,
         range_theta=None,
         log_r=False,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -813,6 +848,7 @@ class PlotlyExpress:
         range_r=None,
         range_theta=None,
         log_r=False,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -855,6 +891,8 @@ class PlotlyExpress:
         projection=None,
         scope=None,
         center=None,
+        simplify=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -900,6 +938,7 @@ class PlotlyExpress:
         projection=None,
         scope=None,
         center=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -943,6 +982,7 @@ class PlotlyExpress:
         projection=None,
         scope=None,
         center=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -986,6 +1026,8 @@ class PlotlyExpress:
         zoom=8,
         center=None,
         mapbox_style=None,
+        aggregate=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -1027,6 +1069,8 @@ class PlotlyExpress:
         zoom=8,
         center=None,
         mapbox_style=None,
+        simplify=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -1066,6 +1110,7 @@ class PlotlyExpress:
         center=None,
         mapbox_style=None,
         radius=None,
+        aggregate=None,
         title=None,
         subtitle=None,
         template=None,
@@ -1104,6 +1149,7 @@ class PlotlyExpress:
         zoom=8,
         center=None,
         mapbox_style=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -1143,6 +1189,10 @@ class PlotlyExpress:
         symbol_map={},
         opacity=None,
         size_max=None,
+        max_rows=None,
+        max_dimensions=None,
+        dimension_rank=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -1171,6 +1221,9 @@ class PlotlyExpress:
         color_continuous_scale=None,
         range_color=None,
         color_continuous_midpoint=None,
+        max_rows=None,
+        max_dimensions=None,
+        dimension_rank=None,
         title=None,
         subtitle=None,
         template=None,
@@ -1198,6 +1251,9 @@ class PlotlyExpress:
         color_continuous_scale=None,
         range_color=None,
         color_continuous_midpoint=None,
+        max_rows=None,
+        max_dimensions=None,
+        dimension_rank=None,
         title=None,
         subtitle=None,
         template=None,
@@ -1267,6 +1323,8 @@ class PlotlyExpress:
         hover_data=None,
         custom_data=None,
         labels={},
+        aggregate=None,
+        min_share=None,
         title=None,
         subtitle=None,
         template=None,
@@ -1305,6 +1363,8 @@ class PlotlyExpress:
         hover_data=None,
         custom_data=None,
         labels={},
+        aggregate=None,
+        min_share=None,
         title=None,
         subtitle=None,
         template=None,
@@ -1349,6 +1409,8 @@ class PlotlyExpress:
         log_y=False,
         range_x=None,
         range_y=None,
+        aggregate=None,
+        max_categories=None,
         title=None,
         subtitle=None,
         template=None,
@@ -1416,6 +1478,7 @@ class PlotlyExpress:
         width=None,
         height=None,
         aspect=None,
+        pooling=None,
         units={},
         note=None,
         patches={},
@@ -1493,6 +1556,11 @@ class PlotlyExpress:
             general, this will result in non-square pixels.
           - if None, 'equal' is used for numpy arrays and 'auto' for
             xarrays (which have typically heterogeneous coordinates)
+        pooling: 'mean', 'max' or None
+            If set, images larger than the configured plot size are
+            reduced by pooling blocks of pixels with their mean or
+            maximum until they fit, with the axes kept in the units of
+            the full image. Defaults to the configured `image_pooling`.
         units: dict with str keys and str values (default `{}`)
             The axis units.
         note: str
@@ -1522,36 +1590,48 @@ class PlotlyExpress:
         return self.make_figure(args=locals(), constructor=px.imshow)
 
 
-spx = PlotlyExpress
-spx.scatter.__doc__ = make_docstring(spx.scatter)
-spx.scatter_3d.__doc__ = make_docstring(spx.scatter_3d)
-spx.scatter_geo.__doc__ = make_docstring(spx.scatter_geo)
-spx.scatter_mapbox.__doc__ = make_docstring(spx.scatter_mapbox)
-spx.scatter_matrix.__doc__ = make_docstring(spx.scatter_matrix)
-spx.scatter_polar.__doc__ = make_docstring(spx.scatter_polar)
-spx.scatter_ternary.__doc__ = make_docstring(spx.scatter_ternary)
-spx.line.__doc__ = make_docstring(spx.line)
-spx.line_3d.__doc__ = make_docstring(spx.line_3d)
-spx.line_geo.__doc__ = make_docstring(spx.line_geo)
-spx.line_mapbox.__doc__ = make_docstring(spx.line_mapbox)
-spx.line_polar.__doc__ = make_docstring(spx.line_polar)
-spx.line_ternary.__doc__ = make_docstring(spx.line_ternary)
-spx.area.__doc__ = make_docstring(spx.area)
-spx.bar.__doc__ = make_docstring(spx.bar)
-spx.bar_polar.__doc__ = make_docstring(spx.bar_polar)
-spx.box.__doc__ = make_docstring(spx.box)
-spx.violin.__doc__ = make_docstring(spx.violin)
-spx.strip.__doc__ = make_docstring(spx.strip)
-spx.histogram.__doc__ = make_docstring(spx.histogram)
-spx.parallel_categories.__doc__ = make_docstring(spx.parallel_categories)
-spx.parallel_coordinates.__doc__ = make_docstring(spx.parallel_coordinates)
-spx.choropleth.__doc__ = make_docstring(spx.choropleth)
-spx.choropleth_mapbox.__doc__ = make_docstring(spx.choropleth_mapbox)
-spx.density_contour.__doc__ = make_docstring(spx.density_contour)
-spx.density_heatmap.__doc__ = make_docstring(spx.density_heatmap)
-spx.density_mapbox.__doc__ = make_docstring(spx.density_mapbox)
-spx.pie.__doc__ = make_docstring(spx.pie)
-spx.sunburst.__doc__ = make_docstring(spx.sunburst)
-spx.treemap.__doc__ = make_docstring(spx.treemap)
-spx.funnel.__doc__ = make_docstring(spx.funnel)
-spx.funnel_area.__doc__ = make_docstring(spx.funnel_area)
+def _lazy_docstrings(cls, names):
+    """
+    Make the docstrings of methods of a class the first time they are read.
+    """
+    for name in names:
+        setattr(cls, name, LazyDocstring(cls.__dict__[name]))
+
+
+_lazy_docstrings(
+    PlotlyExpress,
+    [
+        "scatter",
+        "scatter_3d",
+        "scatter_geo",
+        "scatter_mapbox",
+        "scatter_matrix",
+        "scatter_polar",
+        "scatter_ternary",
+        "line",
+        "line_3d",
+        "line_geo",
+        "line_mapbox",
+        "line_polar",
+        "line_ternary",
+        "area",
+        "bar",
+        "bar_polar",
+        "box",
+        "violin",
+        "strip",
+        "histogram",
+        "parallel_categories",
+        "parallel_coordinates",
+        "choropleth",
+        "choropleth_mapbox",
+        "density_contour",
+        "density_heatmap",
+        "density_mapbox",
+        "pie",
+        "sunburst",
+        "treemap",
+        "funnel",
+        "funnel_area",
+    ],
+)
@@ -0,0 +1,426 @@
+"""
+Spiral plotly GeoJSON geometry module.
+"""
+
+import hashlib
+import json
+import math
+import threading
+
+from collections import OrderedDict
+
+from spiral.plotly._cache import CacheInfo
+
+import numpy as np
+
+
+def _ranges(starts, lengths):
+    """
+    Get the positions of consecutive ranges as one array.
+    """
+    total = lengths.sum()
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    return np.repeat(starts, lengths) + offsets
+
+
+def simplify_lines(coords, starts, counts, tolerance):
+    """
+    Simplify lines with the Douglas-Peucker algorithm.
+
+    Every line is simplified at once: each iteration finds the furthest
+    point from every open segment of every line with vectorized NumPy
+    operations and splits the segments whose furthest point is further
+    than the tolerance.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        The points of all lines one after the other, with shape (n, 2).
+    starts, counts : numpy.ndarray
+        The position of the first point and number of points of each line.
+    tolerance : float
+        The maximum distance of a removed point from the simplified line.
+
+    Returns
+    -------
+    numpy.ndarray
+        A boolean mask of the points to keep.
+
+    """
+    keep = np.zeros(len(coords), dtype=bool)
+    keep[starts[counts > 0]] = True
+    keep[(starts + counts - 1)[counts > 0]] = True
+
+    x = np.ascontiguousarray(coords[:, 0])
+    y = np.ascontiguousarray(coords[:, 1])
+
+    segment_starts = starts[counts > 2]
+    segment_ends = (starts + counts - 1)[counts > 2]
+
+    while len(segment_starts) > 0:
+        lengths = segment_ends - segment_starts - 1
+        bounds = np.cumsum(lengths) - lengths
+        index = _ranges(segment_starts + 1, lengths)
+
+        first = np.repeat(segment_starts, lengths)
+        last = np.repeat(segment_ends, lengths)
+
+        dx, dy = x[last] - x[first], y[last] - y[first]
+        px, py = x[index] - x[first], y[index] - y[first]
+
+        # distance from the line through the ends, or from the start of a
+        # closed ring
+        norm = np.hypot(dx, dy)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            distance = np.where(
+                norm > 0, np.abs(dx * py - dy * px) / norm, np.hypot(px, py)
+            )
+
+        furthest = np.maximum.reduceat(distance, bounds)
+
+        # the first furthest point of each segment
+        is_furthest = distance == np.repeat(furthest, lengths)
+        split = np.minimum.reduceat(np.where(is_furthest, index, len(x)), bounds)
+
+        far = furthest > tolerance
+        keep[split[far]] = True
+
+        segment_starts = np.concatenate([segment_starts[far], split[far]])
+        segment_ends = np.concatenate([split[far], segment_ends[far]])
+
+        # segments without interior points are done
+        interior = segment_ends - segment_starts > 1
+        segment_starts = segment_starts[interior]
+        segment_ends = segment_ends[interior]
+
+    return keep
+
+
+def _geometry_lines(geometry):
+    """
+    Get the lines of a geometry and whether each is a polygon exterior.
+    """
+    kind = geometry.get("type")
+    coordinates = geometry.get("coordinates")
+
+    if kind == "Polygon":
+        polygons = [coordinates]
+    elif kind == "MultiPolygon":
+        polygons = coordinates
+    elif kind == "LineString":
+        return [(coordinates, None)]
+    elif kind == "MultiLineString":
+        return [(x, None) for x in coordinates]
+    else:
+        return []
+
+    return [(ring, i == 0) for polygon in polygons for i, ring in enumerate(polygon)]
+
+
+def _simplified_geometry(geometry, lines):
+    """
+    Rebuild a geometry from its simplified lines.
+
+    Polygon holes reduced to fewer than four points are dropped.
+    """
+    kind = geometry["type"]
+    lines = iter(lines)
+
+    if kind == "LineString":
+        coordinates = next(lines)
+    elif kind == "MultiLineString":
+        coordinates = [next(lines) for _ in geometry["coordinates"]]
+    else:
+        polygons = geometry["coordinates"]
+        if kind == "Polygon":
+            polygons = [polygons]
+
+        coordinates = []
+        for polygon in polygons:
+            rings = [next(lines) for _ in polygon]
+            coordinates.append([rings[0]] + [x for x in rings[1:] if len(x) >= 4])
+
+        if kind == "Polygon":
+            coordinates = coordinates[0]
+
+    return {**geometry, "coordinates": coordinates}
+
+
+def simplify_geojson(geojson, tolerance):
+    """
+    Simplify the lines and polygons of a GeoJSON feature collection.
+
+    The points of every line and ring of every feature are simplified
+    together with :func:`simplify_lines` and rounded to a tenth of the
+    tolerance. Polygon exteriors keep at least four points.
+
+    Parameters
+    ----------
+    geojson : dict
+        A GeoJSON feature collection.
+    tolerance : float
+        The tolerance in coordinate units.
+
+    Returns
+    -------
+    dict
+        A simplified copy of the feature collection.
+
+    """
+    features = geojson.get("features", [])
+
+    lines = []
+    exterior = []
+    owners = []
+    for i, feature in enumerate(features):
+        for line, is_exterior in _geometry_lines(feature.get("geometry") or {}):
+            lines.append(np.asarray(line, dtype=float).reshape(-1, 2))
+            exterior.append(is_exterior)
+            owners.append(i)
+
+    if not lines:
+        return dict(geojson)
+
+    counts = np.array([len(x) for x in lines])
+    starts = np.cumsum(counts) - counts
+    coords = np.concatenate(lines)
+
+    keep = simplify_lines(coords, starts, counts, tolerance)
+
+    # polygon exteriors keep at least a closed triangle
+    rings = np.repeat(np.arange(len(lines)), counts)
+    kept = np.bincount(rings, keep, minlength=len(lines))
+    small = np.array([x is True for x in exterior]) & (kept < 4) & (counts >= 4)
+    for start, count in zip(starts[small], counts[small]):
+        keep[start + (np.arange(4) * (count - 1)) // 3] = True
+
+    digits = max(0, math.ceil(-math.log10(tolerance)) + 1) if tolerance > 0 else 15
+    coords = np.round(coords, digits)
+
+    simplified = [
+        line[mask].tolist()
+        for line, mask in zip(np.split(coords, starts[1:]), np.split(keep, starts[1:]))
+    ]
+
+    # rebuild each feature from its own simplified lines
+    by_feature = {}
+    for owner, line in zip(owners, simplified):
+        by_feature.setdefault(owner, []).append(line)
+
+    result = []
+    for i, feature in enumerate(features):
+        if i in by_feature:
+            geometry = _simplified_geometry(feature["geometry"], by_feature[i])
+            feature = {**feature, "geometry": geometry}
+        result.append(feature)
+
+    return {**geojson, "features": result}
+
+
+def geojson_bounds(geojson):
+    """
+    Get the bounding box of the lines and polygons of a GeoJSON object.
+
+    Returns
+    -------
+    tuple
+        The minimum x, minimum y, maximum x and maximum y, or ``None`` if
+        there are no lines or polygons.
+
+    """
+    lines = [
+        np.asarray(line, dtype=float).reshape(-1, 2)
+        for feature in geojson.get("features", [])
+        for line, _ in _geometry_lines(feature.get("geometry") or {})
+    ]
+
+    if not lines:
+        return None
+
+    coords = np.concatenate(lines)
+
+    return (*coords.min(axis=0), *coords.max(axis=0))
+
+
+def _location_id(value):
+    """
+    Get a feature id as the string plotly.js compares.
+    """
+    # numbers are written to JSON without a trailing ``.0`` in plotly.js,
+    # so a float location column matches integer ids
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+
+    return str(value)
+
+
+def filter_features(geojson, locations, featureidkey=None):
+    """
+    Keep the features of a GeoJSON feature collection that are referenced.
+
+    Parameters
+    ----------
+    geojson : dict
+        A GeoJSON feature collection.
+    locations : iterable
+        The referenced feature ids. Ids are compared as strings, as they
+        are by plotly.js, so the float ``101.0`` matches the id ``"101"``.
+    featureidkey : str, optional
+        The path to the feature id, such as ``'properties.name'``.
+        Defaults to ``'id'``.
+
+    Returns
+    -------
+    dict
+        A copy of the feature collection with the referenced features.
+
+    """
+    path = (featureidkey or "id").split(".")
+    wanted = {_location_id(x) for x in locations}
+
+    def _feature_id(feature):
+        for key in path:
+            if not isinstance(feature, dict):
+                return None
+            feature = feature.get(key)
+
+        return _location_id(feature)
+
+    features = [x for x in geojson.get("features", []) if _feature_id(x) in wanted]
+
+    return {**geojson, "features": features}
+
+
+def hash_geojson(geojson):
+    """
+    Hash the content of a GeoJSON object.
+
+    Returns
+    -------
+    str
+        A hexadecimal digest, equal for equal objects.
+
+    """
+    text = json.dumps(geojson, sort_keys=True, separators=(",", ":"), default=str)
+
+    return hashlib.blake2b(text.encode(), digest_size=20).hexdigest()
+
+
+class GeometryCache:
+
+    """
+    Geometry cache class.
+
+    Holds simplified GeoJSON feature collections so each is simplified
+    once however many figures draw it, even if each figure loads its own
+    copy.
+
+    Feature collections are identified by a hash of their content, which
+    is computed once for each of the last ``maxsize`` objects seen, so
+    one that is edited in place must be removed with :meth:`invalidate`.
+    Entries are evicted in least recently used order.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of simplified feature collections held.
+
+    """
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._digests = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        """
+        Get the number of simplified feature collections held.
+        """
+        return len(self._entries)
+
+    def _digest(self, geojson):
+        """
+        Get the content hash of a feature collection.
+
+        Each object is hashed once and held with its hash, so its id is
+        not reused by another object.
+        """
+        with self._lock:
+            if id(geojson) in self._digests:
+                self._digests.move_to_end(id(geojson))
+                return self._digests[id(geojson)][1]
+
+        digest = hash_geojson(geojson)
+
+        with self._lock:
+            self._digests[id(geojson)] = (geojson, digest)
+
+            while len(self._digests) > self.maxsize:
+                self._digests.popitem(last=False)
+
+        return digest
+
+    def simplify(self, geojson, tolerance):
+        """
+        Get a simplified GeoJSON feature collection.
+
+        Parameters
+        ----------
+        geojson : dict
+            A GeoJSON feature collection.
+        tolerance : float
+            The tolerance in coordinate units.
+
+        Returns
+        -------
+        dict
+            The simplified feature collection. It is shared between
+            callers and must not be changed.
+
+        """
+        key = (self._digest(geojson), float(tolerance))
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            self.misses += 1
+
+        simplified = simplify_geojson(geojson, tolerance)
+
+        with self._lock:
+            self._entries[key] = simplified
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return simplified
+
+    def invalidate(self):
+        """
+        Remove every simplified feature collection from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+
+    def cache_info(self):
+        """
+        Get the cache statistics.
+
+        Returns
+        -------
+        CacheInfo
+            A named tuple of hits, misses, maximum size and the current
+            number of feature collections held.
+
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
@@ -0,0 +1,262 @@
+"""
+Spiral plotly chunked histogram module.
+"""
+
+from spiral.core.exc import SpiralError
+from spiral.plotly._aggregate import _from_numeric, _to_numeric
+
+import numpy as np
+import pandas as pd
+
+
+class ChunkedHistogram:
+
+    """
+    Chunked histogram class.
+
+    Accumulates the bin counts of a column over data frame chunks so a
+    histogram of any number of rows is computed in constant memory.
+
+    Numeric columns are binned into ``nbins`` equal width bins. Unless
+    a range is given, the bins cover the first chunk and whenever a
+    later chunk falls outside them neighbouring bins are merged in pairs
+    to double the covered range, so the counts stay exact. Other columns
+    are counted by distinct value.
+
+    Parameters
+    ----------
+    x : str
+        The name of the column to bin.
+    by : list of str, optional
+        Columns whose distinct values are counted separately.
+    values : str, optional
+        The name of a column whose values are summed in each bin.
+    nbins : int
+        The number of bins of a numeric column. Odd numbers are rounded
+        up so bins can be merged in pairs.
+    range : tuple of float, optional
+        A fixed range of the bins. Values outside the range are ignored.
+
+    """
+
+    def __init__(self, x, by=None, values=None, nbins=100, range=None):
+        self.x = x
+        self.by = list(by or [])
+        self.values = values
+        self.nbins = nbins + nbins % 2
+        self.range = range
+        self.rows = 0
+
+        self._keys = {}
+        self._dtype = None
+        self._numeric = None
+        self._start = None
+        self._width = None
+        self._counts = np.zeros((0, self.nbins))
+        self._sums = np.zeros((0, self.nbins))
+        self._categories = None
+
+    def _group_codes(self, chunk):
+        if not self.by:
+            if not self._keys:
+                self._keys[()] = 0
+            return np.zeros(len(chunk), dtype=np.int64)
+
+        codes, uniques = pd.factorize(pd.MultiIndex.from_frame(chunk[self.by]))
+
+        mapping = np.empty(len(uniques), dtype=np.int64)
+        for i, key in enumerate(uniques):
+            mapping[i] = self._keys.setdefault(key, len(self._keys))
+
+        return np.where(codes >= 0, mapping[np.maximum(codes, 0)], -1)
+
+    def _grow(self):
+        missing = len(self._keys) - len(self._counts)
+
+        if missing > 0:
+            padding = np.zeros((missing, self.nbins))
+            self._counts = np.vstack([self._counts, padding])
+            self._sums = np.vstack([self._sums, padding])
+
+    def _extend(self, minimum, maximum):
+        half = self.nbins // 2
+
+        while True:
+            end = self._start + self.nbins * self._width
+
+            if minimum >= self._start and maximum < end:
+                return
+
+            # merge neighbouring bins and double the covered range
+            counts = self._counts.reshape(-1, half, 2).sum(axis=2)
+            sums = self._sums.reshape(-1, half, 2).sum(axis=2)
+            padding = np.zeros_like(counts)
+
+            if minimum < self._start:
+                self._counts = np.hstack([padding, counts])
+                self._sums = np.hstack([padding, sums])
+                self._start -= self.nbins * self._width
+            else:
+                self._counts = np.hstack([counts, padding])
+                self._sums = np.hstack([sums, padding])
+
+            self._width *= 2
+
+    def add(self, chunk):
+        """
+        Add the rows of a data frame chunk to the histogram.
+
+        Parameters
+        ----------
+        chunk : pandas.DataFrame
+            The data frame chunk.
+
+        """
+        series = chunk[self.x]
+
+        if self._numeric is None:
+            self._numeric = pd.api.types.is_numeric_dtype(
+                series
+            ) or pd.api.types.is_datetime64_any_dtype(series)
+
+        codes = self._group_codes(chunk)
+        self._grow()
+        self.rows += len(chunk)
+
+        if self.values is None:
+            weights = np.ones(len(chunk))
+        else:
+            weights = chunk[self.values].to_numpy(dtype=float, na_value=np.nan)
+
+        if not self._numeric:
+            self._add_categories(series, codes, weights)
+            return
+
+        values, self._dtype = _to_numeric(series)
+
+        mask = np.isfinite(values) & (codes >= 0) & np.isfinite(weights)
+        values, codes, weights = values[mask], codes[mask], weights[mask]
+
+        if len(values) == 0:
+            return
+
+        if self._start is None:
+            if self.range is not None:
+                start, end = self.range
+                self._width = (end - start) / self.nbins
+            else:
+                start, end = values.min(), values.max()
+                # the maximum lies inside the last bin
+                self._width = (end - start) / (self.nbins - 1) if end > start else 1
+            self._start = start
+
+        if self.range is None:
+            self._extend(values.min(), values.max())
+        else:
+            inside = (values >= self._start) & (
+                values <= self._start + self.nbins * self._width
+            )
+            values, codes, weights = values[inside], codes[inside], weights[inside]
+
+        bins = np.floor((values - self._start) / self._width).astype(np.int64)
+        index = codes * self.nbins + np.clip(bins, 0, self.nbins - 1)
+        size = len(self._counts) * self.nbins
+
+        self._counts += np.bincount(index, minlength=size).reshape(-1, self.nbins)
+        self._sums += np.bincount(index, weights, minlength=size).reshape(
+            -1, self.nbins
+        )
+
+    def _add_categories(self, series, codes, weights):
+        frame = pd.DataFrame(
+            {"group": codes, "x": series.values, "count": 1, "sum": weights}
+        )
+        frame = frame[frame["group"] >= 0]
+        grouped = frame.groupby(["group", "x"], sort=False, observed=True)
+        totals = grouped[["count", "sum"]].sum()
+
+        if self._categories is None:
+            self._categories = totals
+        else:
+            self._categories = self._categories.add(totals, fill_value=0)
+
+    def result(self, histfunc="count", name="count"):
+        """
+        Get the accumulated histogram.
+
+        Parameters
+        ----------
+        histfunc : str
+            One of ``'count'``, ``'sum'`` or ``'avg'``.
+        name : str
+            The name of the aggregated column.
+
+        Raises
+        ------
+        SpiralError
+            If the histogram function is not supported.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per non-empty bin and group, with ``x`` holding the
+            bin centre or the distinct value.
+        dict
+            The bins in the form of plotly ``xbins``, or ``None`` for
+            non-numeric columns.
+
+        """
+        if histfunc not in ("count", "sum", "avg"):
+            raise SpiralError(f"Unsupported histfunc '{histfunc}' for binned data")
+
+        keys = list(self._keys)
+        bins = None
+
+        if self._numeric:
+            groups, positions = np.nonzero(self._counts)
+            counts = self._counts[groups, positions]
+            sums = self._sums[groups, positions]
+
+            if len(groups) > 0:
+                centers = self._start + (positions + 0.5) * self._width
+                x = _from_numeric(centers, self._dtype)
+            else:
+                x = np.array([])
+
+            if len(groups) > 0:
+                # the bins span the non-empty bins only
+                start = self._start + positions.min() * self._width
+                end = self._start + (positions.max() + 1) * self._width
+                bins = {"start": start, "end": end, "size": self._width}
+
+                if self._dtype is not None:
+                    # date bins are given as dates and sizes in milliseconds
+                    start, end = _from_numeric(np.array([start, end]), self._dtype)
+                    bins = {
+                        "start": str(pd.Timestamp(start)),
+                        "end": str(pd.Timestamp(end)),
+                        "size": self._width / 1e6,
+                    }
+        elif self._categories is not None:
+            groups = self._categories.index.get_level_values(0).values
+            x = self._categories.index.get_level_values(1).values
+            counts = self._categories["count"].values
+            sums = self._categories["sum"].values
+        else:
+            groups, x, counts, sums = [np.array([]) for _ in range(4)]
+
+        if histfunc == "count":
+            aggregated = counts.astype(np.int64)
+        elif histfunc == "sum":
+            aggregated = sums
+        else:
+            aggregated = sums / counts
+
+        result = pd.DataFrame(
+            {column: [keys[i][j] for i in groups] for j, column in enumerate(self.by)},
+            index=range(len(groups)),
+        )
+        result[self.x] = x
+        result[name] = aggregated
+
+        return result, bins
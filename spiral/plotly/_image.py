@@ -0,0 +1,125 @@
+"""
+Spiral plotly image downsampling module.
+"""
+
+from spiral.core.exc import SpiralError
+from spiral.plotly._aggregate import _from_numeric, _to_numeric
+
+import numpy as np
+import pandas as pd
+
+
+def block_starts(length, factor):
+    """
+    Get the first position of each block of a dimension.
+    """
+    return np.arange(0, length, factor)
+
+
+def pool_image(img, factor_y, factor_x, method="mean"):
+    """
+    Reduce an image by pooling blocks of pixels.
+
+    Blocks are ``factor_y`` rows by ``factor_x`` columns, and the blocks
+    at the bottom and right edges hold the remaining pixels. Each block
+    is reduced with a single ``reduceat`` along each axis, so the image
+    is never copied into blocks.
+
+    Parameters
+    ----------
+    img : numpy.ndarray
+        An image with shape (M, N), or (M, N, C) for RGB(A) images.
+    factor_y, factor_x : int
+        The number of rows and columns of each block.
+    method : str
+        Either ``'mean'`` or ``'max'``.
+
+    Raises
+    ------
+    SpiralError
+        If the method is not recognised.
+
+    Returns
+    -------
+    numpy.ndarray
+        The pooled image. Integer images keep their data type and the
+        means are rounded.
+
+    """
+    if method not in ("mean", "max"):
+        raise SpiralError(f"Unrecognised pooling method '{method}'")
+
+    img = np.asarray(img)
+    dtype = img.dtype
+
+    if img.dtype == bool:
+        img = img.astype(np.uint8)
+
+    rows = block_starts(img.shape[0], factor_y)
+    columns = block_starts(img.shape[1], factor_x)
+
+    if method == "max":
+        # missing values propagate as they do for the mean
+        pooled = np.maximum.reduceat(img, rows, axis=0)
+        pooled = np.maximum.reduceat(pooled, columns, axis=1)
+
+        return pooled.astype(dtype)
+
+    pooled = np.add.reduceat(img.astype(float), rows, axis=0)
+    pooled = np.add.reduceat(pooled, columns, axis=1)
+
+    counts = np.outer(
+        np.diff(np.append(rows, img.shape[0])),
+        np.diff(np.append(columns, img.shape[1])),
+    )
+    pooled /= counts.reshape(counts.shape + (1,) * (img.ndim - 2))
+
+    if np.issubdtype(dtype, np.integer) or dtype == bool:
+        pooled = np.round(pooled)
+
+    return pooled.astype(dtype)
+
+
+def pool_coordinates(values, factor):
+    """
+    Reduce the coordinates of one image dimension to its blocks.
+
+    Numeric and date coordinates are averaged over each block and other
+    labels take the label of the first position of each block.
+    """
+    values = pd.Series(values)
+    starts = block_starts(len(values), factor)
+
+    if values.dtype.kind not in "iufmM":
+        return values.values[starts]
+
+    numeric, dtype = _to_numeric(values)
+    counts = np.diff(np.append(starts, len(values)))
+
+    values = _from_numeric(np.add.reduceat(numeric, starts) / counts, dtype)
+
+    # plotly converts an index of dates, but not an array, to dates
+    return values if dtype is None else pd.Index(values)
+
+
+def pool_factors(shape, width, height):
+    """
+    Get the smallest pooling factors that fit an image into a size.
+
+    Parameters
+    ----------
+    shape : tuple
+        The image shape.
+    width, height : int
+        The maximum number of columns and rows.
+
+    Returns
+    -------
+    tuple of int
+        The row and column factors.
+
+    """
+    return (
+        max(int(np.ceil(shape[0] / max(height, 1))), 1),
+        max(int(np.ceil(shape[1] / max(width, 1))), 1),
+    )
@@ -0,0 +1,313 @@
+"""
+Spiral plotly HTML report module.
+"""
+
+import hashlib
+import html
+import threading
+
+from pathlib import Path
+
+from spiral.core.exc import SpiralError
+from spiral.plotly._serialize import (
+    DECODER_JS,
+    MIN_LENGTH,
+    _reduce,
+    dumps,
+    encode_array,
+    encode_figure,
+    plotlyjs_script,
+)
+
+RENDER_JS = """\
+window.spiralArrays = window.spiralArrays || {};
+window.spiralResolve = function resolve(value, cache) {
+  if (Array.isArray(value)) {
+    return value.map(function (x) { return resolve(x, cache); });
+  }
+  if (value === null || typeof value !== "object") {
+    return value;
+  }
+  if (typeof value.spiralRef === "string") {
+    if (!(value.spiralRef in cache)) {
+      cache[value.spiralRef] = window.spiralDecode(
+        window.spiralArrays[value.spiralRef]
+      );
+    }
+    return cache[value.spiralRef];
+  }
+  var result = {};
+  for (var key in value) {
+    result[key] = resolve(value[key], cache);
+  }
+  return result;
+};
+"""
+
+OBSERVER_JS = """\
+(function () {
+  var cache = {};
+  function render(div) {
+    var text = document.getElementById(div.dataset.spec).textContent;
+    var figure = window.spiralResolve(JSON.parse(text), cache);
+    Plotly.newPlot(div, figure.data, figure.layout, figure.config);
+  }
+  var divs = document.querySelectorAll(".spiral-figure");
+  if (!("IntersectionObserver" in window)) {
+    divs.forEach(render);
+    return;
+  }
+  var observer = new IntersectionObserver(function (entries) {
+    entries.forEach(function (entry) {
+      if (entry.isIntersecting) {
+        observer.unobserve(entry.target);
+        render(entry.target);
+      }
+    });
+  }, {rootMargin: "200px"});
+  divs.forEach(function (div) { observer.observe(div); });
+})();
+"""
+
+
+def _script_text(text):
+    """
+    Escape text so it can not close the script element holding it.
+    """
+    return text.replace("</", "<\\/")
+
+
+class Report:
+
+    """
+    HTML report class.
+
+    Writes any number of figures to one self-contained HTML document
+    with a single copy of plotly.js. Each figure is drawn when it first
+    scrolls into view, and arrays repeated across figures, such as a
+    column plotted by several of them, are written once. Figures may be
+    added from several threads.
+
+    Parameters
+    ----------
+    file : str or pathlib.Path or file-like, optional
+        If set, the document is streamed to this file as figures are
+        added, so figures are not held in memory, and completed by
+        :meth:`close`. Otherwise it is returned by :meth:`to_html`.
+    title : str, optional
+        The document title.
+    include_plotlyjs : bool or str
+        ``True`` to inline plotly.js, ``'cdn'`` to load it from the
+        plotly CDN or ``False`` to leave it out.
+    binary, precision, engine
+        See :func:`spiral.plotly._serialize.encode_figure` and
+        :func:`spiral.plotly._serialize.dumps`.
+    config : dict, optional
+        The plotly.js configuration options of every figure.
+
+    """
+
+    def __init__(
+        self,
+        file=None,
+        title=None,
+        include_plotlyjs=True,
+        binary=True,
+        precision=None,
+        engine="auto",
+        config=None,
+    ):
+        self.title = title
+        self.include_plotlyjs = include_plotlyjs
+        self.binary = binary
+        self.precision = precision
+        self.engine = engine
+        self.config = config or {"responsive": True}
+        self.nfigures = 0
+        self.closed = False
+
+        self._arrays = {}
+        self._chunks = []
+        self._file = None
+        self._owned = False
+        self._lock = threading.Lock()
+
+        if file is not None:
+            if hasattr(file, "write"):
+                self._file = file
+            else:
+                self._file = Path(file).open("w", encoding="utf-8")
+                self._owned = True
+
+        self._write(self._header())
+
+    def __enter__(self):
+        """
+        Enter a context.
+        """
+        return self
+
+    def __exit__(self, *args):
+        """
+        Close the report on leaving a context.
+        """
+        self.close()
+
+    def __len__(self):
+        """
+        Get the number of figures written.
+        """
+        return self.nfigures
+
+    @property
+    def narrays(self):
+        """
+        Get the number of distinct arrays written.
+        """
+        return len(self._arrays)
+
+    def _write(self, text):
+        if self._file is not None:
+            self._file.write(text)
+        else:
+            self._chunks.append(text)
+
+    def _header(self):
+        title = html.escape(self.title or "")
+        heading = f"<h1>{title}</h1>" if self.title else ""
+
+        return (
+            '<html><head><meta charset="utf-8" />'
+            f"<title>{title}</title>"
+            f"{plotlyjs_script(self.include_plotlyjs)}"
+            f'<script type="text/javascript">{DECODER_JS}{RENDER_JS}</script>'
+            f"</head><body>{heading}"
+        )
+
+    def _footer(self):
+        return f'<script type="text/javascript">{OBSERVER_JS}</script></body></html>'
+
+    def _store(self, values, precision, pending):
+        """
+        Store an array once and get a reference to it.
+        """
+        encoded = None
+        if self.binary:
+            encoded = encode_array(values, precision)
+
+        if encoded is None:
+            text = dumps(_reduce(values, precision), self.engine)
+            digest = hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+        else:
+            text = None
+            digest = hashlib.blake2b(
+                f"{encoded['dtype']}{encoded['shape']}{encoded['bdata']}".encode(),
+                digest_size=12,
+            ).hexdigest()
+
+        if digest not in self._arrays:
+            key = str(len(self._arrays))
+            self._arrays[digest] = key
+
+            if text is None:
+                text = dumps(encoded, self.engine)
+            pending.append(f'window.spiralArrays["{key}"]={_script_text(text)};')
+
+        return {"spiralRef": self._arrays[digest]}
+
+    def add(self, figure, title=None):
+        """
+        Add a figure to the report.
+
+        Parameters
+        ----------
+        figure : plotly.graph_objects.Figure or dict
+            The figure.
+        title : str, optional
+            A heading written above the figure.
+
+        Raises
+        ------
+        SpiralError
+            If the report is closed.
+
+        """
+        with self._lock:
+            self._add(figure, title)
+
+    def _add(self, figure, title):
+        if self.closed:
+            raise SpiralError("Cannot add a figure to a closed report")
+
+        pending = []
+        encoded = encode_figure(
+            figure,
+            binary=True,
+            precision=self.precision,
+            min_length=MIN_LENGTH,
+            encoder=lambda values, precision: self._store(values, precision, pending),
+        )
+        encoded["config"] = self.config
+
+        layout = encoded.get("layout", {})
+        width, height = layout.get("width"), layout.get("height")
+        style = (
+            f"width:{f'{width}px' if width else '100%'};"
+            f"height:{f'{height}px' if height else '450px'};"
+        )
+
+        index = self.nfigures
+        self.nfigures += 1
+
+        text = ""
+        if title is not None:
+            text += f"<h2>{html.escape(title)}</h2>"
+        if pending:
+            text += f'<script type="text/javascript">{"".join(pending)}</script>'
+
+        spec = _script_text(dumps(encoded, self.engine))
+        text += (
+            f'<div class="spiral-figure" id="spiral-figure-{index}"'
+            f' data-spec="spiral-spec-{index}" style="{style}"></div>'
+            f'<script type="application/json" id="spiral-spec-{index}">{spec}</script>'
+        )
+
+        self._write(text)
+
+    def to_html(self):
+        """
+        Get the complete document of a report that is not streamed.
+
+        Raises
+        ------
+        SpiralError
+            If the report is streamed to a file.
+
+        Returns
+        -------
+        str
+            The HTML text.
+
+        """
+        if self._file is not None:
+            raise SpiralError("The report is streamed to a file")
+
+        with self._lock:
+            return "".join(self._chunks) + self._footer()
+
+    def close(self):
+        """
+        Complete the report, writing the end of a streamed document.
+        """
+        with self._lock:
+            if self.closed:
+                return
+
+            if self._file is not None:
+                self._file.write(self._footer())
+                if self._owned:
+                    self._file.close()
+                else:
+                    self._file.flush()
+
+            self.closed = True
@@ -0,0 +1,407 @@
+"""
+Spiral plotly figure serialization module.
+"""
+
+import base64
+import json
+import uuid
+
+from spiral.core.exc import SpiralError
+
+import numpy as np
+
+MIN_LENGTH = 16
+
+# typed array codes of plotly.js, which decodes them natively since
+# version 2.28 and through DECODER_JS in earlier versions
+TYPED_ARRAYS = {
+    "float64": "f8",
+    "float32": "f4",
+    "int32": "i4",
+    "uint32": "u4",
+    "int16": "i2",
+    "uint16": "u2",
+    "int8": "i1",
+    "uint8": "u1",
+}
+
+DECODER_JS = """\
+window.spiralDecode = window.spiralDecode || function decode(value) {
+  var types = {
+    f8: Float64Array, f4: Float32Array, i4: Int32Array, u4: Uint32Array,
+    i2: Int16Array, u2: Uint16Array, i1: Int8Array, u1: Uint8Array
+  };
+  if (Array.isArray(value)) {
+    return value.map(decode);
+  }
+  if (value === null || typeof value !== "object") {
+    return value;
+  }
+  if (typeof value.bdata === "string" && types[value.dtype]) {
+    var text = atob(value.bdata);
+    var bytes = new Uint8Array(text.length);
+    for (var i = 0; i < text.length; i++) {
+      bytes[i] = text.charCodeAt(i);
+    }
+    var array = new types[value.dtype](bytes.buffer);
+    if (!value.shape || String(value.shape).indexOf(",") < 0) {
+      return array;
+    }
+    var columns = parseInt(String(value.shape).split(",")[1], 10);
+    var rows = [];
+    for (var start = 0; start < array.length; start += columns) {
+      rows.push(array.subarray(start, start + columns));
+    }
+    return rows;
+  }
+  var result = {};
+  for (var key in value) {
+    result[key] = decode(value[key]);
+  }
+  return result;
+};
+"""
+
+
+def _reduce(values, precision):
+    """
+    Reduce the precision of a float array.
+    """
+    if precision is None or values.dtype.kind != "f":
+        return values
+
+    if precision == "float32":
+        return values.astype(np.float32)
+
+    if isinstance(precision, int) and not isinstance(precision, bool):
+        return np.round(values, precision)
+
+    raise SpiralError(f"Unrecognised precision '{precision}'")
+
+
+def _narrow(values):
+    """
+    Convert an array to the smallest typed array holding its values.
+    """
+    if values.dtype.kind == "b":
+        return values.astype(np.uint8)
+
+    if values.dtype == np.float16:
+        return values.astype(np.float32)
+
+    if values.dtype.kind not in "iu":
+        return values
+
+    if len(values) == 0:
+        return values.astype(np.int32)
+
+    low, high = values.min(), values.max()
+    for dtype in (np.uint8, np.int8, np.uint16, np.int16, np.int32, np.uint32):
+        info = np.iinfo(dtype)
+        if low >= info.min and high <= info.max:
+            return values.astype(dtype)
+
+    # plotly.js has no 64 bit integer typed arrays
+    return values.astype(np.float64)
+
+
+def _shorter_as_text(values, width):
+    """
+    Check whether the values are short when written as text.
+
+    Values are short if each takes at most ``width`` characters, as
+    integers or floats with few decimals do.
+    """
+    finite = values[np.isfinite(values)] if values.dtype.kind == "f" else values
+
+    if len(finite) == 0:
+        return True
+
+    largest = float(np.abs(finite).max())
+    digits = len(str(int(largest))) + 1 + int((finite < 0).any())
+
+    if values.dtype.kind != "f":
+        return digits <= width
+
+    # each decimal adds a character after the decimal point
+    for decimals in range(int(width - digits)):
+        if np.array_equal(np.round(finite, decimals), finite):
+            return True
+
+    return False
+
+
+def encode_array(values, precision=None, compact=True):
+    """
+    Encode a numeric array as a base64 typed array.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        A one or two dimensional numeric array.
+    precision : str or int, optional
+        Either ``'float32'`` to store floats in single precision or a
+        number of decimals to round floats to.
+    compact : bool
+        If ``True`` arrays whose values are shorter written as text,
+        such as floats with few decimals, are not encoded.
+
+    Returns
+    -------
+    dict or None
+        The ``dtype``, ``bdata`` and ``shape`` of the typed array, or
+        ``None`` if the array is not encoded.
+
+    """
+    if values.ndim not in (1, 2) or values.dtype.kind not in "biuf":
+        return None
+
+    values = _narrow(_reduce(values, precision))
+
+    # base64 takes four characters for every three bytes
+    if compact and _shorter_as_text(values.ravel(), values.itemsize * 4 / 3):
+        return None
+
+    dtype = TYPED_ARRAYS[values.dtype.name]
+    data = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+
+    return {
+        "dtype": dtype,
+        "bdata": base64.b64encode(data.tobytes()).decode("ascii"),
+        "shape": ", ".join(str(x) for x in values.shape),
+    }
+
+
+def _encode(value, binary, precision, min_length, encoder):
+    if isinstance(value, dict):
+        return {
+            k: _encode(v, binary, precision, min_length, encoder)
+            for k, v in value.items()
+        }
+
+    if isinstance(value, (list, tuple)):
+        return [_encode(x, binary, precision, min_length, encoder) for x in value]
+
+    if not isinstance(value, np.ndarray) or value.size < min_length:
+        return value
+
+    if binary:
+        encoded = encoder(value, precision)
+        if encoded is not None:
+            return encoded
+
+    return _reduce(value, precision)
+
+
+def _trace_precision(precision, index, trace):
+    if not isinstance(precision, dict):
+        return precision
+
+    if trace.get("name") in precision:
+        return precision[trace["name"]]
+
+    return precision.get(index)
+
+
+def encode_figure(
+    figure, binary=True, precision=None, min_length=MIN_LENGTH, encoder=None
+):
+    """
+    Encode a figure as a dictionary ready for JSON serialization.
+
+    Parameters
+    ----------
+    figure : plotly.graph_objects.Figure or dict
+        The figure.
+    binary : bool
+        If ``True`` numeric trace arrays are encoded as base64 typed
+        arrays, which are decoded by plotly.js or by :data:`DECODER_JS`.
+    precision : str or int or dict, optional
+        Either ``'float32'`` to store float trace arrays in single
+        precision or a number of decimals to round them to. A dictionary
+        sets the precision of each trace by name or position.
+    min_length : int
+        Arrays shorter than this are kept as arrays of numbers.
+    encoder : callable, optional
+        The function encoding each array, :func:`encode_array` by default.
+
+    Returns
+    -------
+    dict
+        The encoded figure. Arrays not encoded are left as NumPy arrays.
+
+    """
+    if not isinstance(figure, dict):
+        figure = figure.to_plotly_json()
+
+    encoder = encoder or encode_array
+
+    data = []
+    for i, trace in enumerate(figure.get("data", [])):
+        trace_precision = _trace_precision(precision, i, trace)
+        data.append(_encode(trace, binary, trace_precision, min_length, encoder))
+
+    return {**figure, "data": data}
+
+
+def _default(value):
+    from plotly.utils import PlotlyJSONEncoder
+
+    return PlotlyJSONEncoder().default(value)
+
+
+def dumps(value, engine="auto"):
+    """
+    Serialize a value holding figure objects to JSON.
+
+    Parameters
+    ----------
+    value : any
+        The value, such as an encoded figure.
+    engine : str
+        Either ``'orjson'``, ``'json'`` or ``'auto'``, which uses
+        ``orjson`` when it is installed. ``orjson`` writes NumPy arrays
+        natively and single precision floats in their shortest form.
+
+    Raises
+    ------
+    SpiralError
+        If the engine is not recognised or not installed.
+
+    Returns
+    -------
+    str
+        The JSON text, with missing values written as ``null``.
+
+    """
+    if engine not in ("auto", "orjson", "json"):
+        raise SpiralError(f"Unrecognised JSON engine '{engine}'")
+
+    if engine in ("auto", "orjson"):
+        try:
+            import orjson
+        except ImportError:
+            if engine == "orjson":
+                raise SpiralError("The JSON engine 'orjson' is not installed")
+        else:
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            return orjson.dumps(value, default=_default, option=option).decode()
+
+    from plotly.utils import PlotlyJSONEncoder
+
+    return json.dumps(value, cls=PlotlyJSONEncoder, separators=(",", ":"))
+
+
+def to_json(figure, binary=True, precision=None, engine="auto"):
+    """
+    Serialize a figure to compact JSON.
+
+    See :func:`encode_figure` and :func:`dumps` for the parameters.
+
+    Returns
+    -------
+    str
+        The JSON text.
+
+    """
+    return dumps(encode_figure(figure, binary=binary, precision=precision), engine)
+
+
+def plotlyjs_script(include_plotlyjs=True):
+    """
+    Get the script element that loads plotly.js.
+
+    Parameters
+    ----------
+    include_plotlyjs : bool or str
+        ``True`` to inline the bundled plotly.js, ``'cdn'`` to load it
+        from the plotly CDN or ``False`` if it is loaded elsewhere.
+
+    Returns
+    -------
+    str
+        The script element, empty if plotly.js is not included.
+
+    """
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+    if include_plotlyjs is True:
+        return f'<script type="text/javascript">{get_plotlyjs()}</script>'
+
+    if include_plotlyjs == "cdn":
+        version = get_plotlyjs_version()
+        return f'<script src="https://cdn.plot.ly/plotly-{version}.min.js"></script>'
+
+    if include_plotlyjs is False:
+        return ""
+
+    raise SpiralError(f"Unrecognised include_plotlyjs '{include_plotlyjs}'")
+
+
+def _size(layout, key):
+    value = layout.get(key)
+
+    return f"{value}px" if value is not None else "100%"
+
+
+def to_html(
+    figure,
+    binary=True,
+    precision=None,
+    engine="auto",
+    include_plotlyjs=True,
+    full_html=True,
+    config=None,
+    div_id=None,
+):
+    """
+    Serialize a figure to HTML.
+
+    The figure is written as compact JSON, with :data:`DECODER_JS` to
+    turn typed arrays back into arrays for any version of plotly.js.
+
+    Parameters
+    ----------
+    figure : plotly.graph_objects.Figure or dict
+        The figure.
+    binary, precision, engine
+        See :func:`encode_figure` and :func:`dumps`.
+    include_plotlyjs : bool or str
+        See :func:`plotlyjs_script`.
+    full_html : bool
+        If ``True`` a complete document is written, otherwise a ``div``
+        element.
+    config : dict, optional
+        The plotly.js configuration options.
+    div_id : str, optional
+        The identifier of the figure ``div``. Defaults to a random one.
+
+    Returns
+    -------
+    str
+        The HTML text.
+
+    """
+    encoded = encode_figure(figure, binary=binary, precision=precision)
+    layout = encoded.get("layout", {})
+    div_id = div_id or str(uuid.uuid4())
+
+    text = dumps(encoded, engine)
+    config = dumps(config or {"responsive": True}, engine)
+
+    body = (
+        f"<div>{plotlyjs_script(include_plotlyjs)}"
+        f'<script type="text/javascript">{DECODER_JS}</script>'
+        f'<div id="{div_id}" class="plotly-graph-div"'
+        f' style="height:{_size(layout, "height")};'
+        f' width:{_size(layout, "width")};"></div>'
+        f'<script type="text/javascript">'
+        f"var figure = window.spiralDecode({text});"
+        f'Plotly.newPlot("{div_id}", figure.data, figure.layout, {config});'
+        f"</script></div>"
+    )
+
+    if not full_html:
+        return body
+
+    return '<html><head><meta charset="utf-8" /></head>' f"<body>{body}</body></html>"
@@ -0,0 +1,240 @@
+"""
+Spiral plotly column statistics module.
+"""
+
+import threading
+import weakref
+
+from collections import OrderedDict
+
+from spiral.plotly._cache import CacheInfo
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_SIZE = 32
+
+
+def _buffer(series):
+    """
+    Get the array backing a series without copying it.
+    """
+    if hasattr(series, "cat"):
+        return series.cat.codes.to_numpy()
+
+    if isinstance(series.dtype, np.dtype):
+        return series.to_numpy()
+
+    return None
+
+
+def _root(values):
+    while isinstance(values.base, np.ndarray):
+        values = values.base
+
+    return values
+
+
+def _fingerprint(values):
+    if len(values) == 0:
+        return b""
+
+    sample = values[np.linspace(0, len(values) - 1, SAMPLE_SIZE).astype(np.int64)]
+
+    return pd.util.hash_array(sample).tobytes()
+
+
+def min_max(series):
+    """
+    Get the minimum and maximum value of a series.
+
+    Returns
+    -------
+    tuple
+        The minimum and maximum, or ``None`` for each if the values can
+        not be ordered.
+
+    """
+    try:
+        return series.min(), series.max()
+    except TypeError:
+        return None, None
+
+
+class ColumnStatsCache:
+
+    """
+    Column statistics cache class.
+
+    Holds the number of unique values and the range of data frame
+    columns so they are computed once for each column rather than once
+    for every figure.
+
+    Columns are identified by the memory backing them, so a column is
+    recognised whichever frame or series object refers to it, and its
+    version by a fingerprint of evenly spaced sample values. Columns that
+    are edited in place at positions not covered by the fingerprint
+    must be removed with :meth:`invalidate`, which is why the plot
+    handler only uses the cache if ``stats_cache_size`` is configured.
+    Entries are evicted in least recently used order and as soon as the
+    memory backing them is freed.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of columns held in the cache.
+
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        """
+        Get the number of columns held in the cache.
+        """
+        return len(self._entries)
+
+    @staticmethod
+    def _key(series, values):
+        interface = values.__array_interface__
+        return (
+            id(_root(values)),
+            interface["data"][0],
+            interface["shape"],
+            interface["strides"],
+            str(series.dtype),
+        )
+
+    def _entry(self, series):
+        values = _buffer(series)
+
+        if values is None:
+            return {}
+
+        key = self._key(series, values)
+        root = _root(values)
+        fingerprint = _fingerprint(values)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if (
+                entry is not None
+                and entry["ref"]() is root
+                and entry["fingerprint"] == fingerprint
+            ):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry["stats"]
+
+            self.misses += 1
+
+            entry = {
+                "ref": weakref.ref(root, lambda _: self._evict(key)),
+                "fingerprint": fingerprint,
+                "stats": {},
+            }
+            self._entries[key] = entry
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+            return entry["stats"]
+
+    def _evict(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def nunique(self, series):
+        """
+        Get the number of unique values in a series.
+        """
+        stats = self._entry(series)
+
+        if "nunique" not in stats:
+            stats["nunique"] = series.nunique()
+
+        return stats["nunique"]
+
+    def min_max(self, series):
+        """
+        Get the minimum and maximum value of a series.
+
+        Returns
+        -------
+        tuple
+            The minimum and maximum, or ``None`` for each if the values
+            can not be ordered.
+
+        """
+        stats = self._entry(series)
+
+        if "min_max" not in stats:
+            stats["min_max"] = min_max(series)
+
+        return stats["min_max"]
+
+    def preload(self, data, columns=None):
+        """
+        Compute the statistics of data frame columns ahead of plotting.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            The data frame.
+        columns : list of str, optional
+            The columns to compute statistics for. Defaults to all
+            columns.
+
+        """
+        for column in columns or data.columns:
+            series = data[column]
+            self.nunique(series)
+            self.min_max(series)
+
+    def invalidate(self, data=None):
+        """
+        Remove column statistics from the cache.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame or pandas.Series, optional
+            The frame or series whose statistics are removed. If ``None``
+            the cache is cleared.
+
+        """
+        with self._lock:
+            if data is None:
+                self._entries.clear()
+                return
+
+            if isinstance(data, pd.Series):
+                columns = [data]
+            else:
+                columns = [data[x] for x in data.columns]
+
+            for series in columns:
+                values = _buffer(series)
+
+                if values is not None:
+                    self._entries.pop(self._key(series, values), None)
+
+    def cache_info(self):
+        """
+        Get the cache statistics.
+
+        Returns
+        -------
+        CacheInfo
+            A named tuple of hits, misses, maximum size and the current
+            number of columns held.
+
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
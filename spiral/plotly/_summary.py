@@ -0,0 +1,237 @@
+"""
+Spiral plotly summary statistics module.
+"""
+
+from spiral.core.exc import SpiralError
+
+import numpy as np
+
+
+def _object_array(items):
+    """
+    Make a one dimensional object array holding arrays of any length.
+    """
+    array = np.empty(len(items), dtype=object)
+
+    for i, item in enumerate(items):
+        array[i] = item
+
+    return array
+
+
+def _sorted_groups(data, value, by):
+    """
+    Sort the finite values of a column by group and then by value.
+
+    Returns the key values of each non-empty group, the sorted values,
+    their group codes and the position and size of each group.
+    """
+    values = data[value].to_numpy(dtype=float, na_value=np.nan)
+
+    if by:
+        codes = data.groupby(by, sort=False, observed=True).ngroup()
+        codes = codes.fillna(-1).values.astype(np.int64)
+    else:
+        codes = np.zeros(len(data), dtype=np.int64)
+
+    mask = np.isfinite(values) & (codes >= 0)
+    values, codes = values[mask], codes[mask]
+
+    # renumber the non-empty groups
+    present = np.bincount(codes) > 0
+    codes = (np.cumsum(present) - 1)[codes]
+
+    # a stable sort of small integer codes is a radix sort
+    if present.sum() < 2**15:
+        codes = codes.astype(np.int16)
+
+    order = np.argsort(codes, kind="stable")
+    values, codes = values[order], codes[order].astype(np.int64)
+
+    counts = np.bincount(codes, minlength=present.sum())
+    starts = np.cumsum(counts) - counts
+
+    # sort the values within each group in place
+    for start, end in zip(starts, starts + counts):
+        values[start:end].sort()
+
+    # the key values of each group are taken from its first row
+    rows = np.flatnonzero(mask)[order[starts]]
+    keys = data[by].iloc[rows].reset_index(drop=True)
+
+    return keys, values, codes, starts, counts
+
+
+def _quantile(values, starts, counts, q):
+    """
+    Linearly interpolated quantile of each group of sorted values.
+    """
+    position = starts + q * (counts - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, starts + counts - 1)
+    fraction = position - lower
+
+    return values[lower] + (values[upper] - values[lower]) * fraction
+
+
+def _select_outliers(values, codes, inside, ngroups, max_outliers):
+    """
+    Select at most ``max_outliers`` evenly ranked outliers of each group.
+    """
+    index = np.flatnonzero(~inside)
+    outlier_codes = codes[index]
+
+    counts = np.bincount(outlier_codes, minlength=ngroups)
+    starts = np.cumsum(counts) - counts
+    rank = np.arange(len(index)) - starts[outlier_codes]
+    size = counts[outlier_codes]
+
+    if max_outliers <= 0:
+        keep = np.zeros(len(index), dtype=bool)
+    elif max_outliers == 1:
+        keep = rank == 0
+    else:
+        # keep the outlier nearest to each of max_outliers evenly
+        # spaced ranks, which always includes the most extreme ones
+        scale = (size - 1) / (max_outliers - 1)
+        nearest = np.round(np.round(rank / np.maximum(scale, 1)) * scale)
+        keep = (size <= max_outliers) | (rank == nearest)
+
+    selected = values[index[keep]]
+    bounds = np.cumsum(np.bincount(outlier_codes[keep], minlength=ngroups))[:-1]
+
+    return _object_array(np.split(selected, bounds))
+
+
+def _kde(values, codes, starts, counts, q1, q3, npoints):
+    """
+    Gaussian kernel density estimate of each group on a regular grid.
+
+    The values are linearly binned onto the grid and the bins of all
+    groups are convolved with their kernel at once with a real FFT.
+    """
+    ngroups = len(counts)
+
+    # Silverman's rule of thumb, as used by plotly.js
+    mean = np.add.reduceat(values, starts) / counts
+    deviation = values - mean[codes]
+    std = np.sqrt(np.add.reduceat(deviation**2, starts) / np.maximum(counts - 1, 1))
+    spread = np.where((q3 - q1) > 0, np.minimum(std, (q3 - q1) / 1.349), std)
+    bandwidth = 1.059 * spread * counts ** (-1 / 5)
+
+    minimum = values[starts]
+    maximum = values[starts + counts - 1]
+    span = np.where(maximum > minimum, maximum - minimum, 1.0)
+    bandwidth = np.where(bandwidth > 0, bandwidth, span / 10)
+
+    # extend the grid by two bandwidths either side, as plotly.js does
+    start = minimum - 2 * bandwidth
+    step = (maximum - minimum + 4 * bandwidth) / (npoints - 1)
+
+    # the kernel can not be narrower than the grid spacing
+    bandwidth = np.maximum(bandwidth, step)
+
+    position = (values - start[codes]) / step[codes]
+    lower = np.clip(np.floor(position).astype(np.int64), 0, npoints - 1)
+    upper = np.minimum(lower + 1, npoints - 1)
+    weight = position - lower
+
+    size = ngroups * npoints
+    binned = np.bincount(codes * npoints + lower, 1 - weight, minlength=size)
+    binned += np.bincount(codes * npoints + upper, weight, minlength=size)
+    binned = binned.reshape(ngroups, npoints)
+
+    # circular offsets of a zero padded grid
+    length = 2 * npoints
+    offset = np.arange(length)
+    offset = np.where(offset < npoints, offset, offset - length)
+
+    sigma = (bandwidth / step)[:, None]
+    kernel = np.exp(-0.5 * (offset[None, :] / sigma) ** 2)
+
+    density = np.fft.irfft(
+        np.fft.rfft(binned, length) * np.fft.rfft(kernel, length), length
+    )[:, :npoints]
+    density = (
+        np.maximum(density, 0) / (counts * bandwidth * np.sqrt(2 * np.pi))[:, None]
+    )
+
+    grid = start[:, None] + step[:, None] * np.arange(npoints)[None, :]
+
+    return _object_array(list(grid)), _object_array(list(density))
+
+
+def summarize(data, value, by=None, whisker=1.5, max_outliers=100, kde_points=None):
+    """
+    Compute box and violin statistics of a column for each group.
+
+    The values are sorted once by group and value and every statistic
+    is then computed for all groups at once with vectorized NumPy
+    operations.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The data frame.
+    value : str
+        The name of the column to summarize.
+    by : list of str, optional
+        The columns that split the rows into groups.
+    whisker : float
+        The whiskers extend to the furthest values within this many
+        interquartile ranges of the quartiles.
+    max_outliers : int
+        The maximum number of outliers kept for each group. Outliers are
+        selected evenly by rank so the most extreme are always kept.
+    kde_points : int, optional
+        If set, a kernel density estimate is evaluated on a grid of this
+        many points for each group.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per non-empty group with the ``by`` columns and the
+        ``count``, ``q1``, ``median``, ``q3``, ``lowerfence``,
+        ``upperfence``, ``mean``, ``notchspan`` and ``outliers``
+        statistics, and the ``grid`` and ``density`` arrays if
+        ``kde_points`` is set.
+
+    """
+    by = list(by or [])
+
+    keys, values, codes, starts, counts = _sorted_groups(data, value, by)
+
+    if len(counts) == 0:
+        raise SpiralError(f"No finite values to summarize in column '{value}'")
+
+    result = keys.copy()
+    result["count"] = counts
+
+    q1 = _quantile(values, starts, counts, 0.25)
+    median = _quantile(values, starts, counts, 0.5)
+    q3 = _quantile(values, starts, counts, 0.75)
+    iqr = q3 - q1
+
+    inside = (values >= (q1 - whisker * iqr)[codes]) & (
+        values <= (q3 + whisker * iqr)[codes]
+    )
+
+    result["q1"] = q1
+    result["median"] = median
+    result["q3"] = q3
+    result["lowerfence"] = np.minimum.reduceat(np.where(inside, values, np.inf), starts)
+    result["upperfence"] = np.maximum.reduceat(
+        np.where(inside, values, -np.inf), starts
+    )
+    result["mean"] = np.add.reduceat(values, starts) / counts
+    result["notchspan"] = 1.57 * iqr / np.sqrt(counts)
+    result["outliers"] = _select_outliers(
+        values, codes, inside, len(counts), max_outliers
+    )
+
+    if kde_points is not None:
+        grid, density = _kde(values, codes, starts, counts, q1, q3, kde_points)
+        result["grid"] = grid
+        result["density"] = density
+
+    return result
@@ -0,0 +1,325 @@
+"""
+Spiral plotly trendline module.
+"""
+
+from spiral.core.exc import SpiralError
+from spiral.plotly._summary import _object_array
+
+import numpy as np
+import pandas as pd
+
+
+def _sorted_groups(x, codes, ngroups):
+    """
+    Sort points by group and then by x.
+
+    Returns the sort order and the position and size of each group.
+    """
+    # a stable sort of small integer codes is a radix sort
+    if ngroups < 2**15:
+        order = np.argsort(codes.astype(np.int16), kind="stable")
+    else:
+        order = np.argsort(codes, kind="stable")
+
+    counts = np.bincount(codes, minlength=ngroups)
+    starts = np.cumsum(counts) - counts
+
+    # sort the points within each group by x
+    for start, end in zip(starts, starts + counts):
+        group = order[start:end]
+        order[start:end] = group[np.argsort(x[group])]
+
+    return order, starts, counts
+
+
+def _grid(start, end, npoints, log=False):
+    """
+    Get evenly spaced points between the ends of each group.
+    """
+    steps = np.linspace(0, 1, npoints)[None, :]
+
+    if log:
+        start, end = np.log10(start), np.log10(end)
+
+    grid = start[:, None] + (end - start)[:, None] * steps
+
+    return 10**grid if log else grid
+
+
+def ols(x, y, codes, ngroups, weights=None):
+    """
+    Fit an ordinary least squares line to each group.
+
+    The fit only needs a few sums over each group, which are computed
+    for all groups at once with two passes over the points.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per group with the ``count``, ``slope``, ``intercept``,
+        ``rsquared``, ``min`` and ``max`` of each group.
+
+    """
+    if weights is None:
+        weights = np.ones(len(x))
+
+    count = np.bincount(codes, weights, minlength=ngroups)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.bincount(codes, weights * x, minlength=ngroups) / count
+        y_mean = np.bincount(codes, weights * y, minlength=ngroups) / count
+
+        # deviations from the group means keep the sums well conditioned
+        dx = x - x_mean[codes]
+        dy = y - y_mean[codes]
+
+        sxx = np.bincount(codes, weights * dx * dx, minlength=ngroups)
+        sxy = np.bincount(codes, weights * dx * dy, minlength=ngroups)
+        syy = np.bincount(codes, weights * dy * dy, minlength=ngroups)
+
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+        rsquared = np.where(syy > 0, sxy**2 / (sxx * syy), 1.0)
+
+    extent = pd.Series(x).groupby(codes).agg(["min", "max"]).reindex(range(ngroups))
+
+    return pd.DataFrame(
+        {
+            "count": count,
+            "slope": slope,
+            "intercept": y_mean - slope * x_mean,
+            "rsquared": rsquared,
+            "min": extent["min"].values,
+            "max": extent["max"].values,
+        }
+    )
+
+
+def rolling(x, y, codes, ngroups, window, npoints):
+    """
+    Compute the rolling mean of each group in order of x.
+
+    The means of every window are differences of a cumulative sum over
+    the sorted points. At most ``npoints`` evenly spaced means are kept.
+
+    """
+    order, starts, counts = _sorted_groups(x, codes, ngroups)
+    x, y, codes = x[order], y[order], codes[order]
+    offset = y.mean() if len(y) > 0 else 0.0
+
+    # differences of a sum of small values lose less precision
+    totals = np.concatenate([[0], np.cumsum(y - offset)])
+    index = np.arange(len(x))
+    rank = index - starts[codes]
+
+    valid = rank >= window - 1
+    lower = np.maximum(index + 1 - window, 0)
+    means = (totals[index + 1] - totals[lower]) / window + offset
+
+    # thin each group to evenly spaced means, always keeping the last
+    size = np.maximum(counts - window + 1, 1)
+    step = np.ceil(size / npoints).astype(np.int64)[codes]
+    last = rank == counts[codes] - 1
+    keep = valid & (((rank - window + 1) % step == 0) | last)
+
+    bounds = np.cumsum(np.bincount(codes[keep], minlength=ngroups))[:-1]
+
+    return (
+        _object_array(np.split(x[keep], bounds)),
+        _object_array(np.split(means[keep], bounds)),
+    )
+
+
+def lowess(x, y, codes, ngroups, frac, nbins, weights=None):
+    """
+    Compute a binned locally weighted linear regression of each group.
+
+    The points are binned into ``nbins`` equal width bins of x and a
+    LOWESS fit with tricube weights is made to the bin means, weighted by
+    the number of points in each bin, so the cost of the fit does not
+    depend on the number of points. Robustness iterations are not made.
+
+    """
+    if weights is None:
+        weights = np.ones(len(x))
+
+    extent = pd.Series(x).groupby(codes).agg(["min", "max"]).reindex(range(ngroups))
+    start = extent["min"].values
+    width = (extent["max"].values - start) / nbins
+    width = np.where(width > 0, width, 1.0)
+
+    bins = np.clip(((x - start[codes]) / width[codes]).astype(np.int64), 0, nbins - 1)
+    index = codes * nbins + bins
+    size = ngroups * nbins
+
+    counts = np.bincount(index, weights, minlength=size).reshape(ngroups, nbins)
+    sums_x = np.bincount(index, weights * x, minlength=size).reshape(ngroups, nbins)
+    sums_y = np.bincount(index, weights * y, minlength=size).reshape(ngroups, nbins)
+
+    present = counts > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means_x = np.where(present, sums_x / counts, 0.0)
+        means_y = np.where(present, sums_y / counts, 0.0)
+
+    # distances between the bin means of each group, with empty bins
+    # never among the nearest neighbours
+    distance = np.abs(means_x[:, :, None] - means_x[:, None, :])
+    distance = np.where(present[:, None, :], distance, np.inf)
+
+    # the bandwidth of each bin covers the nearest frac of the points
+    order = np.argsort(distance, axis=2)
+    nearest = np.take_along_axis(distance, order, axis=2)
+    covered = np.cumsum(
+        np.take_along_axis(np.broadcast_to(counts[:, None, :], order.shape), order, 2),
+        axis=2,
+    )
+    needed = (frac * counts.sum(axis=1))[:, None, None]
+    k = np.minimum(np.argmax(covered >= needed, axis=2), nbins - 1)
+    bandwidth = np.take_along_axis(nearest, k[:, :, None], axis=2)
+    bandwidth = np.where(
+        np.isfinite(bandwidth) & (bandwidth > 0), bandwidth, width[:, None, None]
+    )
+
+    with np.errstate(invalid="ignore"):
+        scaled = np.minimum(distance / bandwidth, 1.0)
+    kernel = counts[:, None, :] * (1 - scaled**3) ** 3
+
+    # a weighted linear fit centred on each bin mean
+    dx = means_x[:, None, :] - means_x[:, :, None]
+    s0 = kernel.sum(axis=2)
+    s1 = (kernel * dx).sum(axis=2)
+    s2 = (kernel * dx * dx).sum(axis=2)
+    t0 = (kernel * means_y[:, None, :]).sum(axis=2)
+    t1 = (kernel * dx * means_y[:, None, :]).sum(axis=2)
+
+    determinant = s0 * s2 - s1**2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fitted = np.where(
+            determinant > 1e-12 * np.maximum(s0 * s2, 1e-300),
+            (s2 * t0 - s1 * t1) / determinant,
+            t0 / s0,
+        )
+
+    return (
+        _object_array([means_x[i][present[i]] for i in range(ngroups)]),
+        _object_array([fitted[i][present[i]] for i in range(ngroups)]),
+    )
+
+
+def trendlines(
+    x,
+    y,
+    codes=None,
+    method="ols",
+    weights=None,
+    sample=None,
+    window=20,
+    frac=2 / 3,
+    nbins=100,
+    npoints=100,
+    log_x=False,
+    seed=0,
+):
+    """
+    Compute trendlines of groups of points.
+
+    Every group is fitted at once with vectorized NumPy operations, so
+    the cost grows with the number of points rather than the number of
+    groups.
+
+    Parameters
+    ----------
+    x, y : numpy.ndarray
+        The point coordinates.
+    codes : numpy.ndarray, optional
+        The integer group code of each point, from zero.
+    method : str
+        One of ``'ols'``, ``'rolling'`` or ``'lowess'``.
+    weights : numpy.ndarray, optional
+        The weight of each point, such as the number of rows in a bin.
+    sample : int, optional
+        If set, each group is fitted to a random sample of about this
+        many points.
+    window : int
+        The number of points in each rolling mean.
+    frac : float
+        The fraction of the points used in each LOWESS fit.
+    nbins : int
+        The number of LOWESS bins.
+    npoints : int
+        The maximum number of points of each rolling mean, and the number
+        of points of each line fitted on a log x axis.
+    log_x : bool
+        If ``True`` lines are drawn on a log x axis.
+    seed : int
+        The seed of the random sample.
+
+    Raises
+    ------
+    SpiralError
+        If the method is not recognised.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per group with the ``x`` and ``y`` arrays of the line and
+        the ``count`` of points. OLS fits also have the ``slope``,
+        ``intercept`` and ``rsquared`` of each line. Groups without
+        enough points have empty lines.
+
+    """
+    if method not in ("ols", "rolling", "lowess"):
+        raise SpiralError(f"Unrecognised trendline '{method}'")
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    if codes is None:
+        codes = np.zeros(len(x), dtype=np.int64)
+
+    codes = np.asarray(codes, dtype=np.int64)
+    ngroups = int(codes.max()) + 1 if len(codes) > 0 else 0
+
+    mask = np.isfinite(x) & np.isfinite(y)
+    if log_x:
+        mask &= x > 0
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)
+        mask &= np.isfinite(weights)
+
+    if sample is not None:
+        # keep each point of a large group with the same probability
+        counts = np.bincount(codes[mask], minlength=ngroups)
+        chance = np.minimum(sample / np.maximum(counts, 1), 1.0)
+        random = np.random.default_rng(seed).random(len(x))
+        mask &= random < chance[codes]
+
+    x, y, codes = x[mask], y[mask], codes[mask]
+    if weights is not None:
+        weights = weights[mask]
+
+    result = pd.DataFrame({"count": np.bincount(codes, minlength=ngroups)})
+
+    if method == "ols":
+        fit = ols(x, y, codes, ngroups, weights)
+
+        if log_x:
+            line_x = _grid(fit["min"].values, fit["max"].values, npoints, log=True)
+        else:
+            line_x = np.stack([fit["min"].values, fit["max"].values], axis=1)
+
+        line_y = (
+            fit["intercept"].values[:, None] + fit["slope"].values[:, None] * line_x
+        )
+        fitted = (result["count"] > 1) & np.isfinite(fit["slope"])
+
+        result["x"] = _object_array([a if b else a[:0] for a, b in zip(line_x, fitted)])
+        result["y"] = _object_array([a if b else a[:0] for a, b in zip(line_y, fitted)])
+
+        for name in ("slope", "intercept", "rsquared"):
+            result[name] = fit[name].values
+    elif method == "rolling":
+        result["x"], result["y"] = rolling(x, y, codes, ngroups, window, npoints)
+    else:
+        result["x"], result["y"] = lowess(x, y, codes, ngroups, frac, nbins, weights)
+
+    return result
@@ -2,10 +2,14 @@
 Spiral IO utility.
 """
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from spiral.core.exc import SpiralError
 
-import pandas as pd
-import pkg_resources
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def get_package_name() -> str:
@@ -36,6 +40,8 @@ def resource_exists(filename: str) -> bool:
         True if the file exists otherwise False.
 
     """
+    import pkg_resources
+
     return pkg_resources.resource_exists(get_package_name(), filename)
 
 
@@ -54,6 +60,8 @@ def resource_filename(filename: str) -> str:
         True if the file exists otherwise False.
 
     """
+    import pkg_resources
+
     return pkg_resources.resource_filename(get_package_name(), filename)
 
 
@@ -99,6 +107,8 @@ def read_csv(filename: str, **kwargs) -> pd.DataFrame:
         A pandas DataFrame containing the CSV data.
 
     """
+    import pandas as pd
+
     return pd.read_csv(filename, **kwargs)
 
 
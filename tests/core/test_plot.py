@@ -55,3 +55,29 @@ def test_unproviding_handler():
         msg = "Can't instantiate abstract class .* with abstract methods"
         with raises(TypeError, match=msg):
             app.handler.register(BogusHandler)
+
+
+def test_concurrent_first_access():
+    import time
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    class SlowPlotHandler(PlotHandler):
+        class Meta:
+            label = "slow"
+
+        def _setup(self, app):
+            super()._setup(app)
+            time.sleep(0.2)
+
+        def make_figure(self, args, constructor):
+            pass
+
+        scatter = bar = line = box = violin = pie = make_figure
+
+    with TestApp(handlers=[SlowPlotHandler], plot_handler="slow") as app:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            handlers = list(executor.map(lambda _: app.plot, range(8)))
+
+    assert all(isinstance(x, SlowPlotHandler) for x in handlers)
+    assert len({id(x) for x in handlers}) == 1
@@ -1,6 +1,15 @@
-from spiral import TestApp, init_defaults
+import json
+
+from spiral import SpiralError, TestApp, init_defaults
 from spiral.data import load_dataset
 
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+import pytest
+
+from pytest import raises
+
 CONFIG = init_defaults("plot.plotly")
 CONFIG["plot.plotly"]["show_logo"] = True
 CONFIG["plot.plotly"]["show_watermark"] = True
@@ -59,3 +68,783 @@ def test_facet():
             units={"x": "cm", "y": "cm"},
             title="title",
         )
+
+
+def test_note():
+    with PlotlyApp() as app:
+        fig = app.plot.scatter(
+            data_frame=load_dataset("iris"),
+            x="petal_length",
+            y="petal_width",
+            note="note",
+        )
+
+        assert "note" in [x.name for x in fig.layout.annotations]
+
+
+def test_patches():
+    with PlotlyApp() as app:
+        fig = app.plot.scatter(
+            data_frame=load_dataset("iris"),
+            x="petal_length",
+            y="petal_width",
+            color="species",
+            facet_col="species",
+            facet_col_wrap=2,
+            units={"x": "cm"},
+            patches={
+                "data": [{"marker_color": "#FF0000"}],
+                "markers": {"marker_size": 3},
+                "traces": {"hoverinfo": "skip"},
+                "annotations": {"font_size": 9},
+                "yaxis": {"zeroline": False},
+            },
+        )
+
+        assert fig.data[0].marker.color == "rgba(255, 0, 0, 0.5)"
+        assert fig.data[0].marker.line.color == "#FF0000"
+        assert fig.data[1].marker.color.startswith("rgba")
+        assert all(x.marker.size == 3 for x in fig.data)
+        assert all(x.hoverinfo == "skip" for x in fig.data)
+        assert fig.layout.annotations[0].text == "Virginica"
+        assert fig.layout.annotations[0].font.size == 9
+        assert fig.layout.xaxis4.showticklabels is True
+        assert fig.layout.xaxis4.title.text == "Petal Length [cm]"
+        assert fig.layout.yaxis.zeroline is False
+
+
+def test_facet_scale_is_not_cumulative():
+    with PlotlyApp() as app:
+        data = load_dataset("iris")
+        plot_width = app.plot.plot_width
+
+        widths = [
+            app.plot.scatter(
+                data_frame=data, x="petal_length", y="petal_width", facet_col="species"
+            ).layout.width
+            for _ in range(3)
+        ]
+
+        assert len(set(widths)) == 1
+        assert app.plot.plot_width == plot_width
+
+
+def test_threaded_render():
+    from concurrent.futures import ThreadPoolExecutor
+
+    data = load_dataset("iris")
+    kwargs = [
+        {"x": "petal_length", "y": "petal_width", "title": "scatter"},
+        {"x": "petal_length", "y": "petal_width", "facet_col": "species"},
+        {"x": "sepal_length", "y": "sepal_width", "color": "species", "note": "note"},
+    ]
+
+    with PlotlyApp() as app:
+        expected = [app.plot.scatter(data_frame=data, **x) for x in kwargs]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [
+                executor.submit(app.plot.scatter, data_frame=data, **x)
+                for x in kwargs * 8
+            ]
+            figures = [x.result() for x in futures]
+
+    for i, fig in enumerate(figures):
+        assert fig.layout == expected[i % len(kwargs)].layout
+
+
+def test_render_many():
+    data = load_dataset("iris")
+    specs = [
+        ("scatter", {"data_frame": data, "x": "petal_length", "y": "petal_width"}),
+        ("histogram", {"data_frame": data, "x": "petal_length"}),
+        ("scatter", {"data_frame": data, "bogus": "petal_length"}),
+        ("bogus", {}),
+    ]
+
+    with PlotlyApp() as app:
+        app.plot.plot_width = 300
+
+        expected = app.plot.scatter(**specs[0][1])
+        results = app.plot.render_many(specs, workers=2)
+        serial = app.plot.render_many(specs, workers=1, output="json")
+
+    assert [x.error is None for x in results] == [True, True, False, False]
+    assert [x.error is None for x in serial] == [True, True, False, False]
+    assert results[0].value.data[0].type == "scatter"
+    assert results[1].value.data[0].type == "histogram"
+    assert results[0].value.layout == expected.layout
+    assert "Unknown plot method 'bogus'" in results[3].error
+    assert isinstance(serial[0].value, str)
+
+
+def test_cache():
+    config = init_defaults("plot.plotly")
+    config["plot.plotly"]["cache"] = True
+
+    with TestApp(config_defaults=config) as app:
+        data = load_dataset("iris")
+
+        fig1 = app.plot.scatter(data_frame=data, x="petal_length", y="petal_width")
+        fig2 = app.plot.scatter(data_frame=data, x="petal_length", y="petal_width")
+        fig3 = app.plot.scatter(data_frame=data, x="petal_length", y="sepal_width")
+
+        data.loc[0, "petal_length"] = 10
+        app.plot.scatter(data_frame=data, x="petal_length", y="petal_width")
+
+        assert fig1 == fig2
+        assert fig1 != fig3
+        assert app.plot.cache.cache_info().hits == 1
+        assert app.plot.cache.cache_info().misses == 3
+
+        app.plot.cache.invalidate()
+        app.plot.scatter(data_frame=data, x="petal_length", y="petal_width")
+        assert app.plot.cache.cache_info().misses == 4
+
+
+def test_cache_collisions():
+    config = init_defaults("plot.plotly")
+    config["plot.plotly"]["cache"] = True
+
+    with TestApp(config_defaults=config) as app:
+        data = load_dataset("iris")
+
+        fig1 = app.plot.line(data_frame=data, y="petal_width")
+        fig2 = app.plot.line(
+            data_frame=data.set_index(data.index + 100), y="petal_width"
+        )
+
+        assert list(fig2.data[0].x) != list(fig1.data[0].x)
+
+        x = np.arange(1000, dtype=float)
+        fig1 = app.plot.scatter(x=pd.Index(x), y=x)
+        x[500] = -1
+        fig2 = app.plot.scatter(x=pd.Index(x), y=np.arange(1000, dtype=float))
+
+        assert fig1.data[0].x[500] == 500
+        assert fig2.data[0].x[500] == -1
+
+        for metric in [lambda x: -x.var(), lambda x: x.var()]:
+            app.plot.parallel_coordinates(
+                data_frame=data, max_dimensions=2, dimension_rank=metric
+            )
+
+        assert app.plot.cache.cache_info().hits == 0
+
+
+def test_aggregate():
+    data = load_dataset("iris")
+
+    with PlotlyApp() as app:
+        fig = app.plot.scatter(
+            data_frame=data,
+            x="petal_length",
+            y="petal_width",
+            color="species",
+            hover_name="species",
+            aggregate="bin2d",
+        )
+
+        assert sum(sum(x.marker.size) for x in fig.data) == len(data)
+        assert fig.layout.xaxis.title.text == "Petal Length"
+
+        fig = app.plot.density_heatmap(
+            data_frame=data, x="petal_length", y="petal_width", aggregate="bin2d"
+        )
+
+        assert fig.data[0].histfunc == "sum"
+        assert fig.data[0].xbins.size is not None
+
+        fig = app.plot.density_contour(
+            data_frame=data,
+            x="petal_length",
+            y="petal_width",
+            z="sepal_length",
+            color="sepal_length",
+            histfunc="sum",
+            aggregate="bin2d",
+        )
+
+        assert sum(sum(x.z) for x in fig.data) == data["sepal_length"].sum()
+
+        fig = app.plot.density_heatmap(
+            data_frame=data, x="petal_length", y="petal_width", aggregate="auto"
+        )
+
+        assert len(fig.data[0].x) == len(data)
+
+        with raises(SpiralError, match="Unrecognised aggregate mode"):
+            app.plot.scatter(data_frame=data, x="petal_length", aggregate="bogus")
+
+
+def test_aggregate_map():
+    data = load_dataset("carshare")
+    kwargs = {"lat": "centroid_lat", "lon": "centroid_lon", "zoom": 10}
+
+    with PlotlyApp() as app:
+        fig = app.plot.scatter_mapbox(
+            data_frame=data, color="peak_hour", aggregate="hexbin", **kwargs
+        )
+
+        trace = fig.data[0]
+        assert len(trace.lat) < len(data)
+        assert sum(trace.marker.size) == len(data)
+
+        fig = app.plot.density_mapbox(
+            data_frame=data, z="car_hours", aggregate="square", **kwargs
+        )
+
+        trace = fig.data[0]
+        assert len(trace.lat) < len(data)
+        assert np.isclose(sum(trace.z), data["car_hours"].sum())
+        assert trace.radius == 8
+
+
+def test_point_budget():
+    data = load_dataset("iris")
+    kwargs = {"x": "sepal_length", "y": "sepal_width", "z": "petal_width"}
+
+    with PlotlyApp() as app:
+        fig = app.plot.scatter_3d(
+            data_frame=data,
+            color="species",
+            point_budget=30,
+            point_sampling="stratified",
+            **kwargs,
+        )
+
+        assert [len(x.x) for x in fig.data] == [10, 10, 10]
+        assert fig.layout.annotations[-1].text == (
+            "Showing 30 of 150 points (stratified sampling)"
+        )
+
+        fig = app.plot.line_3d(
+            data_frame=data, point_budget=50, note="Source: Fisher", **kwargs
+        )
+
+        assert len(fig.data[0].x) <= 50
+        assert fig.layout.annotations[-1].text.startswith("Source: Fisher. Showing")
+
+        fig = app.plot.scatter_3d(data_frame=data, point_budget=500, **kwargs)
+        assert len(fig.data[0].x) == len(data)
+
+
+def test_max_dimensions():
+    data = load_dataset("iris")
+
+    with PlotlyApp() as app:
+        fig = app.plot.scatter_matrix(
+            data_frame=data, color="species", max_rows=30, max_dimensions=2
+        )
+
+        assert [len(x.dimensions[0].values) for x in fig.data] == [10, 10, 10]
+        assert [x.label for x in fig.data[0].dimensions] == [
+            "Sepal Length",
+            "Petal Length",
+        ]
+        assert fig.layout.annotations[-1].text == (
+            "Showing 30 of 150 rows, 2 of 6 dimensions"
+        )
+
+        fig = app.plot.parallel_coordinates(
+            data_frame=data,
+            max_dimensions=2,
+            dimension_rank=lambda x: -x.var(),
+        )
+
+        assert [x.label for x in fig.data[0].dimensions] == [
+            "Sepal Width",
+            "Petal Width",
+        ]
+
+        fig = app.plot.parallel_categories(
+            data_frame=data, dimensions=["species"], max_rows=500
+        )
+
+        assert "note" not in [x.name for x in fig.layout.annotations]
+
+
+def test_serialize(tmp_path):
+    data = load_dataset("gapminder")
+
+    with PlotlyApp() as app:
+        fig = app.plot.scatter(data_frame=data, x="gdpPercap", y="lifeExp")
+
+        text = app.plot.to_json(fig)
+        assert list(pio.from_json(text).data[0].x) == list(fig.data[0].x)
+
+        text = app.plot.to_json(fig, binary=True)
+        trace = json.loads(text)["data"][0]
+        assert trace["x"]["dtype"] == "f8"
+        assert isinstance(trace["y"], list)
+
+        text = app.plot.to_json(fig, binary=True, precision="float32")
+        assert json.loads(text)["data"][0]["x"]["dtype"] == "f4"
+
+        path = tmp_path / "figure.html"
+        app.plot.write_html(fig, path, include_plotlyjs="cdn")
+        assert "Plotly.newPlot" in path.read_text()
+
+
+def test_report(tmp_path):
+    data = load_dataset("gapminder")
+    path = tmp_path / "report.html"
+
+    with PlotlyApp() as app:
+        with app.plot.report(path, include_plotlyjs=False, collect=True) as report:
+            app.plot.scatter(data_frame=data, x="gdpPercap", y="lifeExp")
+            app.plot.scatter(data_frame=data, x="gdpPercap", y="pop")
+
+        app.plot.scatter(data_frame=data, x="gdpPercap", y="pop")
+
+        assert len(report) == 2
+        assert report.narrays == 3
+        assert app.plot.reports == []
+
+        report = app.plot.report()
+        app.plot.scatter(data_frame=data, x="gdpPercap", y="pop")
+        assert len(report) == 0
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        def _scatter(y):
+            return app.plot.scatter(data_frame=data, x="gdpPercap", y=y)
+
+        with app.plot.report(include_plotlyjs=False, collect=True) as report:
+            with ThreadPoolExecutor(4) as executor:
+                list(executor.map(_scatter, ["lifeExp", "pop"] * 4))
+
+        _scatter("pop")
+
+        assert len(report) == 8
+        assert report.to_html().count('class="spiral-figure"') == 8
+        assert app.plot.reports == []
+
+
+def test_export_many(tmp_path):
+    data = load_dataset("iris")
+
+    with PlotlyApp() as app:
+        figures = [
+            app.plot.scatter(data_frame=data, x="petal_length", y=y)
+            for y in ["petal_width", "sepal_width", "sepal_length"]
+        ]
+
+        with raises(SpiralError):
+            app.plot.export_many(figures, "gif", workers=2)
+
+        results = app.plot.export_many(figures, "png", workers=2, directory=tmp_path)
+        exporter = app.plot.exporter
+
+        app.plot.export_many(figures[:1], "svg", workers=2, directory=tmp_path)
+        assert app.plot.exporter is exporter
+
+    assert exporter.closed
+    assert [x.path for x in results] == [
+        str(tmp_path / f"figure-{i}.png") for i in range(3)
+    ]
+
+    pytest.importorskip("kaleido")
+
+    assert all(x.error is None for x in results)
+    assert all(x.render_time > 0 for x in results)
+    assert (tmp_path / "figure-0.png").read_bytes()[:4] == b"\x89PNG"
+
+
+def test_image_pooling():
+    img = np.random.default_rng(0).random((1000, 2000))
+
+    with PlotlyApp() as app:
+        fig = app.plot.imshow(img, pooling="mean")
+
+        trace = fig.data[0]
+        assert np.shape(trace.z) == (334, 400)
+        assert trace.x[0] == 2
+        assert fig.layout.coloraxis.cmax == img.max()
+
+        rgb = (img[:, :, None] * [255, 0, 0]).astype(np.uint8)
+        fig = app.plot.imshow(rgb[:500], pooling="max")
+
+        assert fig.data[0].x0 == 2
+        assert fig.data[0].dx == 5
+
+        fig = app.plot.imshow(img[:100, :100], pooling="mean")
+        assert np.shape(fig.data[0].z) == (100, 100)
+
+
+def test_aggregate_hierarchy():
+    data = load_dataset("gapminder")
+    kwargs = {"path": ["continent", "country"], "values": "pop", "color": "lifeExp"}
+
+    with PlotlyApp() as app:
+        expected = app.plot.sunburst(data_frame=data, **kwargs).data[0]
+        fig = app.plot.sunburst(data_frame=data, aggregate="sum", **kwargs)
+
+        trace = fig.data[0]
+        assert sorted(trace.ids) == sorted(expected.ids)
+
+        order = np.argsort(trace.ids)
+        expected_order = np.argsort(expected.ids)
+        assert np.allclose(trace.values[order], expected.values[expected_order])
+        assert np.allclose(
+            trace.marker.colors[order], expected.marker.colors[expected_order]
+        )
+
+        fig = app.plot.treemap(
+            data_frame=data, aggregate="sum", min_share=0.005, **kwargs
+        )
+
+        ids = fig.data[0].ids
+        assert "Africa/Other" in ids
+        assert len(ids) < len(expected.ids)
+
+        fig = app.plot.sunburst(data_frame=data, path=["continent"], aggregate="count")
+
+        values = dict(zip(fig.data[0].labels, fig.data[0].values))
+        assert values == data["continent"].value_counts().to_dict()
+
+        fig = app.plot.funnel(data_frame=data, x="pop", y="continent", aggregate="mean")
+
+        means = data.groupby("continent")["pop"].mean()
+        assert np.allclose(fig.data[0].x, means[list(fig.data[0].y)])
+
+        with raises(SpiralError, match="Unrecognised aggregate mode"):
+            app.plot.treemap(data_frame=data, aggregate="bin2d", **kwargs)
+
+
+def test_simplify():
+    data = load_dataset("election")
+    geojson = load_dataset("election_geojson")
+    kwargs = {
+        "geojson": geojson,
+        "locations": "district",
+        "featureidkey": "properties.district",
+        "color": "Bergeron",
+    }
+
+    with PlotlyApp() as app:
+        fig = app.plot.choropleth_mapbox(data_frame=data.iloc[:10], **kwargs)
+
+        # one of the districts has no feature
+        features = fig.data[0].geojson["features"]
+        assert len(features) == 9
+        assert {x["properties"]["district"] for x in features} < set(data["district"])
+        assert len(geojson["features"]) == 58
+
+        # float ids match the integer ids of the features
+        fig = app.plot.choropleth_mapbox(
+            data_frame=data.iloc[:10].astype({"district_id": float}),
+            geojson=geojson,
+            locations="district_id",
+            color="Bergeron",
+        )
+        assert len(fig.data[0].geojson["features"]) == 10
+
+        size = len(app.plot.choropleth(data_frame=data, **kwargs).to_json())
+
+        for simplify in (0.001, "auto"):
+            fig = app.plot.choropleth(data_frame=data, simplify=simplify, **kwargs)
+            assert len(fig.to_json()) < size * 0.75
+
+        fig = app.plot.choropleth_mapbox(data_frame=data, simplify="auto", **kwargs)
+        assert app.plot.geometry.cache_info().currsize == 3
+
+        with raises(SpiralError, match="Unrecognised simplify tolerance"):
+            app.plot.choropleth(data_frame=data, simplify="bogus", **kwargs)
+
+
+def test_max_points():
+    data = load_dataset("gapminder")
+
+    with PlotlyApp() as app:
+        fig = app.plot.line(
+            data_frame=data, x="year", y="lifeExp", color="continent", max_points=5
+        )
+
+        assert max(len(x.x) for x in fig.data) <= 5
+        assert len(data) == 1704
+
+
+def test_merge_lines():
+    data = load_dataset("gapminder")
+
+    with PlotlyApp() as app:
+        fig = app.plot.line(
+            data_frame=data,
+            x="year",
+            y="lifeExp",
+            line_group="country",
+            color="continent",
+            merge_lines=True,
+        )
+
+        assert len(fig.data) == 5
+        assert [x.name for x in fig.data] == sorted(data["continent"].unique())
+
+        # one gap after each country
+        trace = fig.data[0]
+        countries = data.loc[data["continent"] == trace.name, "country"].nunique()
+        assert np.isnan(np.asarray(trace.y, dtype=float)).sum() == countries
+        assert len(trace.y) == (data["continent"] == trace.name).sum() + countries
+        assert np.isnan(trace.y[12]) and trace.x[13] == data["year"].min()
+
+
+def test_trendline():
+    data = load_dataset("tips")
+
+    with PlotlyApp() as app:
+        fig = app.plot.scatter(
+            data_frame=data,
+            x="total_bill",
+            y="tip",
+            color="smoker",
+            facet_col="sex",
+            trendline="ols",
+        )
+
+        assert len(fig.data) == 8
+        assert [x.mode for x in fig.data] == ["markers", "lines"] * 4
+
+        marker, line = fig.data[0], fig.data[1]
+        assert line.xaxis == marker.xaxis and line.name == marker.name
+        assert line.showlegend is False
+        assert line.line.color is not None
+        assert "OLS trendline" in line.hovertemplate
+        assert "Smoker=Yes" in line.hovertemplate
+
+        sex = "Male" if "Sex=Male" in marker.hovertemplate else "Female"
+        rows = data[(data["smoker"] == marker.name) & (data["sex"] == sex)]
+        slope, intercept = np.polyfit(rows["total_bill"], rows["tip"], 1)
+        assert np.allclose(line.y, slope * np.asarray(line.x) + intercept)
+
+        for trendline in ("rolling", "lowess"):
+            fig = app.plot.scatter(
+                data_frame=data,
+                x="total_bill",
+                y="tip",
+                trendline=trendline,
+                trendline_options={"window": 10},
+            )
+
+            assert [x.mode for x in fig.data] == ["markers", "lines"]
+
+        fig = app.plot.scatter(
+            data_frame=data, x="total_bill", y="tip", trendline="ols", aggregate="bin2d"
+        )
+
+        # the bins are weighted by their counts
+        slope, _ = np.polyfit(data["total_bill"], data["tip"], 1)
+        line = fig.data[1]
+        fitted = (line.y[-1] - line.y[0]) / (line.x[-1] - line.x[0])
+        assert np.isclose(fitted, slope, rtol=0.1)
+
+        with raises(SpiralError, match="Unrecognised trendline option"):
+            app.plot.scatter(
+                data_frame=data,
+                x="total_bill",
+                y="tip",
+                trendline="ols",
+                trendline_options={"a": 1},
+            )
+
+        with raises(SpiralError, match="Unrecognised trendline"):
+            app.plot.scatter(data_frame=data, x="total_bill", y="tip", trendline="a")
+
+
+def test_max_categories():
+    data = load_dataset("gapminder")
+
+    with PlotlyApp() as app:
+        fig = app.plot.scatter(
+            data_frame=data, x="gdpPercap", y="lifeExp", color="country"
+        )
+
+        assert len(fig.data) == 142
+
+    config = init_defaults("plot.plotly")
+    config["plot.plotly"]["max_categories"] = 50
+
+    with TestApp(config_defaults=config) as app:
+        fig = app.plot.scatter(
+            data_frame=data, x="gdpPercap", y="lifeExp", color="country"
+        )
+
+        assert len(fig.data) == 50
+        assert fig.data[-1].name == "Other"
+
+        fig = app.plot.scatter(
+            data_frame=data,
+            x="gdpPercap",
+            y="lifeExp",
+            color="country",
+            max_categories=False,
+        )
+
+        assert len(fig.data) == 142
+
+        fig = app.plot.scatter(
+            data_frame=data,
+            x="gdpPercap",
+            y="lifeExp",
+            color="continent",
+            symbol="country",
+            max_categories=3,
+        )
+
+        assert len({x.marker.symbol for x in fig.data}) == 3
+        assert data["country"].nunique() == 142
+
+        data = data.assign(year=data["year"].astype(str))
+        fig = app.plot.scatter(
+            data_frame=data, x="gdpPercap", y="lifeExp", color="year", max_categories=5
+        )
+
+        assert len(fig.data) == 1
+        assert fig.layout.coloraxis.colorbar.title.text == "Year"
+
+
+def test_summary():
+    data = load_dataset("tips")
+
+    with PlotlyApp() as app:
+        fig = app.plot.box(
+            data_frame=data, x="day", y="total_bill", color="sex", aggregate="summary"
+        )
+
+        assert len(fig.data) == 2
+        assert len(fig.data[0].q1) == 4
+        assert fig.data[0].marker.color.startswith("rgba")
+
+        fig = app.plot.violin(
+            data_frame=data,
+            x="day",
+            y="total_bill",
+            facet_col="sex",
+            box=True,
+            aggregate="summary",
+        )
+
+        assert {x.type for x in fig.data} == {"scatter", "box"}
+        assert fig.layout.xaxis.ticktext == ("Thur", "Fri", "Sat", "Sun")
+
+        with raises(SpiralError):
+            app.plot.box(data_frame=data, x="day", aggregate="bin2d")
+
+
+def test_binned_histogram(tmp):
+    data = load_dataset("tips")
+    filename = f"{tmp.dir}/tips.csv"
+    data.to_csv(filename, index=False)
+
+    with PlotlyApp() as app:
+        fig = app.plot.histogram(
+            data_frame=filename, x="total_bill", color="sex", histnorm="percent"
+        )
+
+        assert len(fig.data) == 2
+        assert fig.data[0].histfunc == "sum"
+        assert fig.data[0].xbins.size is not None
+        assert fig.layout.yaxis.title.text == "Percent"
+
+        chunks = iter(np.array_split(data, 5))
+        fig = app.plot.histogram(data_frame=chunks, x="day", y="tip")
+
+        assert np.isclose(sum(fig.data[0].y), data["tip"].sum())
+
+        fig = app.plot.histogram(data_frame=data, x="total_bill", aggregate="bin1d")
+
+        assert sum(fig.data[0].y) == len(data)
+
+        with raises(SpiralError):
+            app.plot.scatter(data_frame=filename, x="total_bill", y="tip")
+
+
+def test_referenced_columns():
+    data = load_dataset("tips")
+
+    with PlotlyApp() as app:
+        kwargs = app.plot._prepare_labels(
+            {"data_frame": data, "x": "total_bill", "y": "tip", "labels": {}}
+        )
+        assert list(kwargs["labels"]) == ["total_bill", "tip"]
+
+        kwargs = app.plot._prepare_category_orders(
+            {
+                "data_frame": data,
+                "x": "day",
+                "color": "smoker",
+                "category_orders": {"day": ["Sun", "Sat", "Fri", "Thur"]},
+            }
+        )
+        assert kwargs["category_orders"] == {
+            "smoker": ["Yes", "No"],
+            "day": ["Sun", "Sat", "Fri", "Thur"],
+        }
+
+        fig = app.plot.scatter_matrix(data_frame=load_dataset("iris"))
+        assert fig.data[0].dimensions[0].label == "Sepal Length"
+
+
+def test_validate():
+    config = init_defaults("plot.plotly")
+    config["plot.plotly"]["sizing"] = "bogus"
+
+    # the handler configuration is validated when the handler is set up
+    # on first use
+    with TestApp(config_defaults=config) as app:
+        with raises(SpiralError, match="'sizing' must be either"):
+            app.plot
+
+        with raises(SpiralError, match="'sizing' must be either"):
+            app.plot
+
+
+def test_stats():
+    config = init_defaults("plot.plotly")
+    config["plot.plotly"]["stats_cache_size"] = 16
+    data = load_dataset("iris")
+
+    with TestApp(config_defaults=config) as app:
+        app.plot.stats.preload(data)
+        misses = app.plot.stats.cache_info().misses
+
+        app.plot.scatter(
+            data_frame=data, x="petal_length", y="species", facet_col="species"
+        )
+
+        assert app.plot.stats.cache_info().misses == misses
+
+    with TestApp() as app:
+        data = pd.DataFrame({"x": range(1000), "f": ["a", "b"] * 500})
+        fig = app.plot.scatter(data_frame=data, x="x", facet_col="f")
+        width = fig.layout.width
+
+        data.loc[7, "f"] = "c"
+        fig = app.plot.scatter(data_frame=data, x="x", facet_col="f")
+
+        assert app.plot.stats is None
+        assert fig.layout.width > width
+
+
+def test_data_is_not_modified():
+    data = load_dataset("iris")
+    columns = data.columns.tolist()
+    petal_length = data["petal_length"].to_numpy()
+
+    with PlotlyApp() as app:
+        kwargs = app.plot._prepare_data(
+            {
+                "data_frame": data,
+                "x": "petal_length",
+                "y": data["petal_width"] * 10,
+                "hover_data": [np.arange(len(data))],
+                "color": None,
+            }
+        )
+
+    prepared = kwargs["data_frame"]
+
+    assert data.columns.tolist() == columns
+    assert prepared.columns.tolist() == ["petal_length", "petal_width", "hover_data_0"]
+    assert kwargs["hover_data"] == ["hover_data_0"]
+    assert np.shares_memory(prepared["petal_length"].to_numpy(), petal_length)
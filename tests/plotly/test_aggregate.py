@@ -0,0 +1,125 @@
+from spiral.plotly._aggregate import (
+    bin2d,
+    bin_codes,
+    bin_edges,
+    bin_map,
+    cell_centers,
+    cell_codes,
+)
+
+import numpy as np
+import pandas as pd
+
+
+def test_bin_codes():
+    values = np.array([0.0, 0.5, 1.0, 2.0])
+    edges = bin_edges(values, 4)
+
+    assert edges.tolist() == [0.0, 0.5, 1.0, 1.5, 2.0]
+    assert bin_codes(values, edges).tolist() == [0, 1, 2, 3]
+
+
+def test_bin2d():
+    data = pd.DataFrame(
+        {
+            "x": [0.0, 0.1, 0.9, 1.0, np.nan],
+            "y": [0.0, 0.1, 0.9, 1.0, 1.0],
+            "g": ["a", "a", "a", "b", "b"],
+            "v": [1, 2, 3, 4, 5],
+        }
+    )
+
+    result, (xbins, ybins) = bin2d(data, "x", "y", 2, 2, by=["g"])
+
+    assert result["count"].sum() == 4
+    assert sorted(result["count"]) == [1, 1, 2]
+    assert xbins == {"start": 0.0, "end": 1.0, "size": 0.5}
+
+    result, _ = bin2d(data, "x", "y", 2, 2, histfunc="max", name="v")
+
+    assert sorted(result["v"]) == [2, 4]
+
+    result, _ = bin2d(
+        data,
+        "x",
+        "y",
+        2,
+        2,
+        values={"v": "mean"},
+        histfunc="sum",
+        name="v_",
+        column="v",
+    )
+
+    assert sorted(result["v_"]) == [3, 7]
+    assert sorted(result["v"]) == [1.5, 3.5]
+
+
+def test_bin2d_empty():
+    data = pd.DataFrame({"x": [np.nan, np.nan], "y": [1.0, 2.0]})
+
+    assert bin_edges(np.array([]), 2).tolist() == [0.0, 0.5, 1.0]
+
+    result, (xbins, _) = bin2d(data, "x", "y", 2, 2)
+
+    assert len(result) == 0
+    assert list(result.columns) == ["x", "y", "count"]
+    assert xbins == {"start": 0.0, "end": 1.0, "size": 0.5}
+
+
+def test_bin2d_dates():
+    data = pd.DataFrame(
+        {"x": pd.date_range("2020-01-01", periods=10, freq="D"), "y": range(10)}
+    )
+
+    result, (xbins, _) = bin2d(data, "x", "y", 5, 5)
+
+    assert result["x"].dtype == data["x"].dtype
+    assert xbins is None
+
+
+def test_cell_codes():
+    x = np.array([0.1, 0.9, 0.45, 2.1])
+    y = np.array([0.1, 0.1, 0.8, -0.1])
+
+    codes_x, codes_y = cell_codes(x, y, 1, shape="square")
+    assert codes_x.tolist() == [1, 1, 1, 5]
+    assert codes_y.tolist() == [1, 1, 1, -1]
+
+    centers_x, centers_y = cell_centers(codes_x, codes_y, 1, shape="square")
+    assert centers_x.tolist() == [0.5, 0.5, 0.5, 2.5]
+
+    # every point is nearest to the centre of its hexagon
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(-5, 5, 1000), rng.uniform(-5, 5, 1000)
+
+    codes_x, codes_y = cell_codes(x, y, 1)
+    centers_x, centers_y = cell_centers(codes_x, codes_y, 1)
+    distance = np.hypot(x - centers_x, y - centers_y)
+    assert distance.max() <= 1 / np.sqrt(3) + 1e-9
+
+
+def test_bin_map():
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(
+        {
+            "lat": rng.normal(45, 1, 1000),
+            "lon": rng.normal(-73, 1, 1000),
+            "value": rng.random(1000),
+            "group": rng.choice(["a", "b"], 1000),
+        }
+    )
+
+    result, size = bin_map(data, "lat", "lon", 0.5, by=["group"])
+    assert size == 0.5
+    assert list(result.columns) == ["group", "lat", "lon", "count"]
+    assert result["count"].sum() == len(data)
+    assert result["lat"].between(35, 55).all()
+
+    result, size = bin_map(
+        data, "lat", "lon", 0.1, values={"value": "mean"}, max_cells=50
+    )
+    assert size > 0.1
+    assert len(result) <= 50
+    assert result["count"].sum() == len(data)
+    assert result["value"].between(0, 1).all()
@@ -0,0 +1,85 @@
+import os
+
+from spiral.plotly import FigureCache
+from spiral.plotly._cache import hash_figure_args
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+
+
+def test_hash_figure_args():
+    data = pd.DataFrame({"x": [1, 2, 3], "y": ["a", "b", "c"]})
+
+    assert hash_figure_args(data, {"x": "x"}) == hash_figure_args(
+        data.copy(), {"x": "x"}
+    )
+    assert hash_figure_args(data, {"x": "x"}) != hash_figure_args(data, {"x": "y"})
+    assert hash_figure_args(data) != hash_figure_args(data.assign(x=[1, 2, 4]))
+    assert hash_figure_args(data) != hash_figure_args(data.set_index([[5, 6, 7]]))
+    assert hash_figure_args({"f": os.path.join}) == hash_figure_args(
+        {"f": os.path.join}
+    )
+    assert hash_figure_args({"f": lambda x: x}) is None
+    assert hash_figure_args(object()) is None
+
+
+def test_hash_figure_args_by_value():
+    a = np.arange(1000, dtype=float)
+    b = a.copy()
+    b[500] = -1
+
+    pairs = [
+        (pd.Index(a), pd.Index(b)),
+        (pd.Categorical(a), pd.Categorical(b)),
+        (pd.array(a), pd.array(b)),
+        (pd.MultiIndex.from_arrays([a, a]), pd.MultiIndex.from_arrays([a, b])),
+    ]
+
+    for first, second in pairs:
+        assert hash_figure_args(first) == hash_figure_args(first.copy())
+        assert hash_figure_args(first) != hash_figure_args(second)
+
+
+def test_lru():
+    cache = FigureCache(maxsize=2)
+
+    for key in ("a", "b", "c"):
+        cache.set(key, go.Figure(layout_title_text=key))
+
+    assert cache.get("a") is None
+    assert cache.get("c").layout.title.text == "c"
+    assert cache.cache_info() == (1, 1, 2, 2)
+
+
+def test_copies():
+    cache = FigureCache()
+    cache.set("a", go.Figure(layout_title_text="a"))
+
+    cache.get("a").update_layout(title_text="b")
+
+    assert cache.get("a").layout.title.text == "a"
+
+
+def test_disk(tmp):
+    cache = FigureCache(maxsize=1, directory=tmp.dir, max_disk_bytes=10 ** 6)
+    cache.set("a", go.Figure(layout_title_text="a"))
+    cache.set("b", go.Figure(layout_title_text="b"))
+
+    assert os.path.exists(os.path.join(tmp.dir, "a.json"))
+    assert FigureCache(directory=tmp.dir).get("a").layout.title.text == "a"
+
+    cache.invalidate("a")
+    assert "a" not in cache
+    assert "b" in cache
+
+    cache.invalidate()
+    assert "b" not in cache
+    assert len(cache) == 0
+
+
+def test_disk_limit(tmp):
+    cache = FigureCache(directory=tmp.dir, max_disk_bytes=1)
+    cache.set("a", go.Figure(layout_title_text="a"))
+
+    assert os.listdir(tmp.dir) == []
@@ -0,0 +1,138 @@
+from spiral.core.exc import SpiralError
+from spiral.plotly._downsample import (
+    downsample,
+    lttb_indices,
+    minmax_indices,
+    rank_columns,
+    sample_indices,
+    thin_points,
+    voxel_indices,
+)
+
+import numpy as np
+import pandas as pd
+
+from pytest import raises
+
+
+def test_lttb_indices():
+    x = np.arange(100, dtype=float)
+    y = np.zeros(100)
+    y[42] = 10
+
+    selected = lttb_indices(x, y, 10)
+
+    assert len(selected) == 10
+    assert selected[0] == 0
+    assert selected[-1] == 99
+    assert 42 in selected
+    assert lttb_indices(x, y, 200).tolist() == list(range(100))
+
+
+def test_minmax_indices():
+    y = np.zeros(100)
+    y[42], y[43] = 10, -10
+
+    selected = minmax_indices(np.zeros(100, dtype=int), y, 10)
+
+    assert len(selected) <= 10
+    assert 42 in selected
+    assert 43 in selected
+
+
+def test_downsample():
+    data = pd.DataFrame(
+        {
+            "x": np.tile(np.arange(50), 2),
+            "y": np.random.default_rng(0).normal(size=100),
+            "g": np.repeat(["a", "b"], 50),
+        }
+    )
+
+    for method in ("lttb", "minmax"):
+        selected = downsample(data, "x", "y", 10, by=["g"], method=method)
+        counts = data.iloc[selected]["g"].value_counts()
+
+        assert counts.max() <= 10
+        assert sorted(counts.index) == ["a", "b"]
+
+    with raises(SpiralError, match="Unrecognised downsample method"):
+        downsample(data, "x", "y", 10, method="bogus")
+
+
+def test_voxel_indices():
+    rng = np.random.default_rng(0)
+    coords = rng.random((10000, 3))
+    codes = np.zeros(10000, dtype=np.int64)
+
+    selected = voxel_indices(coords, codes, 1000)
+    assert 500 < len(selected) <= 1000
+    assert (np.diff(selected) > 0).all()
+
+    # each selected point is in its own cell
+    coords[:5000] = 0.5
+    coords[0, 0] = np.nan
+    selected = voxel_indices(coords, codes, 1000)
+    assert 0 not in selected
+    assert (selected < 5000).sum() == 1
+
+    # each group keeps at least one point
+    codes = np.arange(10000) % 2000
+    assert len(voxel_indices(coords, codes, 1000)) == 2000
+
+
+def test_sample_indices():
+    codes = np.repeat([0, 1, 2], [900, 80, 20])
+
+    selected = sample_indices(codes, 100)
+    assert len(selected) == 100
+    assert len(np.unique(selected)) == 100
+
+    selected = sample_indices(codes, 100, stratified=True)
+    assert np.bincount(codes[selected]).tolist() == [40, 40, 20]
+
+    selected = sample_indices(codes, 100, stratified=True, proportional=True)
+    assert np.bincount(codes[selected]).tolist() == [90, 8, 2]
+
+    assert len(sample_indices(codes, 2000)) == len(codes)
+
+
+def test_rank_columns():
+    data = pd.DataFrame(
+        {
+            "a": [0.0, 1.0, 0.0, 1.0],
+            "b": [0.0, 10.0, 0.0, 10.0],
+            "c": ["x", "y", "z", "w"],
+            "d": ["x", "x", "x", "x"],
+        }
+    )
+
+    scores = rank_columns(data, ["a", "b", "c", "d"])
+    assert scores.tolist() == [0.25, 25, 0.75, 0]
+
+    scores = rank_columns(data, ["a", "b"], metric=lambda x: -x.max())
+    assert scores.tolist() == [-1, -10]
+
+    with raises(SpiralError, match="Unrecognised dimension rank"):
+        rank_columns(data, ["a"], metric="entropy")
+
+
+def test_thin_points():
+    data = pd.DataFrame(
+        {
+            "x": np.arange(1000.0),
+            "y": np.arange(1000.0) % 10,
+            "z": 1.0,
+            "group": ["a", "b"] * 500,
+        }
+    )
+
+    positions = thin_points(data, ["x", "y", "z"], 100, by=["group"])
+    assert len(positions) <= 100
+    assert set(data["group"].iloc[positions]) == {"a", "b"}
+
+    positions = thin_points(data, ["x", "y", "z"], 100, method="stratified")
+    assert len(positions) == 100
+
+    with raises(SpiralError, match="Unrecognised point sampling method"):
+        thin_points(data, ["x", "y", "z"], 100, method="bogus")
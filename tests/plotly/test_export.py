@@ -0,0 +1,31 @@
+from spiral.core.exc import SpiralError
+from spiral.plotly._export import ExportPool, export_jobs
+
+import plotly.graph_objects as go
+
+from pytest import raises
+
+
+def test_export_jobs(tmp_path):
+    figures = [go.Figure(go.Scatter(y=[1, 2, 3])) for _ in range(11)]
+    jobs = list(export_jobs(figures, "svg", tmp_path))
+
+    assert [x[1].name for x in jobs[:2]] == ["figure-00.svg", "figure-01.svg"]
+    assert all(x[2] == "svg" for x in jobs)
+    assert jobs[0][0]["data"][0]["type"] == "scatter"
+
+    jobs = list(export_jobs({"a/b.png": figures[0]}, "png", tmp_path))
+    assert jobs[0][1] == tmp_path / "a" / "b.png"
+    assert (tmp_path / "a").is_dir()
+
+    with raises(SpiralError):
+        export_jobs(figures, "gif")
+
+
+def test_export_pool():
+    pool = ExportPool(1)
+    pool.close()
+    pool.close()
+
+    with raises(SpiralError):
+        pool.export([])
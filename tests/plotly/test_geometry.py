@@ -0,0 +1,117 @@
+from spiral.data import load_dataset
+from spiral.plotly._geometry import (
+    GeometryCache,
+    filter_features,
+    geojson_bounds,
+    simplify_geojson,
+    simplify_lines,
+)
+
+import numpy as np
+
+
+def _douglas_peucker(points, tolerance):
+    start, end = points[0], points[-1]
+    if len(points) < 3:
+        return points
+
+    direction = end - start
+    offset = points[1:-1] - start
+    distance = np.abs(direction[0] * offset[:, 1] - direction[1] * offset[:, 0])
+    distance /= np.hypot(*direction)
+
+    i = np.argmax(distance) + 1
+    if distance[i - 1] <= tolerance:
+        return points[[0, -1]]
+
+    left = _douglas_peucker(points[: i + 1], tolerance)
+    right = _douglas_peucker(points[i:], tolerance)
+
+    return np.vstack([left[:-1], right])
+
+
+def test_simplify_lines():
+    rng = np.random.default_rng(0)
+    lines = [np.cumsum(rng.normal(size=(n, 2)), axis=0) for n in (500, 2, 1000)]
+
+    counts = np.array([len(x) for x in lines])
+    starts = np.cumsum(counts) - counts
+    coords = np.concatenate(lines)
+
+    keep = simplify_lines(coords, starts, counts, 2.0)
+
+    for line, mask in zip(lines, np.split(keep, starts[1:])):
+        assert np.allclose(line[mask], _douglas_peucker(line, 2.0))
+
+
+def test_simplify_geojson():
+    geojson = load_dataset("election_geojson")
+
+    simplified = simplify_geojson(geojson, 0.001)
+
+    assert len(simplified["features"]) == len(geojson["features"])
+    assert simplified["features"][0]["id"] == geojson["features"][0]["id"]
+
+    before = sum(len(str(x["geometry"])) for x in geojson["features"])
+    after = sum(len(str(x["geometry"])) for x in simplified["features"])
+    assert after < before / 2
+
+    for feature in simplified["features"]:
+        polygons = feature["geometry"]["coordinates"]
+        if feature["geometry"]["type"] == "Polygon":
+            polygons = [polygons]
+
+        for polygon in polygons:
+            for ring in polygon:
+                assert len(ring) >= 4
+                assert ring[0] == ring[-1]
+
+    # the original is not changed
+    assert geojson == load_dataset("election_geojson")
+
+
+def test_filter_features():
+    geojson = load_dataset("election_geojson")
+
+    filtered = filter_features(geojson, ["12-Saint-Sulpice"], "properties.district")
+    assert [x["id"] for x in filtered["features"]] == ["12"]
+
+    # ids are compared as strings
+    filtered = filter_features(geojson, [11, "12", "bogus"])
+    assert [x["id"] for x in filtered["features"]] == ["11", "12"]
+
+    filtered = filter_features(geojson, np.array([11.0, 12.5]))
+    assert [x["id"] for x in filtered["features"]] == ["11"]
+
+
+def test_geojson_bounds():
+    geojson = load_dataset("election_geojson")
+
+    x_min, y_min, x_max, y_max = geojson_bounds(geojson)
+
+    assert -74 < x_min < x_max < -73
+    assert 45 < y_min < y_max < 46
+    assert geojson_bounds({"features": []}) is None
+
+
+def test_geometry_cache():
+    geojson = load_dataset("election_geojson")
+    cache = GeometryCache(maxsize=1)
+
+    first = cache.simplify(geojson, 0.001)
+
+    assert cache.simplify(geojson, 0.001) is first
+    assert cache.simplify(geojson, 0.01) is not first
+    assert cache.cache_info() == (1, 2, 1, 1)
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+    # equal collections loaded separately share one entry
+    first = cache.simplify(load_dataset("election_geojson"), 0.001)
+    assert cache.simplify(load_dataset("election_geojson"), 0.001) is first
+    assert cache.cache_info() == (2, 3, 1, 1)
+
+    other = load_dataset("election_geojson")
+    other["features"][-1]["properties"]["district"] = "changed"
+    assert cache.simplify(other, 0.001) is not first
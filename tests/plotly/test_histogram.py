@@ -0,0 +1,53 @@
+from spiral import SpiralError
+from spiral.plotly._histogram import ChunkedHistogram
+
+import numpy as np
+import pandas as pd
+
+from pytest import raises
+
+
+def test_chunked_histogram():
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(
+        {
+            # the spread grows so later chunks extend the bins
+            "x": rng.normal(size=10000) * np.linspace(0.1, 5, 10000),
+            "g": rng.choice(["a", "b"], size=10000),
+            "w": rng.random(size=10000),
+        }
+    )
+
+    histogram = ChunkedHistogram("x", by=["g"], values="w", nbins=20)
+    for chunk in np.array_split(data, 10):
+        histogram.add(chunk)
+
+    result, bins = histogram.result("sum", "w")
+    edges = np.arange(bins["start"], bins["end"] + bins["size"] / 2, bins["size"])
+
+    for group in ("a", "b"):
+        rows = data[data["g"] == group]
+        expected, _ = np.histogram(rows["x"], edges, weights=rows["w"])
+        actual = result[result["g"] == group].sort_values("x")["w"].values
+
+        assert np.allclose(actual, expected[expected > 0])
+
+    result, _ = histogram.result()
+
+    assert result["count"].sum() == 10000
+
+
+def test_chunked_histogram_categories():
+    data = pd.DataFrame({"x": ["a", "b", "b", None]})
+
+    histogram = ChunkedHistogram("x")
+    histogram.add(data)
+    histogram.add(data)
+
+    result, bins = histogram.result()
+
+    assert dict(zip(result["x"], result["count"])) == {"a": 2, "b": 4}
+    assert bins is None
+
+    with raises(SpiralError):
+        histogram.result("max")
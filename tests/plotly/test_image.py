@@ -0,0 +1,48 @@
+from spiral.core.exc import SpiralError
+from spiral.plotly._image import pool_coordinates, pool_factors, pool_image
+
+import numpy as np
+import pandas as pd
+
+from pytest import raises
+
+
+def test_pool_image():
+    img = np.arange(20, dtype=float).reshape(4, 5)
+
+    pooled = pool_image(img, 2, 2)
+    assert pooled.shape == (2, 3)
+    assert pooled[0].tolist() == [3, 5, 6.5]
+    assert pooled[1].tolist() == [13, 15, 16.5]
+
+    pooled = pool_image(img, 2, 2, method="max")
+    assert pooled.tolist() == [[6, 8, 9], [16, 18, 19]]
+
+    rgb = np.zeros((4, 4, 3), dtype=np.uint8)
+    rgb[:, :2, 0] = 255
+    rgb[:2, :, 1] = 101
+
+    pooled = pool_image(rgb, 4, 2)
+    assert pooled.dtype == np.uint8
+    assert pooled.shape == (1, 2, 3)
+    assert pooled[0, :, 0].tolist() == [255, 0]
+    assert pooled[0, :, 1].tolist() == [50, 50]
+
+    with raises(SpiralError, match="Unrecognised pooling method"):
+        pool_image(img, 2, 2, method="median")
+
+
+def test_pool_coordinates():
+    assert pool_coordinates(np.arange(5), 2).tolist() == [0.5, 2.5, 4]
+    assert pool_coordinates(list("abcde"), 2).tolist() == ["a", "c", "e"]
+
+    dates = pd.date_range("2020-01-01", periods=4, freq="D")
+    pooled = pool_coordinates(dates, 2)
+    assert list(pooled) == list(
+        pd.to_datetime(["2020-01-01 12:00", "2020-01-03 12:00"])
+    )
+
+
+def test_pool_factors():
+    assert pool_factors((1000, 200), 470, 470) == (3, 1)
+    assert pool_factors((100, 100), 470, 470) == (1, 1)
@@ -3,3 +3,28 @@ from spiral.plotly import PlotlyExpress
 
 def test_list_datasets():
     PlotlyExpress()
+
+
+def test_lazy_docstring():
+    from spiral.plotly._doc import LazyDocstring
+
+    class Express:
+        def scatter(self, data_frame=None, x=None):
+            """
+            Scatter plot.
+            """
+            return x
+
+    Express.scatter = LazyDocstring(Express.__dict__["scatter"])
+
+    assert Express().scatter(x=1) == 1
+    assert Express.scatter._doc is None
+
+    doc = Express.scatter.__doc__
+    assert doc.count("Parameters") == 1
+    assert "data_frame: DataFrame" in doc
+    assert "x: " in doc
+    assert Express().scatter.__doc__ == doc
+    assert Express.scatter.__name__ == "scatter"
+
+    assert PlotlyExpress.histogram.__doc__.count("Parameters") == 1
@@ -0,0 +1,64 @@
+import io
+
+from spiral.core.exc import SpiralError
+from spiral.plotly._report import Report
+
+import numpy as np
+import plotly.graph_objects as go
+
+from pytest import raises
+
+
+def _figure(y):
+    x = np.arange(100) / 3
+    return go.Figure(go.Scatter(x=x, y=y, name="</script>"))
+
+
+def test_report():
+    report = Report(title="Results", include_plotlyjs="cdn")
+    report.add(_figure(np.arange(100) / 7), title="First")
+    report.add(_figure(np.arange(100) / 9))
+
+    assert len(report) == 2
+    assert report.narrays == 3
+
+    html = report.to_html()
+    assert html.count("cdn.plot.ly") == 1
+    assert html.count('class="spiral-figure"') == 2
+    assert html.count('window.spiralArrays["') == 3
+    assert "<title>Results</title>" in html
+    assert "<h2>First</h2>" in html
+    assert "IntersectionObserver" in html
+    assert html.count("</script>") == html.count("<script")
+    assert html.endswith("</html>")
+
+
+def test_report_text():
+    report = Report(include_plotlyjs=False, binary=False, precision=2)
+    report.add(_figure(np.arange(100) / 7))
+    report.add(_figure(np.arange(100) / 7))
+
+    assert report.narrays == 2
+    assert "[0.0,0.14," in report.to_html()
+
+
+def test_report_stream(tmp_path):
+    path = tmp_path / "report.html"
+
+    with Report(path, include_plotlyjs=False) as report:
+        report.add(_figure(np.arange(100) / 7))
+        assert "spiral-figure-0" in path.read_text()
+
+        with raises(SpiralError, match="streamed"):
+            report.to_html()
+
+    assert path.read_text().endswith("</html>")
+
+    with raises(SpiralError, match="closed report"):
+        report.add(_figure(np.arange(100) / 7))
+
+    file = io.StringIO()
+    with Report(file, include_plotlyjs=False) as report:
+        report.add(_figure(np.arange(100) / 7))
+
+    assert file.getvalue().endswith("</html>")
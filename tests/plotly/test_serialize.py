@@ -0,0 +1,111 @@
+import base64
+import json
+
+from spiral.core.exc import SpiralError
+from spiral.plotly._serialize import (
+    dumps,
+    encode_array,
+    encode_figure,
+    to_html,
+    to_json,
+)
+
+import numpy as np
+import plotly.graph_objects as go
+
+from pytest import raises
+
+
+def _decode(value):
+    data = base64.b64decode(value["bdata"])
+    shape = [int(x) for x in value["shape"].split(",")]
+    return np.frombuffer(data, dtype=f"<{value['dtype']}").reshape(shape)
+
+
+def test_encode_array():
+    values = np.array([1 / 3, np.nan, 2 / 3])
+    encoded = encode_array(values)
+    assert encoded["dtype"] == "f8"
+    assert np.array_equal(_decode(encoded), values, equal_nan=True)
+
+    # values shorter as text are not encoded unless asked
+    assert encode_array(np.array([1.5, 3.25])) is None
+
+    encoded = encode_array(np.array([1.5, 3.25]), compact=False)
+    assert _decode(encoded).tolist() == [1.5, 3.25]
+
+    encoded = encode_array(np.arange(6).reshape(2, 3) * 1000)
+    assert encoded["dtype"] == "u2"
+    assert encoded["shape"] == "2, 3"
+    assert _decode(encoded).tolist() == [[0, 1000, 2000], [3000, 4000, 5000]]
+
+    encoded = encode_array(np.array([2**40, -(2**40)]))
+    assert encoded["dtype"] == "f8"
+
+    encoded = encode_array(values, precision="float32")
+    assert encoded["dtype"] == "f4"
+
+    encoded = encode_array(values, precision=1, compact=False)
+    assert np.array_equal(_decode(encoded), [0.3, np.nan, 0.7], equal_nan=True)
+
+    assert encode_array(np.array(["a", "b"])) is None
+
+    with raises(SpiralError, match="Unrecognised precision"):
+        encode_array(np.array([0.1]), precision="half")
+
+
+def test_encode_figure():
+    x = np.arange(100) / 3
+    fig = go.Figure(
+        [
+            go.Scatter(x=x, y=x, name="a"),
+            go.Scatter(x=x, y=x, name="b", text=["t"] * 100),
+            go.Scatter(x=x[:3], y=x[:3], name="c"),
+        ]
+    )
+
+    encoded = encode_figure(fig, precision={"b": "float32"})
+    traces = encoded["data"]
+    assert traces[0]["x"]["dtype"] == "f8"
+    assert traces[1]["x"]["dtype"] == "f4"
+    assert list(traces[1]["text"]) == ["t"] * 100
+    assert isinstance(traces[2]["x"], np.ndarray)
+    assert encoded["layout"] == fig.to_plotly_json()["layout"]
+
+    encoded = encode_figure(fig, binary=False, precision=0)
+    assert isinstance(encoded["data"][0]["x"], np.ndarray)
+
+
+def test_to_json():
+    x = np.array([1 / 3, np.nan] * 10)
+    fig = go.Figure(go.Scatter(x=x, y=x))
+
+    for engine in ("json", "orjson"):
+        text = to_json(fig, binary=False, precision=2, engine=engine)
+        assert json.loads(text)["data"][0]["x"][:2] == [0.33, None]
+
+    text = to_json(fig)
+    assert json.loads(text)["data"][0]["x"]["dtype"] == "f8"
+
+    with raises(SpiralError, match="Unrecognised JSON engine"):
+        dumps({}, engine="fast")
+
+
+def test_to_html():
+    fig = go.Figure(go.Scatter(x=np.arange(100) / 3, y=np.arange(100) / 3))
+    fig.update_layout(width=400)
+
+    html = to_html(fig, include_plotlyjs=False, div_id="figure")
+    assert html.startswith("<html>")
+    assert 'id="figure"' in html
+    assert "width:400px" in html
+    assert "window.spiralDecode" in html
+    assert '"dtype":"f8"' in html
+    assert "cdn.plot.ly" not in html
+
+    html = to_html(fig, include_plotlyjs="cdn", full_html=False)
+    assert html.startswith("<div>")
+    assert "cdn.plot.ly" in html
+
+    with raises(SpiralError, match="Unrecognised include_plotlyjs"):
+        to_html(fig, include_plotlyjs="local")
@@ -0,0 +1,60 @@
+import gc
+
+from spiral.plotly._stats import ColumnStatsCache
+
+import pandas as pd
+
+
+def test_nunique():
+    cache = ColumnStatsCache()
+    data = pd.DataFrame({"x": [1, 2, 2, 3], "y": ["a", "b", "b", "b"]})
+
+    assert cache.nunique(data["x"]) == 3
+    assert cache.nunique(data["x"]) == 3
+    assert cache.nunique(data["y"]) == 2
+    assert cache.cache_info() == (1, 2, 256, 2)
+
+
+def test_min_max():
+    cache = ColumnStatsCache()
+    data = pd.DataFrame({"x": [1, 5, 3], "y": ["a", 1, None]})
+
+    assert cache.min_max(data["x"]) == (1, 5)
+    assert cache.min_max(data["y"]) == (None, None)
+
+
+def test_version():
+    cache = ColumnStatsCache()
+    data = pd.DataFrame({"x": [1, 2, 3]})
+
+    assert cache.min_max(data["x"]) == (1, 3)
+
+    data.loc[2, "x"] = 10
+    assert cache.min_max(data["x"]) == (1, 10)
+
+    data["x"] = [4, 5, 6]
+    assert cache.min_max(data["x"]) == (4, 6)
+
+
+def test_eviction():
+    cache = ColumnStatsCache(maxsize=2)
+    data = pd.DataFrame({"x": [1.0], "y": [2.0], "z": ["a"]})
+
+    cache.preload(data)
+    assert len(cache) == 2
+
+    del data
+    gc.collect()
+    assert len(cache) == 0
+
+
+def test_invalidate():
+    cache = ColumnStatsCache()
+    data = pd.DataFrame({"x": [1, 2, 3], "y": [1, 1, 1]})
+
+    cache.preload(data)
+    cache.invalidate(data["x"])
+    assert len(cache) == 1
+
+    cache.invalidate()
+    assert len(cache) == 0
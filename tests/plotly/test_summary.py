@@ -0,0 +1,50 @@
+from spiral import SpiralError
+from spiral.plotly._summary import summarize
+
+import numpy as np
+import pandas as pd
+
+from pytest import raises
+
+
+def test_summarize():
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(
+        {
+            "v": np.append(rng.normal(size=1000), [np.nan, 50.0]),
+            "g": rng.choice(["a", "b"], size=1002),
+        }
+    )
+
+    result = summarize(data, "v", by=["g"], max_outliers=3)
+
+    assert result["count"].sum() == 1001
+
+    for _, row in result.iterrows():
+        values = data.loc[data["g"] == row["g"], "v"].dropna().values
+        q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+        inside = values[
+            (values >= q1 - 1.5 * (q3 - q1)) & (values <= q3 + 1.5 * (q3 - q1))
+        ]
+
+        assert np.allclose([row["q1"], row["median"], row["q3"]], [q1, median, q3])
+        assert row["lowerfence"] == inside.min()
+        assert row["upperfence"] == inside.max()
+        assert len(row["outliers"]) <= 3
+        assert values.max() in row["outliers"] or values.max() == inside.max()
+
+
+def test_summarize_kde():
+    data = pd.DataFrame({"v": np.random.default_rng(0).normal(size=10000)})
+
+    result = summarize(data, "v", kde_points=200)
+    grid, density = result["grid"][0], result["density"][0]
+
+    assert len(grid) == len(density) == 200
+    assert np.isclose(np.trapz(density, grid), 1, atol=1e-3)
+    assert abs(grid[np.argmax(density)]) < 0.2
+
+
+def test_summarize_empty():
+    with raises(SpiralError):
+        summarize(pd.DataFrame({"v": [np.nan]}), "v")
@@ -0,0 +1,104 @@
+from spiral import SpiralError
+from spiral.plotly._trendline import trendlines
+
+import numpy as np
+import pandas as pd
+
+from pytest import raises
+
+
+def _data(n=1000):
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, 3, size=n)
+    x = rng.uniform(0, 10, size=n)
+    y = 2 * x + codes + rng.normal(size=n)
+
+    return x, y, codes
+
+
+def test_ols():
+    x, y, codes = _data()
+    x[0] = np.nan
+
+    result = trendlines(x, y, codes, method="ols")
+
+    assert len(result) == 3
+    assert result["count"].sum() == 999
+
+    for code, row in result.iterrows():
+        mask = (codes == code) & np.isfinite(x)
+        slope, intercept = np.polyfit(x[mask], y[mask], 1)
+        rsquared = np.corrcoef(x[mask], y[mask])[0, 1] ** 2
+
+        assert np.allclose([row["slope"], row["intercept"]], [slope, intercept])
+        assert np.isclose(row["rsquared"], rsquared)
+        assert np.allclose(row["x"], [x[mask].min(), x[mask].max()])
+        assert np.allclose(row["y"], slope * row["x"] + intercept)
+
+    result = trendlines(x, y, codes, method="ols", log_x=True, npoints=5)
+
+    assert len(result["x"][0]) == 5
+    # points are evenly spaced on a log axis
+    steps = np.diff(np.log10(result["x"][0]))
+    assert np.allclose(steps, steps[0])
+
+
+def test_ols_weights():
+    x, y, codes = _data()
+
+    # repeated points and weighted points give the same fit
+    repeated = trendlines(np.repeat(x, 2), np.repeat(y, 2), np.repeat(codes, 2))
+    weighted = trendlines(x, y, codes, weights=np.full(len(x), 2.0))
+
+    assert np.allclose(repeated["slope"], weighted["slope"])
+    assert np.allclose(repeated["intercept"], weighted["intercept"])
+
+
+def test_rolling():
+    x, y, codes = _data()
+
+    result = trendlines(x, y, codes, method="rolling", window=10, npoints=1000)
+
+    for code, row in result.iterrows():
+        mask = codes == code
+        order = np.argsort(x[mask])
+        expected = pd.Series(y[mask][order]).rolling(10).mean().dropna()
+
+        assert np.allclose(row["x"], x[mask][order][9:])
+        assert np.allclose(row["y"], expected)
+
+    result = trendlines(x, y, codes, method="rolling", window=10, npoints=20)
+
+    assert all(len(x) <= 21 for x in result["x"])
+
+
+def test_lowess():
+    x, y, codes = _data()
+
+    # a straight line is fitted exactly
+    result = trendlines(x, 2 * x + codes, codes, method="lowess", nbins=20)
+
+    for code, row in result.iterrows():
+        assert len(row["x"]) == 20
+        assert np.allclose(row["y"], 2 * row["x"] + code)
+
+    result = trendlines(x, y, codes, method="lowess", nbins=20)
+
+    for code, row in result.iterrows():
+        assert np.abs(row["y"] - (2 * row["x"] + code)).max() < 0.5
+
+
+def test_sample():
+    x, y, codes = _data(100000)
+
+    result = trendlines(x, y, codes, sample=1000)
+
+    assert np.allclose(result["count"], 1000, rtol=0.2)
+    assert np.allclose(result["slope"], 2, rtol=0.1)
+
+
+def test_trendlines_error():
+    x, y, codes = _data()
+
+    with raises(SpiralError, match="Unrecognised trendline"):
+        trendlines(x, y, codes, method="bogus")
@@ -3,3 +3,34 @@
 
 def test_import():
     from spiral import App, Controller, ex, init_defaults  # noqa: F401
+
+
+STARTUP = """
+import json
+import sys
+
+from spiral import App
+
+with App("startup", argv=[], config_files=[]) as app:
+    app.run()
+
+heavy = [x for x in ["numpy", "pandas", "plotly", "pkg_resources"] if x in sys.modules]
+
+app.plot
+
+print(json.dumps({"heavy": heavy, "plot": app.plot is not None}))
+"""
+
+
+def test_lazy_imports():
+    import json
+    import subprocess
+    import sys
+
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP], capture_output=True, check=True, text=True
+    ).stdout
+    result = json.loads(output.splitlines()[-1])
+
+    assert result["heavy"] == []
+    assert result["plot"] is True